@@ -0,0 +1,109 @@
+# src/cache.py
+"""
+Cache disque des images converties, indexé par le contenu de l'image source.
+
+Les expériences du runner convertissent toutes les mêmes images. Avec le cache
+activé, chaque image n'est convertie qu'une fois : la clé est le SHA-256 du
+fichier source (plus le suffixe et le backend de conversion), le résultat est
+stocké dans le dossier du cache, puis lié (os.link) ou copié dans le dossier
+de sortie de chaque expérience.
+
+Rôle détaillé :
+- Calcule l'empreinte SHA-256 d'un fichier via mmap (sans copie en mémoire Python)
+- Retourne le résultat en cache s'il existe, sinon le calcule et le stocke
+- Écrit les entrées de façon atomique (fichier temporaire puis os.replace),
+  plusieurs threads/processus pouvant calculer la même entrée en même temps
+- Limite la taille du cache (prune) en supprimant les entrées les moins
+  récemment utilisées (LRU, d'après la date de modification rafraîchie à chaque accès)
+
+ATTENTION : une expérience servie par le cache ne mesure plus la conversion.
+"""
+import os  # Module pour les opérations sur le système de fichiers
+import mmap  # Module pour projeter le fichier source en mémoire
+import shutil  # Module pour la copie de fichiers (repli si os.link échoue)
+import hashlib  # Module pour le calcul de l'empreinte SHA-256
+import threading  # Module pour l'identifiant du thread (noms temporaires uniques)
+from typing import Callable  # Types pour les annotations de type
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "img_gray")  # Dossier du cache par défaut
+
+
+# Calcule l'empreinte SHA-256 d'un fichier
+def file_digest(path: str) -> str:
+    """
+    Calcule l'empreinte SHA-256 (hexadécimale) du contenu d'un fichier.
+
+    Le fichier est projeté en mémoire (mmap) et haché d'un seul bloc.
+    """
+    with open(path, 'rb') as f:  # Ouvre le fichier en lecture binaire
+        if os.fstat(f.fileno()).st_size == 0:  # mmap refuse les fichiers vides
+            return hashlib.sha256(b"").hexdigest()  # Empreinte du contenu vide
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:  # Projette tout le fichier en mémoire
+            return hashlib.sha256(mm).hexdigest()  # Hache le contenu projeté
+
+
+# Place le fichier du cache dans le dossier de sortie
+def _link_or_copy(src: str, dst: str):
+    """Crée dst comme lien physique vers src, ou le copie si le lien est impossible"""
+    try:  # Supprime une sortie existante (os.link refuse d'écraser)
+        os.remove(dst)  # Supprime l'ancienne sortie
+    except FileNotFoundError:  # Pas de sortie existante
+        pass  # Rien à supprimer
+    try:  # Essaie d'abord le lien physique (aucune copie de données)
+        os.link(src, dst)  # Lien physique vers l'entrée du cache
+    except OSError:  # Systèmes de fichiers différents ou liens non supportés
+        shutil.copyfile(src, dst)  # Copie complète du fichier
+
+
+# Retourne le résultat en cache ou le calcule
+def get_or_compute(in_path: str, out_path: str, fn: Callable[[str, str], None], key: str = "",
+                   cache_dir: str = DEFAULT_CACHE_DIR) -> bool:
+    """
+    Produit out_path à partir de in_path en passant par le cache.
+
+    Args:
+        in_path: Image source (son contenu détermine la clé)
+        out_path: Fichier de sortie à produire
+        fn: Fonction fn(source, destination) qui calcule le résultat
+        key: Complément de clé (suffixe, backend...) pour distinguer des résultats différents
+        cache_dir: Dossier du cache
+
+    Returns:
+        True si le résultat venait du cache, False s'il a été calculé
+    """
+    ext = os.path.splitext(out_path)[1]  # Extension de sortie (détermine le format d'encodage)
+    cache_path = os.path.join(cache_dir, f"{file_digest(in_path)}{key}{ext}")  # Entrée du cache pour ce contenu
+    hit = os.path.exists(cache_path)  # Le résultat est-il déjà en cache ?
+    if hit:  # Succès du cache
+        os.utime(cache_path)  # Rafraîchit la date pour l'éviction LRU
+    else:  # Échec du cache : calcule le résultat
+        os.makedirs(cache_dir, exist_ok=True)  # Crée le dossier du cache si besoin
+        tmp_path = f"{os.path.splitext(cache_path)[0]}.{os.getpid()}-{threading.get_ident()}{ext}"  # Fichier temporaire unique (même extension)
+        fn(in_path, tmp_path)  # Calcule le résultat dans le fichier temporaire
+        os.replace(tmp_path, cache_path)  # Publie l'entrée de façon atomique
+    _link_or_copy(cache_path, out_path)  # Place le résultat dans le dossier de sortie
+    return hit  # Indique si le cache a servi
+
+
+# Limite la taille du cache
+def prune(max_bytes: int, cache_dir: str = DEFAULT_CACHE_DIR) -> int:
+    """
+    Supprime les entrées les moins récemment utilisées jusqu'à ce que le cache tienne dans max_bytes.
+
+    Returns:
+        Nombre d'entrées supprimées
+    """
+    if not os.path.isdir(cache_dir):  # Pas de cache
+        return 0  # Rien à supprimer
+    with os.scandir(cache_dir) as it:  # Liste les entrées du cache
+        entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in it if e.is_file()]  # (date, taille, chemin)
+    entries.sort()  # Les plus anciennes d'abord
+    total = sum(size for _, size, _ in entries)  # Taille totale du cache
+    removed = 0  # Nombre d'entrées supprimées
+    for _, size, path in entries:  # Parcourt de la plus ancienne à la plus récente
+        if total <= max_bytes:  # Le cache tient dans la limite
+            break  # Arrête l'éviction
+        os.remove(path)  # Supprime l'entrée
+        total -= size  # Met à jour la taille totale
+        removed += 1  # Compte l'entrée supprimée
+    return removed  # Retourne le nombre d'entrées supprimées
@@ -8,6 +8,10 @@ Ce module fournit des fonctions et classes utilitaires utilisées dans tout le p
 - Liste des fichiers images dans un dossier
 - Sauvegarde des résultats au format JSON et CSV
 - Extraction de noms de fichiers sécurisés
+- Épinglage des processus workers sur les cœurs (os.sched_setaffinity)
+- Contexte multiprocessing des pools (fork sur POSIX)
+- Détection de l'interpréteur sans GIL (CPython free-threaded 3.13t+)
+- Nombre de workers par défaut limité aux cœurs autorisés (taskset, cgroups)
 
 Rôle détaillé :
 - Fonctions réutilisables pour éviter la duplication de code
@@ -16,11 +20,24 @@ Rôle détaillé :
 - Formatage et export des données
 """
 import os  # Module pour les opérations sur le système de fichiers
+import sys  # Module pour détecter l'interpréteur sans GIL (sys._is_gil_enabled)
 import time  # Module pour mesurer le temps (perf_counter pour haute précision)
 import json  # Module pour la sérialisation/désérialisation JSON
 import csv  # Module pour la lecture/écriture de fichiers CSV
-from pathlib import Path  # Import de Path pour la manipulation de chemins de fichiers
-from typing import List, Dict, Any, Tuple  # Types pour les annotations de type
+import io  # Module pour les tampons en mémoire (StringIO)
+import array  # Module pour les tableaux numériques compacts (array.array)
+import multiprocessing  # Module pour le compteur partagé entre workers et le contexte des pools
+from statistics import fmean, pstdev  # Fonctions statistiques (moyenne, écart-type)
+from typing import List, Dict, Any, Tuple, Iterable  # Types pour les annotations de type
+
+try:  # orjson est optionnel : sérialiseur JSON en C, beaucoup plus rapide que json
+    import orjson  # Module de sérialisation JSON rapide (optionnel)
+except ImportError:  # Si orjson n'est pas installé
+    orjson = None  # Repli sur le module json de la bibliothèque standard
+
+_IO_BUF = 1 << 20  # Taille du tampon d'écriture (1 Mio) pour les exports JSON/CSV (moins d'appels write())
+_ENSURED_DIRS = set()  # Dossiers déjà créés/vérifiés par ensure_dirs (évite les mkdir répétés)
+_IMG_EXTS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')  # Tuple des extensions d'images supportées (accepté directement par str.endswith)
 
 
 # Crée les dossiers spécifiés s'ils n'existent pas déjà
@@ -31,9 +48,15 @@ def ensure_dirs(*paths):
     Cette fonction prend un nombre variable d'arguments (chemins de dossiers)
     et crée chaque dossier s'il n'existe pas. La création est récursive
     (parents=True) pour créer tous les dossiers parents nécessaires.
+    Les chemins déjà traités sont mémorisés pour ne pas refaire d'appel système
+    à chaque appel avec le même dossier.
     """
     for p in paths:  # Parcourt chaque chemin fourni
-        Path(p).mkdir(parents=True, exist_ok=True)  # Crée le dossier (récursif) s'il n'existe pas (pas d'erreur si existe déjà)
+        key = os.fspath(p)  # Clé de mémorisation (accepte str et Path)
+        if key in _ENSURED_DIRS:  # Dossier déjà créé/vérifié lors d'un appel précédent
+            continue  # Rien à faire
+        os.makedirs(key, exist_ok=True)  # Crée le dossier (récursif) s'il n'existe pas (pas d'erreur si existe déjà)
+        _ENSURED_DIRS.add(key)  # Mémorise le dossier comme existant
 
 
 class Timer:
@@ -41,20 +64,21 @@ class Timer:
     Chronomètre pour mesurer le temps d'exécution.
     
     Cette classe permet de mesurer précisément le temps d'exécution d'opérations.
-    Elle utilise time.perf_counter() pour une haute précision et peut enregistrer
-    plusieurs mesures (ticks) pour calculer des statistiques.
+    Elle utilise time.perf_counter_ns() pour une haute précision et peut enregistrer
+    plusieurs mesures (ticks, en nanosecondes entières) pour calculer des statistiques.
+    Les conversions en secondes ne sont faites qu'au moment de retourner un résultat.
     """
     
     # Initialise un chronomètre pour mesurer le temps d'exécution
     def __init__(self):
         """Initialise le chronomètre avec des valeurs par défaut"""
         self._t0 = None  # Temps de début (None si le chronomètre n'est pas démarré)
-        self.ticks = []  # Liste pour stocker tous les temps mesurés (historique)
+        self.ticks = array.array('q')  # Tableau compact d'entiers 64 bits pour stocker tous les temps mesurés en nanosecondes (historique)
 
     # Démarre le chronomètre
     def start(self):
         """Démarre le chronomètre en enregistrant le temps actuel"""
-        self._t0 = time.perf_counter()  # Enregistre le temps actuel avec haute précision
+        self._t0 = time.perf_counter_ns()  # Enregistre le temps actuel en nanosecondes (entier, haute précision)
 
     # Arrête le chronomètre et retourne le temps écoulé
     def stop(self) -> float:
@@ -66,10 +90,43 @@ class Timer:
         """
         if self._t0 is None:  # Vérifie si le chronomètre a été démarré
             raise RuntimeError("Timer not started")  # Lève une erreur si le chronomètre n'a pas été démarré
-        elapsed = time.perf_counter() - self._t0  # Calcule le temps écoulé (temps actuel - temps de début)
-        self.ticks.append(elapsed)  # Ajoute cette mesure à l'historique
+        elapsed_ns = time.perf_counter_ns() - self._t0  # Calcule le temps écoulé en nanosecondes (arithmétique entière)
+        self.ticks.append(elapsed_ns)  # Ajoute cette mesure à l'historique
         self._t0 = None  # Réinitialise le chronomètre (None pour indiquer qu'il est arrêté)
-        return elapsed  # Retourne le temps écoulé en secondes
+        return elapsed_ns * 1e-9  # Retourne le temps écoulé en secondes
+
+    # Calcule les statistiques sur les temps mesurés
+    def stats(self) -> Tuple[float, float, float, float]:
+        """
+        Retourne (moyenne, écart-type, minimum, maximum) des temps mesurés, en secondes.
+        
+        Retourne des zéros si aucune mesure n'a encore été enregistrée.
+        """
+        if not self.ticks:  # Vérifie s'il y a au moins une mesure
+            return 0.0, 0.0, 0.0, 0.0  # Aucune mesure : statistiques nulles
+        return (  # Statistiques calculées sur les nanosecondes puis converties en secondes
+            fmean(self.ticks) * 1e-9,  # Moyenne
+            pstdev(self.ticks) * 1e-9,  # Écart-type
+            min(self.ticks) * 1e-9,  # Minimum
+            max(self.ticks) * 1e-9  # Maximum
+        )
+
+
+# Liste les entrées (os.DirEntry) des fichiers images dans un dossier
+def list_image_entries(folder: str) -> List[os.DirEntry]:
+    """
+    Liste les entrées os.DirEntry des fichiers images dans un dossier (jpg, jpeg, png, bmp, tiff).
+    
+    Les entrées conservent les informations déjà obtenues par os.scandir : les
+    appelants qui ont besoin de la taille ou du type du fichier utilisent
+    entry.stat(follow_symlinks=False) ou entry.is_file() (mis en cache) au lieu
+    de refaire un os.stat par fichier. Les extensions sont vérifiées en
+    minuscules pour être insensible à la casse. Seuls les fichiers sont retenus
+    (pas un dossier ou un lien vers un dossier nommé *.png, par exemple).
+    """
+    exts = _IMG_EXTS  # Référence locale aux extensions supportées (évite la recherche globale à chaque entrée)
+    with os.scandir(folder) as it:  # Parcourt le dossier (le descripteur est libéré à la sortie du bloc with)
+        return [e for e in it if e.name.lower().endswith(exts) and e.is_file()]  # Retourne les fichiers dont l'extension est dans exts (type déjà connu via scandir, stat seulement pour les liens)
 
 
 # Liste tous les fichiers images dans un dossier (jpg, jpeg, png, bmp, tiff)
@@ -77,40 +134,104 @@ def list_images(folder: str) -> List[str]:
     """
     Liste tous les fichiers images dans un dossier (jpg, jpeg, png, bmp, tiff).
     
-    Cette fonction parcourt un dossier et retourne la liste des chemins complets
-    de tous les fichiers images trouvés. Les extensions sont vérifiées en
-    minuscules pour être insensible à la casse.
+    Cette fonction parcourt un dossier et retourne la liste triée des chemins
+    complets de tous les fichiers images trouvés (voir list_image_entries).
+    Le dossier est relu à chaque appel : un cache indexé par la date de
+    modification du dossier manquerait les fichiers réécrits sur place et,
+    sur les systèmes de fichiers à dates grossières, les ajouts faits dans
+    le même intervalle.
     """
-    p = Path(folder)  # Convertit le chemin du dossier en objet Path
-    exts = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff'}  # Ensemble des extensions d'images supportées
-    return [str(x) for x in p.iterdir() if x.suffix.lower() in exts]  # Retourne la liste des chemins (en string) des fichiers dont l'extension est dans exts
+    return sorted(e.path for e in list_image_entries(folder))  # Chemins triés (ordre reproductible d'une exécution à l'autre)
+
+
+
+# Liste les fichiers images d'un dossier, du plus gros au plus petit
+def list_images_largest_first(folder: str) -> List[str]:
+    """
+    Liste les fichiers images d'un dossier par taille décroissante (ordonnancement LPT).
+    
+    Les pools distribuent les images par paquets consécutifs, dans l'ordre de
+    la liste : si les plus gros fichiers arrivent en dernier, un seul worker
+    les traite pendant que les autres attendent (traînard). En commençant par
+    les plus gros, les petits fichiers remplissent les workers libres en fin
+    d'exécution. La taille vient de l'entrée os.scandir (un stat par fichier,
+    mis en cache) ; à taille égale, l'ordre des chemins est conservé.
+    """
+    entries = list_image_entries(folder)  # Entrées des fichiers images du dossier
+    return [e.path for e in sorted(entries, key=lambda e: (-e.stat(follow_symlinks=False).st_size, e.path))]  # Du plus gros au plus petit (ordre reproductible)
 
 
 # Sauvegarde des données au format JSON
-def save_results_json(path: str, data: Dict[str, Any]):
+def save_results_json(path: str, data: Dict[str, Any], stream: bool = False, compact: bool = False):
     """
     Sauvegarde des données au format JSON.
     
     Cette fonction écrit un dictionnaire Python dans un fichier JSON avec
     indentation pour la lisibilité et support des caractères Unicode.
+    Si orjson est installé (et stream=False), le document est sérialisé en une
+    seule fois puis écrit en un seul appel. Sinon, ou avec stream=True, il est
+    encodé au fil de l'eau (JSONEncoder.iterencode) dans un fichier à grand
+    tampon : le document complet n'est jamais construit en mémoire, ce qui
+    borne la mémoire pour les très gros résultats.
+    Avec compact=True, le JSON est écrit sans indentation ni espaces : sans
+    orjson, l'encodeur C de la bibliothèque standard est alors utilisé
+    (l'indentation l'impose en Python pur, environ 3 fois plus lent).
     """
-    with open(path, 'w', encoding='utf-8') as f:  # Ouvre le fichier en mode écriture avec encodage UTF-8
-        json.dump(data, f, indent=2, ensure_ascii=False)  # Écrit le dictionnaire en JSON (indenté, avec caractères Unicode)
+    if orjson is not None and not stream:  # Si orjson est disponible, on l'utilise (sérialisation en C)
+        opts = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY  # Clés non-string et tableaux numpy acceptés
+        data_bytes = orjson.dumps(  # Sérialise le dictionnaire directement en bytes UTF-8
+            data,  # Données à sérialiser
+            option=opts if compact else opts | orjson.OPT_INDENT_2  # Indentation de 2 sauf en mode compact
+        )
+        with open(path, 'wb', buffering=_IO_BUF) as f:  # Ouvre le fichier en mode binaire (orjson produit déjà de l'UTF-8)
+            f.write(data_bytes)  # Écrit le document complet en un seul appel
+        return  # Terminé, pas besoin du repli json
+    if compact:  # JSON compact : séparateurs sans espaces
+        encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)  # Encodeur sans indentation, avec caractères Unicode
+    else:  # JSON lisible
+        encoder = json.JSONEncoder(indent=2, ensure_ascii=False)  # Encodeur indenté, avec caractères Unicode
+    with open(path, 'w', encoding='utf-8', buffering=_IO_BUF) as f:  # Ouvre le fichier en mode écriture avec encodage UTF-8 (tampon de 1 Mio)
+        if compact and not stream:  # Encodage en une fois : seul ce chemin utilise l'encodeur C
+            f.write(encoder.encode(data))  # Écrit le document complet
+            return  # Terminé
+        for chunk in encoder.iterencode(data):  # Fragments produits au fil de l'encodage
+            f.write(chunk)  # Ajoute le fragment au tampon (écriture sur disque par blocs de 1 Mio)
 
 
 # Sauvegarde des données au format CSV avec en-têtes et lignes
-def save_results_csv(path: str, headers: List[str], rows: List[List[Any]]):
+def save_results_csv(path: str, headers: List[str], rows: Iterable[Iterable[Any]]):
     """
     Sauvegarde des données au format CSV avec en-têtes et lignes.
     
     Cette fonction écrit un fichier CSV avec une ligne d'en-têtes suivie
     des lignes de données. Utilise le module csv pour gérer correctement
     l'échappement des caractères spéciaux.
+    Le contenu est construit en mémoire puis écrit en un seul appel.
+    rows peut être n'importe quel itérable (par exemple un générateur) : il est
+    parcouru une seule fois, sans être matérialisé en liste.
+    """
+    buf = io.StringIO()  # Tampon en mémoire pour construire tout le contenu CSV
+    writer = csv.writer(buf)  # Crée un writer CSV qui écrit dans le tampon
+    writer.writerow(headers)  # Écrit la ligne d'en-têtes
+    writer.writerows(rows)  # Écrit toutes les lignes de données (parcours paresseux de l'itérable)
+    with open(path, 'w', newline='', encoding='utf-8', buffering=_IO_BUF) as f:  # Ouvre le fichier en mode écriture (newline='' pour compatibilité Windows, tampon de 1 Mio)
+        f.write(buf.getvalue())  # Écrit tout le contenu CSV en un seul appel
+
+
+# Sauvegarde un tableau (métrique, valeur) au format CSV sans passer par le module csv
+def save_metrics_csv(path: str, headers: List[str], rows: Iterable[Iterable[Any]]):
+    """
+    Sauvegarde un tableau à deux colonnes (nom de métrique, valeur numérique) au format CSV.
+    
+    Version spécialisée de save_results_csv pour les lignes [str, nombre ou None] :
+    aucun champ ne nécessite d'échappement, les lignes sont donc formatées
+    directement puis écrites en un seul appel. None est écrit comme un champ vide
+    (même sortie que csv.writer, fins de ligne comprises).
     """
-    with open(path, 'w', newline='', encoding='utf-8') as f:  # Ouvre le fichier en mode écriture (newline='' pour compatibilité Windows)
-        writer = csv.writer(f)  # Crée un writer CSV
-        writer.writerow(headers)  # Écrit la ligne d'en-têtes
-        writer.writerows(rows)  # Écrit toutes les lignes de données
+    parts = ['{},{}\r\n'.format(*headers)]  # Ligne d'en-têtes (fin de ligne \r\n comme le dialecte csv par défaut)
+    parts += [f"{k},{'' if v is None else v}\r\n" for k, v in rows]  # Une ligne par métrique (None -> champ vide), rows peut être un générateur
+    with open(path, 'w', newline='', encoding='utf-8', buffering=_IO_BUF) as f:  # Ouvre le fichier en mode écriture (newline='' pour garder \r\n tel quel)
+        f.write(''.join(parts))  # Écrit tout le contenu CSV en un seul appel
 
 
 # Extrait le nom de fichier sécurisé depuis un chemin
@@ -121,4 +242,78 @@ def safe_filename(path: str) -> str:
     Cette fonction extrait le nom de fichier (sans le chemin) depuis un chemin complet.
     Retourne le nom de base (stem) + l'extension (suffix).
     """
-    return str(Path(path).stem) + Path(path).suffix  # Retourne le nom de base + extension (sans le chemin)
+    return os.path.basename(path)  # Retourne le nom de base + extension (sans le chemin), sans construire d'objet Path
+
+
+# Contexte des pools de processus : fork quand il est disponible (POSIX).
+# Les versions à base de processus comptent sur l'héritage par fork du logger
+# global et des images préchargées, et spawn (défaut sur macOS, forkserver par
+# défaut sous Linux à partir de Python 3.14) relance un interpréteur et
+# réimporte les modules dans chaque worker, un coût qui domine sur de petits lots.
+# Le contexte est passé explicitement aux pools : la méthode de démarrage
+# globale (multiprocessing.set_start_method) n'est pas modifiée. Contrepartie :
+# fork n'est pas sûr si le processus parent a déjà démarré des threads
+# (bibliothèques OpenMP, CoreFoundation sur macOS...).
+MP_CONTEXT = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)  # Contexte fork, ou contexte par défaut (Windows)
+
+
+# Indique si le GIL est actif dans l'interpréteur courant
+def gil_enabled() -> bool:
+    """
+    Retourne False sous CPython free-threaded (3.13t+) lancé sans GIL, True sinon.
+    
+    Sans GIL, les versions threading et ThreadPoolExecutor exécutent le code
+    Python de conversion réellement en parallèle, sans coût de processus ni pickle.
+    """
+    is_enabled = getattr(sys, "_is_gil_enabled", None)  # Fonction disponible à partir de Python 3.13
+    return True if is_enabled is None else is_enabled()  # Avant 3.13 : le GIL est toujours actif
+
+
+# Nombre de workers par défaut : cœurs réellement utilisables par ce processus
+def default_workers() -> int:
+    """
+    Retourne le nombre de cœurs autorisés pour le processus courant.
+    
+    Dans un conteneur ou sous taskset, os.cpu_count() compte tous les cœurs
+    de la machine hôte : des workers en surnombre se disputent alors les
+    quelques cœurs autorisés (changements de contexte en rafale).
+    os.sched_getaffinity(0) respecte ces limites ; repli sur os.cpu_count()
+    hors Linux.
+    """
+    try:  # os.sched_getaffinity n'existe que sous Linux
+        return len(os.sched_getaffinity(0))  # Cœurs autorisés (taskset, cpuset des cgroups)
+    except AttributeError:  # macOS, Windows
+        return os.cpu_count() or 2  # Nombre de cœurs de la machine (ou 2 par défaut)
+
+
+# Épingle le worker courant (processus ou thread) sur un cœur (initializer de pool)
+def pin_worker(counter):
+    """
+    Épingle le worker appelant sur un seul cœur (à utiliser comme initializer de pool).
+    
+    counter est un MP_CONTEXT.Value partagé par les workers du pool : le
+    worker N reçoit le N-ième cœur autorisé (modulo leur nombre). Sous Linux,
+    os.sched_setaffinity(0, ...) ne s'applique qu'au thread appelant : la même
+    fonction épingle donc aussi les threads d'un ThreadPoolExecutor. Sans
+    os.sched_setaffinity (hors Linux), la fonction ne fait rien.
+    """
+    if not hasattr(os, "sched_setaffinity"):  # Affinité non supportée sur ce système
+        return  # Pas d'épinglage
+    with counter.get_lock():  # Réserve un index unique parmi les workers du pool
+        idx = counter.value  # Index de ce worker
+        counter.value += 1  # Index du worker suivant
+    cpus = sorted(os.sched_getaffinity(0))  # Cœurs autorisés pour ce processus (peut être moins que cpu_count dans un conteneur)
+    os.sched_setaffinity(0, {cpus[idx % len(cpus)]})  # Épingle le worker (processus, ou thread appelant) sur son cœur
+
+
+# Arguments de pool pour épingler chaque worker sur son cœur
+def pinning_kwargs(pin: bool) -> Dict[str, Any]:
+    """
+    Retourne les arguments initializer/initargs à passer à Pool, ProcessPoolExecutor
+    ou ThreadPoolExecutor.
+    
+    Retourne un dictionnaire vide si pin est False (pool créé normalement).
+    """
+    if not pin:  # Pas d'épinglage demandé
+        return {}  # Aucun argument supplémentaire
+    return {"initializer": pin_worker, "initargs": (MP_CONTEXT.Value('i', 0),)}  # Compteur partagé (même contexte que les pools), remis à zéro pour chaque pool
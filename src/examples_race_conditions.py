@@ -9,11 +9,14 @@ les concepts de synchronisation : race conditions, mutex, sémaphores, et zones
 Rôle détaillé :
 - Démontre les race conditions avec un compteur non thread-safe
 - Montre la correction avec un compteur thread-safe (Lock)
+- Reproduit la race condition entre processus (mémoire partagée, sans GIL)
 - Illustre l'écriture dans un fichier comme zone critique
 - Démontre l'utilisation d'un sémaphore pour limiter l'accès concurrent
 - Peut être exécuté directement pour voir les démonstrations en action
 """
+import sys  # Module pour écrire directement sur la sortie standard
 import threading  # Module pour la création et gestion de threads
+import multiprocessing  # Module pour la création et gestion de processus
 import time  # Module pour mesurer le temps et faire des pauses
 from .synchronization_tools import UnsafeCounter, ThreadSafeCounter, ThreadSafeFileLogger, SemaphoreFileLogger  # Import des outils de synchronisation
 
@@ -27,11 +30,12 @@ def demonstrate_race_condition():
     simultanément à une ressource partagée sans protection. Le résultat
     final sera incorrect (inférieur à la valeur attendue).
     """
-    print("=" * 60)  # Affiche une ligne de séparation (60 caractères '=')
-    print("DÉMONSTRATION : Race Condition (sans verrou)")  # Affiche le titre de la démonstration
-    print("=" * 60)  # Affiche une ligne de séparation
+    out = []  # Lignes du rapport, affichées en une seule écriture à la fin
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation (60 caractères '=')
+    out.append("DÉMONSTRATION : Race Condition (sans verrou)")  # Ajoute au rapport le titre de la démonstration
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
     
-    unsafe_counter = UnsafeCounter(0)  # Crée un compteur non thread-safe avec valeur initiale 0
+    unsafe_counter = UnsafeCounter(0, demo_delay=0.0001)  # Crée un compteur non thread-safe (pause de 100 µs pour rendre la race condition visible)
     num_threads = 10  # Nombre de threads à créer
     increments_per_thread = 100  # Nombre d'incréments que chaque thread effectuera
     
@@ -54,13 +58,14 @@ def demonstrate_race_condition():
     final_value = unsafe_counter.get()  # Récupère la valeur finale du compteur (probablement incorrecte)
     expected_value = num_threads * increments_per_thread  # Calcule la valeur attendue (10 * 100 = 1000)
     
-    print(f"Nombre de threads : {num_threads}")  # Affiche le nombre de threads utilisés
-    print(f"Incréments par thread : {increments_per_thread}")  # Affiche le nombre d'incréments par thread
-    print(f"Valeur attendue : {expected_value}")  # Affiche la valeur attendue (1000)
-    print(f"Valeur obtenue : {final_value}")  # Affiche la valeur obtenue (probablement < 1000)
-    print(f"Erreur : {expected_value - final_value} (race condition détectée!)")  # Affiche l'erreur (différence)
-    print(f"Temps écoulé : {elapsed:.4f}s")  # Affiche le temps écoulé avec 4 décimales
-    print()  # Ligne vide pour la lisibilité
+    out.append(f"Nombre de threads : {num_threads}")  # Ajoute au rapport le nombre de threads utilisés
+    out.append(f"Incréments par thread : {increments_per_thread}")  # Ajoute au rapport le nombre d'incréments par thread
+    out.append(f"Valeur attendue : {expected_value}")  # Ajoute au rapport la valeur attendue (1000)
+    out.append(f"Valeur obtenue : {final_value}")  # Ajoute au rapport la valeur obtenue (probablement < 1000)
+    out.append(f"Erreur : {expected_value - final_value} (race condition détectée!)")  # Ajoute au rapport l'erreur (différence)
+    out.append(f"Temps écoulé : {elapsed:.4f}s")  # Ajoute au rapport le temps écoulé avec 4 décimales
+    out.append("")  # Ligne vide pour la lisibilité
+    sys.stdout.write("\n".join(out) + "\n")  # Affiche tout le rapport en une seule écriture
 
 
 def demonstrate_thread_safe_counter():
@@ -70,10 +75,16 @@ def demonstrate_thread_safe_counter():
     Cette fonction montre comment un Lock (mutex) corrige le problème de
     race condition. Le résultat final sera correct (égal à la valeur attendue),
     mais le temps d'exécution sera légèrement plus long à cause de la synchronisation.
+    
+    Chaque incrément prend le verrou, comme la zone critique de
+    demonstrate_race_condition : les deux temps sont comparables. (Pour
+    regrouper les incréments d'un thread, ThreadSafeCounter.add(n) prend le
+    verrou une seule fois.)
     """
-    print("=" * 60)  # Affiche une ligne de séparation
-    print("DÉMONSTRATION : Compteur Thread-Safe (avec Lock)")  # Affiche le titre de la démonstration
-    print("=" * 60)  # Affiche une ligne de séparation
+    out = []  # Lignes du rapport, affichées en une seule écriture à la fin
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
+    out.append("DÉMONSTRATION : Compteur Thread-Safe (avec Lock)")  # Ajoute au rapport le titre de la démonstration
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
     
     safe_counter = ThreadSafeCounter(0)  # Crée un compteur thread-safe avec valeur initiale 0
     num_threads = 10  # Nombre de threads à créer
@@ -99,15 +110,75 @@ def demonstrate_thread_safe_counter():
     expected_value = num_threads * increments_per_thread  # Calcule la valeur attendue (1000)
     metrics = safe_counter.get_metrics()  # Récupère les métriques de synchronisation
     
-    print(f"Nombre de threads : {num_threads}")  # Affiche le nombre de threads utilisés
-    print(f"Incréments par thread : {increments_per_thread}")  # Affiche le nombre d'incréments par thread
-    print(f"Valeur attendue : {expected_value}")  # Affiche la valeur attendue (1000)
-    print(f"Valeur obtenue : {final_value}")  # Affiche la valeur obtenue (1000 - correcte!)
-    print(f"Erreur : {expected_value - final_value} (aucune erreur!)")  # Affiche l'erreur (0)
-    print(f"Temps écoulé : {elapsed:.4f}s")  # Affiche le temps écoulé
-    print(f"Temps total passé en attente sur verrous : {metrics['total_lock_wait_time']:.4f}s")  # Affiche le temps d'attente sur verrous
-    print(f"Nombre de contentions : {metrics['contention_count']}")  # Affiche le nombre de contentions
-    print()  # Ligne vide pour la lisibilité
+    out.append(f"Nombre de threads : {num_threads}")  # Ajoute au rapport le nombre de threads utilisés
+    out.append(f"Incréments par thread : {increments_per_thread}")  # Ajoute au rapport le nombre d'incréments par thread
+    out.append(f"Valeur attendue : {expected_value}")  # Ajoute au rapport la valeur attendue (1000)
+    out.append(f"Valeur obtenue : {final_value}")  # Ajoute au rapport la valeur obtenue (1000 - correcte!)
+    out.append(f"Erreur : {expected_value - final_value} (aucune erreur!)")  # Ajoute au rapport l'erreur (0)
+    out.append(f"Temps écoulé : {elapsed:.4f}s")  # Ajoute au rapport le temps écoulé
+    out.append(f"Temps total passé en attente sur verrous : {metrics['total_lock_wait_time']:.4f}s")  # Ajoute au rapport le temps d'attente sur verrous
+    out.append(f"Nombre de contentions : {metrics['contention_count']}")  # Ajoute au rapport le nombre de contentions
+    out.append(f"Acquisitions de verrou : {metrics['lock_acquire_count']} (une par incrément)")  # Ajoute au rapport le nombre d'acquisitions (une par incrément)
+    out.append("")  # Ligne vide pour la lisibilité
+    sys.stdout.write("\n".join(out) + "\n")  # Affiche tout le rapport en une seule écriture
+
+
+def _increment_shared(counter, n: int, use_lock: bool):
+    """
+    Incrémente une variable partagée n fois depuis un processus enfant.
+    
+    Fonction de niveau module pour pouvoir être transmise aux processus
+    (y compris avec la méthode de démarrage spawn).
+    """
+    for _ in range(n):  # Boucle pour incrémenter le compteur plusieurs fois
+        if use_lock:  # Si la variable partagée est protégée par un verrou
+            with counter.get_lock():  # Acquiert le verrou associé à la Value (process-safe)
+                counter.value += 1  # Lecture + écriture protégées (zone critique)
+        else:  # Sans verrou
+            counter.value += 1  # Lecture puis écriture NON atomiques (race condition possible)
+
+
+def demonstrate_race_condition_mp():
+    """
+    Démontre la race condition entre processus avec une variable en mémoire partagée.
+    
+    Avec des threads, le GIL sérialise l'exécution du bytecode : la démonstration
+    mesure surtout la contention sur le GIL. Ici, chaque processus a son propre
+    interpréteur et accède réellement en parallèle à la même mémoire, avec
+    multiprocessing.Value sans verrou (lock=False) puis avec verrou (lock=True).
+    """
+    out = []  # Lignes du rapport, affichées en une seule écriture à la fin
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
+    out.append("DÉMONSTRATION : Race Condition entre processus (mémoire partagée)")  # Ajoute au rapport le titre de la démonstration
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
+    
+    num_processes = 4  # Nombre de processus à créer
+    increments_per_process = 10000  # Nombre d'incréments que chaque processus effectuera
+    expected_value = num_processes * increments_per_process  # Calcule la valeur attendue
+    
+    out.append(f"Nombre de processus : {num_processes}")  # Ajoute au rapport le nombre de processus utilisés
+    out.append(f"Incréments par processus : {increments_per_process}")  # Ajoute au rapport le nombre d'incréments par processus
+    out.append(f"Valeur attendue : {expected_value}")  # Ajoute au rapport la valeur attendue
+    
+    for use_lock in (False, True):  # Exécute la démonstration sans puis avec verrou
+        counter = multiprocessing.Value('i', 0, lock=use_lock)  # Entier partagé entre processus (avec ou sans verrou associé)
+        processes = []  # Liste pour stocker les objets processus
+        start_time = time.perf_counter()  # Enregistre le temps de début
+        
+        for _ in range(num_processes):  # Crée num_processes processus
+            p = multiprocessing.Process(target=_increment_shared, args=(counter, increments_per_process, use_lock))  # Crée un processus qui incrémente la variable partagée
+            p.start()  # Démarre le processus
+            processes.append(p)  # Ajoute le processus à la liste
+        
+        for p in processes:  # Parcourt tous les processus
+            p.join()  # Attend que chaque processus se termine
+        
+        elapsed = time.perf_counter() - start_time  # Calcule le temps écoulé
+        final_value = counter.value  # Récupère la valeur finale de la variable partagée
+        label = "avec verrou" if use_lock else "sans verrou"  # Libellé de la variante exécutée
+        out.append(f"Valeur obtenue ({label}) : {final_value} (erreur : {expected_value - final_value}, temps : {elapsed:.4f}s)")  # Ajoute au rapport la valeur obtenue, l'erreur et le temps
+    out.append("")  # Ligne vide pour la lisibilité
+    sys.stdout.write("\n".join(out) + "\n")  # Affiche tout le rapport en une seule écriture
 
 
 def demonstrate_critical_section_file():
@@ -119,45 +190,48 @@ def demonstrate_critical_section_file():
     zone critique qui nécessite une synchronisation. Avec un Lock, toutes
     les écritures sont correctement sérialisées.
     """
-    print("=" * 60)  # Affiche une ligne de séparation
-    print("DÉMONSTRATION : Zone Critique - Écriture Fichier (avec Lock)")  # Affiche le titre de la démonstration
-    print("=" * 60)  # Affiche une ligne de séparation
+    out = []  # Lignes du rapport, affichées en une seule écriture à la fin
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
+    out.append("DÉMONSTRATION : Zone Critique - Écriture Fichier (avec Lock)")  # Ajoute au rapport le titre de la démonstration
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
     
     log_file = "demo_critical_section.log"  # Nom du fichier de log à créer
-    logger = ThreadSafeFileLogger(log_file)  # Crée un logger thread-safe avec Lock
     num_threads = 5  # Nombre de threads à créer
     messages_per_thread = 20  # Nombre de messages que chaque thread écrira
     
-    def write_messages(thread_id):  # Fonction exécutée par chaque thread
-        for i in range(messages_per_thread):  # Boucle pour écrire plusieurs messages
-            logger.log(f"Thread-{thread_id}: Message-{i}")  # Écrit un message dans le log (protégé par Lock)
-    
-    threads = []  # Liste pour stocker les objets threads
-    start_time = time.perf_counter()  # Enregistre le temps de début
-    
-    for i in range(num_threads):  # Crée num_threads threads
-        t = threading.Thread(target=write_messages, args=(i,))  # Crée un thread qui exécutera write_messages avec l'ID i
-        t.start()  # Démarre le thread
-        threads.append(t)  # Ajoute le thread à la liste
-    
-    for t in threads:  # Parcourt tous les threads
-        t.join()  # Attend que chaque thread se termine
-    
-    elapsed = time.perf_counter() - start_time  # Calcule le temps écoulé
+    with ThreadSafeFileLogger(log_file) as logger:  # Crée un logger thread-safe avec Lock (fichier ouvert une seule fois)
+        def write_messages(thread_id):  # Fonction exécutée par chaque thread
+            for i in range(messages_per_thread):  # Boucle pour écrire plusieurs messages
+                logger.log(f"Thread-{thread_id}: Message-{i}")  # Écrit un message dans le log (protégé par Lock)
+        
+        threads = []  # Liste pour stocker les objets threads
+        start_time = time.perf_counter()  # Enregistre le temps de début
+        
+        for i in range(num_threads):  # Crée num_threads threads
+            t = threading.Thread(target=write_messages, args=(i,))  # Crée un thread qui exécutera write_messages avec l'ID i
+            t.start()  # Démarre le thread
+            threads.append(t)  # Ajoute le thread à la liste
+        
+        for t in threads:  # Parcourt tous les threads
+            t.join()  # Attend que chaque thread se termine
+        
+        elapsed = time.perf_counter() - start_time  # Calcule le temps écoulé
+    # Le fichier est vidé et fermé à la sortie du bloc with
     metrics = logger.get_metrics()  # Récupère les métriques de synchronisation du logger
     
     # Vérifier le fichier
     with open(log_file, 'r') as f:  # Ouvre le fichier de log en mode lecture
         lines = f.readlines()  # Lit toutes les lignes du fichier
     
-    print(f"Nombre de threads : {num_threads}")  # Affiche le nombre de threads utilisés
-    print(f"Messages par thread : {messages_per_thread}")  # Affiche le nombre de messages par thread
-    print(f"Total de lignes écrites : {len(lines)}")  # Affiche le nombre total de lignes écrites (devrait être 100)
-    print(f"Temps écoulé : {elapsed:.4f}s")  # Affiche le temps écoulé
-    print(f"Temps total passé en attente sur verrous : {metrics['total_lock_wait_time']:.4f}s")  # Affiche le temps d'attente sur verrous
-    print(f"Nombre d'acquisitions de verrous : {metrics['lock_acquire_count']}")  # Affiche le nombre d'acquisitions de verrous
-    print(f"Fichier créé : {log_file}")  # Affiche le nom du fichier créé
-    print()  # Ligne vide pour la lisibilité
+    out.append(f"Nombre de threads : {num_threads}")  # Ajoute au rapport le nombre de threads utilisés
+    out.append(f"Messages par thread : {messages_per_thread}")  # Ajoute au rapport le nombre de messages par thread
+    out.append(f"Total de lignes écrites : {len(lines)}")  # Ajoute au rapport le nombre total de lignes écrites (devrait être 100)
+    out.append(f"Temps écoulé : {elapsed:.4f}s")  # Ajoute au rapport le temps écoulé
+    out.append(f"Temps total passé en attente sur verrous : {metrics['total_lock_wait_time']:.4f}s")  # Ajoute au rapport le temps d'attente sur verrous
+    out.append(f"Nombre d'acquisitions de verrous : {metrics['lock_acquire_count']}")  # Ajoute au rapport le nombre d'acquisitions de verrous
+    out.append(f"Fichier créé : {log_file}")  # Ajoute au rapport le nom du fichier créé
+    out.append("")  # Ligne vide pour la lisibilité
+    sys.stdout.write("\n".join(out) + "\n")  # Affiche tout le rapport en une seule écriture
 
 
 def demonstrate_semaphore():
@@ -168,47 +242,50 @@ def demonstrate_semaphore():
     de threads pouvant accéder simultanément à une ressource, tout en
     permettant plus d'un accès à la fois (contrairement au Lock).
     """
-    print("=" * 60)  # Affiche une ligne de séparation
-    print("DÉMONSTRATION : Sémaphore (limitation d'accès concurrent)")  # Affiche le titre de la démonstration
-    print("=" * 60)  # Affiche une ligne de séparation
+    out = []  # Lignes du rapport, affichées en une seule écriture à la fin
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
+    out.append("DÉMONSTRATION : Sémaphore (limitation d'accès concurrent)")  # Ajoute au rapport le titre de la démonstration
+    out.append("=" * 60)  # Ajoute au rapport une ligne de séparation
     
     log_file = "demo_semaphore.log"  # Nom du fichier de log à créer
     max_concurrent = 2  # Seulement 2 threads peuvent écrire simultanément
-    logger = SemaphoreFileLogger(log_file, max_concurrent)  # Crée un logger avec sémaphore (2 accès max)
     num_threads = 5  # Nombre de threads à créer
     messages_per_thread = 10  # Nombre de messages que chaque thread écrira
     
-    def write_messages(thread_id):  # Fonction exécutée par chaque thread
-        for i in range(messages_per_thread):  # Boucle pour écrire plusieurs messages
-            logger.log(f"Thread-{thread_id}: Message-{i}")  # Écrit un message dans le log (protégé par Sémaphore)
-            time.sleep(0.01)  # Simule un traitement (pause de 10ms)
-    
-    threads = []  # Liste pour stocker les objets threads
-    start_time = time.perf_counter()  # Enregistre le temps de début
-    
-    for i in range(num_threads):  # Crée num_threads threads
-        t = threading.Thread(target=write_messages, args=(i,))  # Crée un thread qui exécutera write_messages avec l'ID i
-        t.start()  # Démarre le thread
-        threads.append(t)  # Ajoute le thread à la liste
-    
-    for t in threads:  # Parcourt tous les threads
-        t.join()  # Attend que chaque thread se termine
-    
-    elapsed = time.perf_counter() - start_time  # Calcule le temps écoulé
+    with SemaphoreFileLogger(log_file, max_concurrent) as logger:  # Crée un logger avec sémaphore (2 accès max, fichier ouvert une seule fois)
+        def write_messages(thread_id):  # Fonction exécutée par chaque thread
+            for i in range(messages_per_thread):  # Boucle pour écrire plusieurs messages
+                logger.log(f"Thread-{thread_id}: Message-{i}")  # Écrit un message dans le log (protégé par Sémaphore)
+                time.sleep(0.01)  # Simule un traitement (pause de 10ms)
+        
+        threads = []  # Liste pour stocker les objets threads
+        start_time = time.perf_counter()  # Enregistre le temps de début
+        
+        for i in range(num_threads):  # Crée num_threads threads
+            t = threading.Thread(target=write_messages, args=(i,))  # Crée un thread qui exécutera write_messages avec l'ID i
+            t.start()  # Démarre le thread
+            threads.append(t)  # Ajoute le thread à la liste
+        
+        for t in threads:  # Parcourt tous les threads
+            t.join()  # Attend que chaque thread se termine
+        
+        elapsed = time.perf_counter() - start_time  # Calcule le temps écoulé
+    # Le fichier est vidé et fermé à la sortie du bloc with
     metrics = logger.get_metrics()  # Récupère les métriques de synchronisation du logger
     
     with open(log_file, 'r') as f:  # Ouvre le fichier de log en mode lecture
         lines = f.readlines()  # Lit toutes les lignes du fichier
     
-    print(f"Nombre de threads : {num_threads}")  # Affiche le nombre de threads utilisés
-    print(f"Accès concurrent maximum : {max_concurrent}")  # Affiche le nombre maximum d'accès simultanés
-    print(f"Messages par thread : {messages_per_thread}")  # Affiche le nombre de messages par thread
-    print(f"Total de lignes écrites : {len(lines)}")  # Affiche le nombre total de lignes écrites (devrait être 50)
-    print(f"Temps écoulé : {elapsed:.4f}s")  # Affiche le temps écoulé
-    print(f"Temps total passé en attente sur sémaphore : {metrics['total_semaphore_wait_time']:.4f}s")  # Affiche le temps d'attente sur sémaphore
-    print(f"Nombre de contentions : {metrics['contention_count']}")  # Affiche le nombre de contentions
-    print(f"Fichier créé : {log_file}")  # Affiche le nom du fichier créé
-    print()  # Ligne vide pour la lisibilité
+    out.append(f"Nombre de threads : {num_threads}")  # Ajoute au rapport le nombre de threads utilisés
+    out.append(f"Accès concurrent maximum : {max_concurrent}")  # Ajoute au rapport le nombre maximum d'accès simultanés
+    out.append(f"Messages par thread : {messages_per_thread}")  # Ajoute au rapport le nombre de messages par thread
+    out.append(f"Total de lignes écrites : {len(lines)}")  # Ajoute au rapport le nombre total de lignes écrites (devrait être 50)
+    out.append(f"Temps écoulé : {elapsed:.4f}s")  # Ajoute au rapport le temps écoulé
+    out.append(f"Temps total passé en attente sur sémaphore : {metrics['total_semaphore_wait_time']:.4f}s")  # Ajoute au rapport le temps d'attente sur sémaphore
+    out.append(f"Nombre de contentions : {metrics['contention_count']}")  # Ajoute au rapport le nombre de contentions
+    out.append(f"Fichier créé : {log_file}")  # Ajoute au rapport le nom du fichier créé
+    out.append("")  # Ligne vide pour la lisibilité
+    sys.stdout.write("\n".join(out) + "\n")  # Affiche tout le rapport en une seule écriture
 
 
 if __name__ == "__main__":  # Vérifie si le script est exécuté directement (pas importé)
@@ -217,7 +294,7 @@ if __name__ == "__main__":  # Vérifie si le script est exécuté directement (p
     
     Cette section est exécutée uniquement si le fichier est lancé directement.
     Elle exécute toutes les démonstrations dans l'ordre pour montrer :
-    1. Les race conditions (problème)
+    1. Les race conditions (problème), entre threads puis entre processus
     2. La correction avec Lock (solution)
     3. Les zones critiques avec fichiers
     4. L'utilisation de Sémaphores
@@ -230,6 +307,10 @@ if __name__ == "__main__":  # Vérifie si le script est exécuté directement (p
     demonstrate_race_condition()  # Exécute la démonstration de race condition
     time.sleep(1)  # Attend 1 seconde avant la prochaine démonstration
     
+    # 1 bis. Race condition entre processus (sans GIL)
+    demonstrate_race_condition_mp()  # Exécute la démonstration de race condition avec multiprocessing
+    time.sleep(1)  # Attend 1 seconde avant la prochaine démonstration
+    
     # 2. Correction avec Lock
     demonstrate_thread_safe_counter()  # Exécute la démonstration de compteur thread-safe
     time.sleep(1)  # Attend 1 seconde avant la prochaine démonstration
@@ -0,0 +1,181 @@
+# src/io_uring_writer.py
+"""
+Écriture groupée des images converties (io_uring sous Linux, optionnel).
+
+Ce module permet de remplacer la sauvegarde synchrone de chaque image par une
+mise en file : les images sont encodées en mémoire par l'appelant, puis les
+écritures sont soumises par lots. Avec le binding Python de liburing, un lot
+entier est soumis au noyau en un seul appel io_uring_enter ; sinon, les
+écritures du lot sont faites avec os.write (même résultat, sans io_uring).
+
+Rôle détaillé :
+- Met en file des couples (chemin, données) dans le thread appelant
+- Soumet automatiquement un lot quand la file atteint batch_size
+- Vide toutes les files restantes avec flush() (appelé après chaque expérience),
+  qui retourne les erreurs d'écriture par chemin (une image en échec n'interrompt
+  ni son lot ni l'expérience)
+- Chaque thread a sa propre file : aucun verrou sur le chemin d'écriture
+- Dans un processus fils (fork), écrit directement (les files du parent ne
+  seraient jamais vidées)
+"""
+import os  # Module pour les opérations bas niveau sur les fichiers (open, write, close)
+import threading  # Module pour les files par thread (threading.local)
+from typing import List, Tuple, Dict  # Types pour les annotations de type
+
+try:  # Le binding liburing est optionnel (Linux uniquement)
+    import liburing  # Binding Python de liburing (io_uring)
+except ImportError:  # Si liburing n'est pas installé (ou hors Linux)
+    liburing = None  # Repli sur os.write
+
+AVAILABLE = liburing is not None  # Indique si les soumissions passent par io_uring
+
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC  # Ouverture équivalente au mode 'wb'
+
+
+def _write_all(fd: int, data, offset: int = 0):
+    """Écrit data[offset:] dans fd avec os.write, en reprenant les écritures partielles"""
+    view = memoryview(data)  # Vue sans copie sur les données
+    while offset < len(view):  # Tant que tout n'est pas écrit
+        offset += os.write(fd, view[offset:])  # Écrit la suite et avance du nombre d'octets écrits
+
+
+def _error_text(e: OSError) -> str:
+    """Message d'erreur d'une écriture (même forme que les résultats de conversion)"""
+    return f"{type(e).__name__}: {e}"  # Type et message de l'exception
+
+
+def _submit_uring(fds: List[int], items: List[Tuple[str, object]], errors: Dict[str, str]):
+    """
+    Soumet un pwrite par fichier dans un anneau io_uring et attend toutes les complétions.
+
+    Une écriture partielle (rare sur fichier régulier) est terminée avec os.write.
+    Les erreurs sont ajoutées à errors, par chemin.
+    """
+    ring = liburing.io_uring()  # Anneau io_uring (un par lot : pas de partage entre threads)
+    cqe = liburing.io_uring_cqe()  # Entrée de complétion réutilisée
+    liburing.io_uring_queue_init(len(items), ring, 0)  # Crée un anneau de la taille du lot
+    try:  # Libère l'anneau même en cas d'erreur
+        for i, (fd, (_, data)) in enumerate(zip(fds, items)):  # Prépare une requête d'écriture par fichier
+            sqe = liburing.io_uring_get_sqe(ring)  # Entrée de soumission libre
+            liburing.io_uring_prep_write(sqe, fd, data, len(data), 0)  # pwrite(fd, data, len, offset=0)
+            sqe.user_data = i  # Index du fichier pour retrouver la complétion
+        liburing.io_uring_submit_and_wait(ring, len(items))  # Un seul io_uring_enter pour tout le lot
+        for _ in items:  # Récupère toutes les complétions
+            liburing.io_uring_wait_cqe(ring, cqe)  # Complétion suivante (déjà disponible)
+            i, res = cqe.user_data, cqe.res  # Index du fichier et résultat de l'écriture
+            liburing.io_uring_cqe_seen(ring, cqe)  # Marque la complétion comme traitée
+            if res < 0:  # Erreur renvoyée par le noyau (-errno)
+                errors[items[i][0]] = _error_text(OSError(-res, os.strerror(-res), items[i][0]))  # Erreur de ce fichier seulement
+            elif res < len(items[i][1]):  # Écriture partielle
+                try:  # Termine l'écriture de manière synchrone
+                    _write_all(fds[i], items[i][1], res)  # Écrit la suite
+                except OSError as e:  # Erreur sur ce fichier
+                    errors[items[i][0]] = _error_text(e)  # Erreur de ce fichier seulement
+    finally:  # Toujours libérer l'anneau
+        liburing.io_uring_queue_exit(ring)  # Détruit l'anneau
+
+
+class BatchedFileWriter:
+    """
+    Écrivain de fichiers par lots.
+
+    enqueue() met une écriture en file dans la file du thread appelant ; le lot
+    est soumis dès que batch_size écritures sont en attente. flush() soumet
+    toutes les écritures restantes de tous les threads : il doit être appelé
+    une fois les threads de travail terminés (par exemple après chaque expérience).
+
+    Une écriture en échec ne lève pas d'exception dans le thread qui a rempli le
+    lot (l'image en cours n'y est pour rien) : l'erreur est gardée par chemin et
+    retournée par le flush() suivant.
+    """
+
+    # Initialise l'écrivain par lots
+    def __init__(self, batch_size: int = 32):
+        """Initialise l'écrivain avec la taille de lot donnée"""
+        self.batch_size = batch_size  # Nombre d'écritures par soumission
+        self._pid = os.getpid()  # Processus propriétaire des files
+        self._local = threading.local()  # File propre à chaque thread
+        self._queues = []  # Liste de toutes les files (pour flush depuis le thread principal)
+        self._reg_lock = threading.Lock()  # Protège l'enregistrement d'une nouvelle file (une fois par thread) et les erreurs
+        self._errors = {}  # Erreurs d'écriture {chemin: message} depuis le dernier flush()
+
+    # Met une écriture en file
+    def enqueue(self, path, data):
+        """
+        Met en file l'écriture de data (bytes ou memoryview) dans le fichier path.
+
+        Les données ne doivent plus être modifiées jusqu'à la soumission du lot.
+        """
+        if os.getpid() != self._pid:  # Processus fils : ses files ne seraient jamais vidées par le parent
+            errors = self._submit([(os.fspath(path), data)])  # Écrit immédiatement
+            if errors:  # Écriture de cette image en échec
+                raise OSError(errors[os.fspath(path)])  # Signalée à la conversion de cette image (le parent ne verrait pas l'erreur)
+            return  # Terminé
+        q = getattr(self._local, "queue", None)  # File du thread appelant
+        if q is None:  # Premier appel depuis ce thread
+            q = self._local.queue = []  # Crée la file du thread
+            with self._reg_lock:  # Enregistre la file (une seule fois par thread)
+                self._queues.append(q)  # Ajoute la file à la liste globale
+        q.append((os.fspath(path), data))  # Met l'écriture en file
+        if len(q) >= self.batch_size:  # La file est pleine
+            self._drain(q)  # Soumet le lot
+
+    # Soumet toutes les écritures en attente
+    def flush(self) -> Dict[str, str]:
+        """
+        Soumet les écritures en attente de tous les threads (à appeler quand ils sont terminés).
+
+        Retourne les erreurs d'écriture {chemin: message} depuis le flush() précédent
+        (vide si tout a été écrit).
+        """
+        with self._reg_lock:  # Copie la liste des files
+            queues = list(self._queues)  # Files enregistrées jusqu'ici
+        for q in queues:  # Vide chaque file
+            self._drain(q)  # Soumet le reste de la file
+        with self._reg_lock:  # Récupère les erreurs de tous les lots
+            errors, self._errors = self._errors, {}  # Erreurs de cette période, remises à zéro
+        return errors  # Erreurs par chemin
+
+    # Vide une file en soumettant son contenu
+    def _drain(self, q: list):
+        """Soumet le contenu de la file q puis la vide"""
+        if q:  # Rien à faire si la file est vide
+            items = q[:]  # Copie du lot
+            del q[:]  # Vide la file
+            errors = self._submit(items)  # Soumet le lot
+            if errors:  # Écritures en échec dans ce lot
+                with self._reg_lock:  # Plusieurs threads peuvent vider leur file en même temps
+                    self._errors.update(errors)  # Gardées pour le prochain flush()
+
+    # Soumet un lot d'écritures
+    @staticmethod
+    def _submit(items: List[Tuple[str, object]]) -> Dict[str, str]:
+        """
+        Ouvre les fichiers du lot, soumet les écritures (io_uring ou os.write) puis ferme les fichiers.
+
+        Retourne les erreurs {chemin: message} : un fichier en échec n'empêche pas
+        l'écriture des autres fichiers du lot.
+        """
+        errors = {}  # Erreurs par chemin
+        fds = []  # Descripteurs ouverts pour ce lot
+        opened = []  # Écritures dont le fichier a pu être ouvert
+        try:  # Ferme les descripteurs même en cas d'erreur
+            for item in items:  # Ouvre chaque fichier de destination
+                try:  # Dossier absent, droits insuffisants...
+                    fds.append(os.open(item[0], _OPEN_FLAGS, 0o666))  # Ouvre en écriture (création/troncature)
+                except OSError as e:  # Fichier impossible à ouvrir
+                    errors[item[0]] = _error_text(e)  # Erreur de ce fichier seulement
+                    continue  # Fichier suivant
+                opened.append(item)  # Écriture à soumettre
+            if liburing is not None and opened:  # io_uring disponible
+                _submit_uring(fds, opened, errors)  # Une seule soumission pour tout le lot
+            else:  # Repli sans io_uring
+                for fd, (path, data) in zip(fds, opened):  # Écrit chaque fichier
+                    try:  # Disque plein, quota...
+                        _write_all(fd, data)  # Écriture complète avec os.write
+                    except OSError as e:  # Erreur sur ce fichier
+                        errors[path] = _error_text(e)  # Erreur de ce fichier seulement
+        finally:  # Toujours fermer les descripteurs
+            for fd in fds:  # Parcourt les descripteurs ouverts
+                os.close(fd)  # Ferme le descripteur
+        return errors  # Erreurs par chemin (vide si tout a été écrit)
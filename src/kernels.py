@@ -0,0 +1,73 @@
+# src/kernels.py
+"""
+Noyaux de calcul compilés avec Numba (optionnels).
+
+Ce module contient les boucles de calcul pixel par pixel compilées en code natif
+par Numba. Les noyaux sont compilés en mode nopython avec nogil=True : pendant
+leur exécution le GIL est libéré, ce qui permet aux versions threading et
+ThreadPoolExecutor de convertir plusieurs images réellement en parallèle.
+
+Rôle détaillé :
+- Fournit rgb_to_gray : conversion RGB -> niveaux de gris en virgule fixe
+- Fournit rgb_to_gray_batch : même conversion pour un lot d'images de tailles
+  quelconques rangées à plat dans un seul tampon (parallel=True, prange sur les images)
+- Compile et met en cache (cache=True) les noyaux au premier import
+- Pré-chauffe rgb_to_gray sur une petite image pour que le coût de compilation
+  ne soit pas compté dans les mesures
+- Expose AVAILABLE = False si Numba ou NumPy ne sont pas installés
+"""
+try:  # Numba et NumPy sont optionnels
+    import numpy as np  # Module de calcul numérique sur tableaux
+    from numba import njit, prange  # Compilateur JIT de Numba et boucle parallèle
+except ImportError:  # Si Numba ou NumPy ne sont pas installés
+    np = None  # Pas de NumPy
+    njit = prange = None  # Pas de compilation JIT
+
+AVAILABLE = njit is not None  # Indique si les noyaux compilés sont utilisables
+
+
+if AVAILABLE:  # Définit les noyaux uniquement si Numba est disponible
+    # Pas de parallel=True : le parallélisme vient des threads/processus de chaque
+    # version, et le pool de threads interne de Numba (workqueue) ne supporte pas
+    # les appels concurrents depuis plusieurs threads Python.
+    # Pas de spécialisation par taille (H, W constants à la compilation) : mesuré sur
+    # l'image 1920x1278, le noyau générique est aussi rapide (~2,4 ms) et chaque
+    # nouvelle taille coûterait ~0,3 s de compilation non mise en cache.
+    @njit(nogil=True, fastmath=True, cache=True)
+    def rgb_to_gray(rgb, out):
+        """
+        Convertit un tableau RGB (H, W, 3) uint8 en niveaux de gris dans out (H, W) uint8.
+
+        Utilise la luminance en virgule fixe Y = (77*R + 150*G + 29*B) >> 8,
+        identique au backend NumPy de processor.py.
+        """
+        for y in range(rgb.shape[0]):  # Parcourt les lignes
+            for x in range(rgb.shape[1]):  # Parcourt les colonnes
+                out[y, x] = (77 * rgb[y, x, 0] + 150 * rgb[y, x, 1] + 29 * rgb[y, x, 2]) >> 8  # Luminance du pixel
+
+    # parallel=True ici : ce noyau est appelé depuis un seul thread Python (version
+    # numba_batch), la limite du pool workqueue ci-dessus ne s'applique donc pas.
+    @njit(parallel=True, nogil=True, fastmath=True, cache=True)
+    def rgb_to_gray_batch(rgb_flat, offsets, n_pixels, out_flat):
+        """
+        Convertit un lot d'images RGB rangées à plat en niveaux de gris.
+
+        L'image i occupe rgb_flat[3*offsets[i] : 3*(offsets[i] + n_pixels[i])]
+        (pixels RGB consécutifs) et son résultat out_flat[offsets[i] : offsets[i] + n_pixels[i]].
+        Les images sont réparties entre les threads de Numba (prange) : un seul
+        appel remplace une tâche Python par image.
+        """
+        for i in prange(offsets.shape[0]):  # Une image par itération parallèle
+            base = offsets[i]  # Premier pixel de l'image dans le tampon
+            for k in range(n_pixels[i]):  # Parcourt les pixels de l'image
+                j = 3 * (base + k)  # Position du pixel RGB
+                out_flat[base + k] = (77 * rgb_flat[j] + 150 * rgb_flat[j + 1] + 29 * rgb_flat[j + 2]) >> 8  # Luminance du pixel
+
+    # Pré-chauffage : compile les noyaux (ou les charge depuis le cache) dès l'import
+    rgb_to_gray(np.zeros((4, 4, 3), dtype=np.uint8), np.empty((4, 4), dtype=np.uint8))  # Appel sur une image 4x4 factice
+    # rgb_to_gray_batch n'est pas pré-chauffé ici : son premier appel démarre le pool
+    # de threads de Numba, ce qu'il faut éviter dans un processus parent qui va forker.
+    # La version numba_batch le pré-chauffe à son premier appel.
+else:  # Numba indisponible
+    rgb_to_gray = None  # Aucun noyau compilé
+    rgb_to_gray_batch = None  # Aucun noyau compilé
@@ -9,16 +9,160 @@ Rôle détaillé :
 - Mesure le temps total d'exécution d'une fonction
 - Calcule le temps moyen par image
 - Calcule le débit (images par seconde)
+- Agrège les temps de traitement par image (moyenne, percentiles, échecs) en une
+  réduction NumPy sur un tableau contigu
 - Collecte les métriques de synchronisation (temps d'attente, contentions)
 - Exporte les résultats au format JSON et CSV
 - Inclut optionnellement le monitoring CPU avec psutil
 """
 import time  # Module pour mesurer le temps (perf_counter pour haute précision)
-import psutil  # Module pour le monitoring système (CPU, mémoire) - optionnel
-from typing import Callable, List, Dict, Any  # Types pour les annotations de type
-from .common import save_results_json, save_results_csv, ensure_dirs, safe_filename  # Import des fonctions utilitaires
+from typing import Callable, List, Dict, Any, Iterator  # Types pour les annotations de type
+from .common import save_results_json, save_metrics_csv, ensure_dirs, safe_filename, default_workers  # Import des fonctions utilitaires (et du nombre de cœurs autorisés)
 import os  # Module pour les opérations sur le système de fichiers
-from statistics import mean  # Import de mean (non utilisé directement mais gardé pour compatibilité)
+from statistics import fmean  # Moyenne en un seul passage (somme exacte via math.fsum)
+
+try:  # NumPy est optionnel (statistiques des temps par image)
+    import numpy as np  # Module de calcul numérique sur tableaux
+except ImportError:  # Si NumPy n'est pas installé
+    np = None  # Repli sur fmean et un tri Python
+
+psutil = None  # Module psutil (monitoring système, optionnel), importé seulement à la première utilisation
+
+_SYNC_KEYS = (  # Métriques de synchronisation exportées dans le CSV (préfixées par "sync_"), dans l'ordre d'écriture
+    "total_lock_wait_time",  # Temps total d'attente sur verrous
+    "avg_lock_wait_time",  # Temps moyen d'attente sur verrous
+    "max_lock_wait_time",  # Temps maximum d'attente sur verrous
+    "total_semaphore_wait_time",  # Temps total d'attente sur sémaphores
+    "avg_semaphore_wait_time",  # Temps moyen d'attente sur sémaphores
+    "lock_acquire_count",  # Nombre d'acquisitions de verrous
+    "semaphore_acquire_count",  # Nombre d'acquisitions de sémaphores
+    "contention_count",  # Nombre de contentions
+    "total_wait_time"  # Temps total d'attente (verrous + sémaphores)
+)
+_STREAM_RUNS = 50_000  # Au-delà de ce nombre de résultats individuels, le JSON est encodé au fil de l'eau (mémoire bornée)
+
+_PROC_STAT_FD = None  # Descripteur gardé ouvert sur /proc/self/stat (Linux), ouvert à la première lecture
+_PROC = None  # Objet psutil.Process du processus courant (repli hors Linux), créé à la première lecture
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100  # Ticks d'horloge par seconde (unités de /proc/self/stat)
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096  # Taille d'une page mémoire en octets (unité du rss)
+
+
+def _load_psutil():
+    """
+    Importe psutil à la première utilisation et le retourne (None s'il n'est pas installé).
+    
+    L'import est différé car psutil charge de nombreux sous-modules au démarrage,
+    alors que la plupart des mesures n'utilisent pas le sampling CPU.
+    """
+    global psutil  # Déclare qu'on modifie la variable globale
+    if psutil is None:  # Premier appel : tente l'import
+        try:  # psutil est optionnel
+            import psutil as _psutil  # Import différé de psutil
+        except ImportError:  # Si psutil n'est pas installé
+            return None  # Pas de monitoring via psutil
+        psutil = _psutil  # Mémorise le module pour les appels suivants
+    return psutil  # Retourne le module chargé
+
+
+def _live_children_ticks() -> int:
+    """
+    Retourne le temps CPU (utime + stime, en ticks) des enfants vivants du processus courant.
+    
+    Parcourt /proc/<pid>/stat et garde les processus dont le parent est le
+    processus courant (/proc/self/task/*/children n'existe pas sur tous les
+    noyaux). Appelée avant et après la mesure, hors du temps mesuré.
+    """
+    me = os.getpid()  # Processus parent recherché
+    ticks = 0  # Somme des temps CPU des enfants
+    for name in os.listdir("/proc"):  # Un dossier par processus
+        if not name.isdigit():  # Entrées qui ne sont pas des processus
+            continue  # Entrée suivante
+        try:  # Le processus peut disparaître pendant la lecture
+            with open(f"/proc/{name}/stat", "rb") as f:  # Statistiques du processus
+                raw = f.read()  # Une seule lecture
+        except OSError:  # Processus terminé entre-temps
+            continue  # Processus suivant
+        fields = raw[raw.rindex(b")") + 2:].split()  # Champs après le nom du processus
+        if int(fields[1]) == me:  # ppid (champ 4) : enfant du processus courant
+            ticks += int(fields[11]) + int(fields[12])  # utime + stime (champs 14 et 15)
+    return ticks  # Temps CPU des enfants vivants
+
+
+def _read_usage():
+    """
+    Retourne (temps_cpu, rss, vms) du processus courant, ou None si indisponible.
+    
+    temps_cpu est le temps CPU consommé par le processus, ses enfants terminés et
+    ses enfants encore vivants (en secondes) ; rss et vms sont la mémoire résidente
+    et virtuelle (en octets). Les enfants vivants comptent : les workers d'un pool
+    de processus partagé entre expériences (--reuse-pools) ne sont jamais attendus,
+    leur temps n'apparaîtrait donc pas dans cutime/cstime.
+    Sous Linux, lit directement /proc/self/stat (un seul pread sur un descripteur
+    gardé ouvert) au lieu de passer par psutil. Ailleurs, utilise psutil avec
+    Process.oneshot() (les valeurs sont lues en une seule fois).
+    """
+    global _PROC_STAT_FD  # Déclare qu'on modifie la variable globale
+    global _PROC  # Déclare qu'on modifie l'objet psutil.Process mémorisé
+    if _PROC_STAT_FD is None and os.path.exists("/proc/self/stat"):  # Premier appel sous Linux : ouvre le fichier une seule fois
+        _PROC_STAT_FD = os.open("/proc/self/stat", os.O_RDONLY)  # Garde le descripteur ouvert pour les lectures suivantes
+    if _PROC_STAT_FD is not None:  # Lecture directe depuis /proc
+        raw = os.pread(_PROC_STAT_FD, 4096, 0)  # Relit le contenu depuis le début (un seul appel système)
+        fields = raw[raw.rindex(b")") + 2:].split()  # Champs après le nom du processus (qui peut contenir des espaces), à partir de l'état (champ 3)
+        ticks = int(fields[11]) + int(fields[12]) + int(fields[13]) + int(fields[14])  # utime + stime + cutime + cstime (champs 14 à 17), en ticks d'horloge
+        ticks += _live_children_ticks()  # Enfants encore vivants (workers de pools partagés)
+        return (  # Temps CPU et mémoire lus dans le même appel
+            ticks / _CLK_TCK,  # Convertit les ticks d'horloge en secondes
+            int(fields[21]) * _PAGE_SIZE,  # rss (champ 24), en pages converties en octets
+            int(fields[20])  # vsize (champ 23), déjà en octets
+        )
+    if _load_psutil():  # Repli sur psutil hors Linux (importé à la demande)
+        if _PROC is None:  # Premier appel : crée l'objet Process une seule fois
+            _PROC = psutil.Process(os.getpid())  # Processus courant
+        with _PROC.oneshot():  # Lit les informations du processus une seule fois pour les deux appels
+            t = _PROC.cpu_times()  # Temps CPU du processus courant
+            m = _PROC.memory_info()  # Mémoire du processus courant
+        live = 0.0  # Temps CPU des enfants encore vivants (workers de pools partagés)
+        for child in _PROC.children():  # Enfants directs vivants
+            try:  # Un enfant peut se terminer pendant la lecture
+                c = child.cpu_times()  # Temps CPU de l'enfant
+                live += c.user + c.system  # User + system
+            except psutil.Error:  # Enfant déjà terminé
+                continue  # Compté dans children_user/children_system une fois attendu
+        return t.user + t.system + t.children_user + t.children_system + live, m.rss, m.vms  # Processus + enfants terminés et vivants
+    return None  # Aucune source disponible
+
+
+def _run_time(run: Dict) -> float:
+    """Temps de traitement d'un résultat individuel ("processing_time", ou "elapsed" pour les workers threading)"""
+    t = run.get("processing_time")  # Temps de traitement (mono, pools, conversions par lot)
+    return t if t is not None else run.get("elapsed", 0.0)  # Temps mesuré par les workers threading (0.0 si absent)
+
+
+# Agrège les temps de traitement individuels (un résultat par image)
+def _run_stats(runs: List[Dict], percentiles=(50, 95)) -> Dict[str, Any]:
+    """
+    Calcule la moyenne, les percentiles et le maximum des temps de traitement par
+    image, ainsi que le nombre d'échecs.
+    
+    Les champs utiles sont copiés une seule fois dans des tableaux NumPy contigus
+    (np.fromiter, taille connue) : les réductions se font ensuite en C au lieu de
+    boucles Python sur la liste de dictionnaires. Repli sur fmean et un tri sans NumPy.
+    Retourne un dictionnaire vide s'il n'y a aucun résultat individuel.
+    """
+    n = len(runs)  # Nombre de résultats individuels
+    if not n:  # Aucun résultat (fonction qui ne renvoie pas de runs)
+        return {}  # Rien à agréger
+    if np is not None:  # Réductions vectorisées
+        t = np.fromiter((_run_time(r) for r in runs), dtype=np.float64, count=n)  # Temps par image
+        ok = np.fromiter((r.get("success", True) for r in runs), dtype=np.bool_, count=n)  # Succès par image
+        values = np.percentile(t, percentiles)  # Tous les percentiles en un appel
+        stats = {"run_time_mean": float(t.mean()), "run_time_max": float(t.max()), "n_failed": int(n - np.count_nonzero(ok))}  # Moyenne, maximum et échecs
+    else:  # Repli sans NumPy : tri puis rang le plus proche
+        t = sorted(_run_time(r) for r in runs)  # Temps triés
+        values = [t[min(n - 1, int(round(q / 100 * (n - 1))))] for q in percentiles]  # Rang de chaque percentile
+        stats = {"run_time_mean": fmean(t), "run_time_max": t[-1], "n_failed": sum(not r.get("success", True) for r in runs)}  # Moyenne, maximum et échecs
+    stats.update({f"run_time_p{q:g}": float(v) for q, v in zip(percentiles, values)})  # Ajoute les percentiles
+    return stats  # Retourne les statistiques par image
 
 
 # Mesure les performances d'exécution d'une fonction (temps total, temps moyen, débit)
@@ -39,27 +183,23 @@ def measure_run(func: Callable, *args, **kwargs) -> Dict[str, Any]:
         Dictionnaire avec toutes les métriques de performance et de synchronisation
     """
     # CPU sampling (optionnel) si psutil installé
-    cpu_samples = []  # Liste pour stocker les échantillons d'utilisation CPU
+    # Mesure par différence de temps CPU du processus (avant/après) : pas de thread
+    # d'échantillonnage qui entrerait en concurrence avec le code mesuré pour le GIL
+    cpu_samples = []  # Liste des échantillons d'utilisation CPU (un seul échantillon : moyenne sur l'exécution)
     sampling = kwargs.pop("cpu_sampling", False)  # Récupère l'option de sampling CPU (retire de kwargs)
-    sample_interval = kwargs.pop("sample_interval", 0.05)  # Intervalle d'échantillonnage en secondes (retire de kwargs)
-    
-    if sampling and psutil:  # Si le sampling CPU est activé et que psutil est disponible
-        _stop = False  # Variable de contrôle pour arrêter le thread de sampling
-        def _sample():  # Fonction interne pour échantillonner le CPU dans un thread séparé
-            while not _stop:  # Boucle jusqu'à ce que _stop soit True
-                cpu_samples.append(psutil.cpu_percent(interval=None))  # Ajoute l'utilisation CPU actuelle à la liste
-                time.sleep(sample_interval)  # Attend avant le prochain échantillon
-        import threading  # Import de threading pour créer un thread de sampling
-        samp_thread = threading.Thread(target=_sample, daemon=True)  # Crée un thread daemon pour le sampling
-        samp_thread.start()  # Démarre le thread de sampling
+    kwargs.pop("sample_interval", None)  # Ancienne option d'intervalle d'échantillonnage (ignorée, retirée de kwargs pour compatibilité)
+    
+    usage0 = _read_usage() if sampling else None  # Temps CPU et mémoire avant l'exécution (None si sampling désactivé ou indisponible)
+    rss = vms = None  # Mémoire du processus après l'exécution (seulement avec le sampling)
     
     t0 = time.perf_counter()  # Enregistre le temps de début (haute précision)
     res = func(*args, **kwargs)  # Exécute la fonction à mesurer avec ses arguments
     total = time.perf_counter() - t0  # Calcule le temps total (temps actuel - temps de début)
     
-    if sampling and psutil:  # Si le sampling CPU était activé
-        _stop = True  # Indique au thread de sampling de s'arrêter
-        time.sleep(sample_interval * 1.1)  # Attend un peu plus que l'intervalle pour laisser le thread se terminer
+    if usage0 is not None and total > 0:  # Si le sampling CPU était activé (et évite une division par zéro)
+        cpu1, rss, vms = _read_usage()  # Temps CPU et mémoire après l'exécution (une seule lecture)
+        cpu_used = cpu1 - usage0[0]  # Temps CPU consommé pendant l'exécution (processus + enfants, user + system)
+        cpu_samples.append(100.0 * cpu_used / total / default_workers())  # Utilisation CPU moyenne en % des cœurs autorisés (même base que le nombre de workers)
     
     n = res.get("n_images", len(res.get("runs", [])))  # Récupère le nombre d'images (depuis n_images ou calcule depuis runs)
     avg = total / n if n else None  # Calcule le temps moyen par image (temps total / nombre d'images)
@@ -81,7 +221,10 @@ def measure_run(func: Callable, *args, **kwargs) -> Dict[str, Any]:
         "n_images": n,  # Nombre d'images traitées
         "avg_time_per_image": avg,  # Temps moyen par image en secondes
         "throughput_img_per_sec": throughput,  # Débit en images par seconde
+        "run_stats": _run_stats(res.get("runs", ())),  # Temps de traitement par image agrégés (moyenne, percentiles, échecs)
         "cpu_samples": cpu_samples,  # Liste des échantillons d'utilisation CPU
+        "rss_bytes": rss,  # Mémoire résidente du processus après l'exécution (None sans sampling)
+        "vms_bytes": vms,  # Mémoire virtuelle du processus après l'exécution (None sans sampling)
         "raw_result": res,  # Résultat brut de la fonction (pour référence)
         "sync_metrics": all_sync_metrics  # Métriques de synchronisation combinées
     }
@@ -96,7 +239,7 @@ def export_results(base_path: str, name: str, data: Dict):
     Inclut les métriques de synchronisation dans les fichiers CSV.
     
     Cette fonction sauvegarde les résultats de mesure dans deux formats :
-    - JSON : format complet avec toutes les données
+    - JSON : format complet (compact, sans indentation) avec toutes les données
     - CSV : format tabulaire avec les métriques principales et de synchronisation
     
     Args:
@@ -104,32 +247,35 @@ def export_results(base_path: str, name: str, data: Dict):
         name: Nom de base pour les fichiers (sans extension)
         data: Dictionnaire contenant toutes les métriques à exporter
     """
-    os.makedirs(base_path, exist_ok=True)  # Crée le dossier de base s'il n'existe pas
+    ensure_dirs(base_path)  # Crée le dossier de base s'il n'existe pas (une seule fois par dossier)
     
     # Sauvegarde JSON complète
-    save_results_json(os.path.join(base_path, f"{name}.json"), data)  # Sauvegarde toutes les données au format JSON
+    stream = len(data.get("raw_result", {}).get("runs", ())) > _STREAM_RUNS  # Très gros résultat : encodage au fil de l'eau
+    save_results_json(os.path.join(base_path, f"{name}.json"), data, stream=stream, compact=True)  # Sauvegarde toutes les données au format JSON compact (liste des runs : rapide et plus petit)
     
-    # Sauvegarde CSV avec métriques principales
+    # Sauvegarde CSV avec métriques principales (lignes produites à la demande)
     headers = ["metric", "value"]  # En-têtes du fichier CSV (métrique, valeur)
-    rows = [  # Liste des lignes de données
-        ["total_time", data["total_time"]],  # Temps total d'exécution
-        ["n_images", data["n_images"]],  # Nombre d'images traitées
-        ["avg_time_per_image", data["avg_time_per_image"]],  # Temps moyen par image
-        ["throughput_img_per_sec", data["throughput_img_per_sec"]],  # Débit en images/seconde
-        ["cpu_sample_mean", (sum(data["cpu_samples"])/len(data["cpu_samples"])) if data["cpu_samples"] else None]  # Utilisation CPU moyenne (si échantillons disponibles)
-    ]
+    save_metrics_csv(os.path.join(base_path, f"{name}_summary.csv"), headers, _summary_rows(data))  # Sauvegarde les métriques au format CSV (lignes métrique/valeur, formatage direct)
+
+
+# Produit les lignes (métrique, valeur) du CSV de résumé une par une
+def _summary_rows(data: Dict) -> Iterator[List[Any]]:
+    """
+    Génère les lignes du CSV de résumé (métriques principales puis de synchronisation).
+    
+    Générateur : les lignes sont produites au fil de l'écriture, sans construire
+    de liste intermédiaire.
+    """
+    yield ["total_time", data["total_time"]]  # Temps total d'exécution
+    yield ["n_images", data["n_images"]]  # Nombre d'images traitées
+    yield ["avg_time_per_image", data["avg_time_per_image"]]  # Temps moyen par image
+    yield ["throughput_img_per_sec", data["throughput_img_per_sec"]]  # Débit en images/seconde
+    for k, v in data.get("run_stats", {}).items():  # Statistiques des temps par image (si disponibles)
+        yield [k, v]  # Une ligne par statistique
+    yield ["cpu_sample_mean", fmean(data["cpu_samples"]) if data["cpu_samples"] else None]  # Utilisation CPU moyenne (si échantillons disponibles)
     
     # Ajouter les métriques de synchronisation si disponibles
     sync_metrics = data.get("sync_metrics", {})  # Récupère les métriques de synchronisation
     if sync_metrics:  # Si des métriques de synchronisation existent
-        rows.append(["sync_total_lock_wait_time", sync_metrics.get("total_lock_wait_time", 0)])  # Temps total d'attente sur verrous
-        rows.append(["sync_avg_lock_wait_time", sync_metrics.get("avg_lock_wait_time", 0)])  # Temps moyen d'attente sur verrous
-        rows.append(["sync_max_lock_wait_time", sync_metrics.get("max_lock_wait_time", 0)])  # Temps maximum d'attente sur verrous
-        rows.append(["sync_total_semaphore_wait_time", sync_metrics.get("total_semaphore_wait_time", 0)])  # Temps total d'attente sur sémaphores
-        rows.append(["sync_avg_semaphore_wait_time", sync_metrics.get("avg_semaphore_wait_time", 0)])  # Temps moyen d'attente sur sémaphores
-        rows.append(["sync_lock_acquire_count", sync_metrics.get("lock_acquire_count", 0)])  # Nombre d'acquisitions de verrous
-        rows.append(["sync_semaphore_acquire_count", sync_metrics.get("semaphore_acquire_count", 0)])  # Nombre d'acquisitions de sémaphores
-        rows.append(["sync_contention_count", sync_metrics.get("contention_count", 0)])  # Nombre de contentions
-        rows.append(["sync_total_wait_time", sync_metrics.get("total_wait_time", 0)])  # Temps total d'attente (verrous + sémaphores)
-    
-    save_results_csv(os.path.join(base_path, f"{name}_summary.csv"), headers, rows)  # Sauvegarde les métriques au format CSV
+        for k in _SYNC_KEYS:  # Parcourt les métriques de synchronisation dans l'ordre d'export
+            yield [f"sync_{k}", sync_metrics.get(k, 0)]  # Une ligne par métrique de synchronisation (0 si absente)
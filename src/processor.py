@@ -9,21 +9,54 @@ y accèdent simultanément.
 
 Rôle détaillé :
 - Charge une image avec la bibliothèque Pillow
-- Convertit l'image en niveaux de gris
+- Convertit l'image en niveaux de gris (Pillow par défaut, NumPy ou Numba en option)
 - Sauvegarde l'image convertie
 - Écrit dans un fichier log (zone critique) avec ou sans synchronisation
-- Gère les erreurs et les tracebacks
+- Gère les erreurs (traceback complet seulement si la variable d'environnement IMG_DEBUG est définie)
 - Mesure le temps de traitement de chaque image
 """
 from PIL import Image, ImageOps  # Import de Pillow pour le traitement d'images
-from pathlib import Path  # Import de Path pour la manipulation de chemins de fichiers
+import os  # Import pour la manipulation de chemins en chaînes (os.path, plus léger que Path)
 import traceback  # Import pour capturer et formater les traces d'erreur
+import io  # Import pour encoder les images en mémoire (BytesIO)
 import time  # Import pour mesurer le temps d'exécution
-from typing import Optional  # Type pour les paramètres optionnels
+from typing import Optional, List  # Types pour les annotations de type
+from . import cache  # Import du cache disque des images converties
+from .common import ensure_dirs  # Import de la création (mémorisée) des dossiers
+
+try:  # NumPy est optionnel : calcul de la luminance vectorisé (SIMD)
+    import numpy as np  # Module de calcul numérique sur tableaux
+except ImportError:  # Si NumPy n'est pas installé
+    np = None  # Repli sur ImageOps.grayscale de Pillow
 
 
 # Variable globale pour le logger (sera partagée entre threads/processus)
 _global_logger = None  # Variable globale qui stockera le logger partagé (initialisée à None)
+_global_log = None  # Méthode log du logger global, résolue une fois dans set_global_logger (None si absente)
+_global_log_deferred = None  # Méthode log_deferred du logger global (None si le logger ne diffère pas le formatage)
+
+_DEBUG = bool(os.environ.get("IMG_DEBUG"))  # Si défini, les erreurs incluent le traceback complet
+
+# Backend de conversion en niveaux de gris ("pillow" par défaut)
+_grayscale_backend = "pillow"  # Nom du backend utilisé par _to_grayscale
+_rgb_to_gray = None  # Noyau Numba compilé (chargé seulement avec le backend "numba")
+
+# Écrivain par lots optionnel (src/io_uring_writer.py) ; None = sauvegarde synchrone
+_batch_writer = None  # Variable globale qui stockera l'écrivain par lots (initialisée à None)
+
+# Dossier du cache des conversions (src/cache.py) ; None = cache désactivé
+_cache_dir = None  # Variable globale qui stockera le dossier du cache (initialisée à None)
+
+# Contenu des images préchargé en mémoire {chemin: bytes} ; None = lecture sur disque
+_input_blobs = None  # Variable globale qui stockera les images préchargées (initialisée à None)
+
+# Saut des conversions déjà à jour (sortie plus récente que la source) ; False = toujours convertir
+_skip_up_to_date = False  # Variable globale qui active le saut des sorties à jour (initialisée à False)
+
+# Décodage direct de la luminance des JPEG (draft("L")) ; False = décodage RGB puis conversion
+_jpeg_draft = False  # Variable globale qui active le décodage JPEG en niveaux de gris (initialisée à False)
+
+_PROCESSED_FMT = "Image traitée: {} -> {} (temps: {:.4f}s, thread: {})"  # Message de log d'une image traitée (source, sortie, temps, thread)
 
 
 def set_global_logger(logger):
@@ -34,8 +67,219 @@ def set_global_logger(logger):
     qui appellent convert_to_grayscale. Le logger doit être thread-safe ou
     process-safe selon le contexte d'utilisation.
     """
-    global _global_logger  # Déclare qu'on modifie la variable globale
+    global _global_logger, _global_log, _global_log_deferred  # Déclare qu'on modifie les variables globales
     _global_logger = logger  # Assigne le logger passé en paramètre à la variable globale
+    _global_log = getattr(logger, "log", None)  # Méthode liée résolue une seule fois (pas de recherche d'attribut par image)
+    _global_log_deferred = getattr(logger, "log_deferred", None)  # Idem pour le formatage différé
+
+
+def set_grayscale_backend(name: str):
+    """
+    Choisit le backend de conversion en niveaux de gris pour les conversions suivantes.
+    
+    - "pillow" (défaut) : ImageOps.grayscale, boucle C de Pillow
+    - "numpy" : luminance en virgule fixe calculée avec les ufuncs NumPy
+    - "numba" : même calcul dans un noyau compilé (src/kernels.py) qui libère le GIL
+    
+    Pillow reste le défaut : sa conversion C est plus rapide que l'aller-retour
+    Pillow -> NumPy -> Pillow pour une seule image. Le backend NumPy sert de
+    point de comparaison et de base aux traitements vectorisés.
+    """
+    global _grayscale_backend  # Déclare qu'on modifie la variable globale
+    global _rgb_to_gray  # Déclare qu'on modifie le noyau compilé global
+    if name not in ("pillow", "numpy", "numba"):  # Vérifie que le backend est connu
+        raise ValueError(f"Backend de conversion inconnu : {name}")  # Lève une erreur pour un backend inconnu
+    if name == "numpy" and np is None:  # Vérifie que NumPy est installé
+        raise RuntimeError("Le backend 'numpy' nécessite NumPy")  # Lève une erreur si NumPy manque
+    if name == "numba":  # Le noyau Numba n'est importé (et compilé) qu'à la demande
+        from . import kernels  # Import différé : compile ou charge le noyau depuis le cache
+        if not kernels.AVAILABLE:  # Vérifie que Numba est installé
+            raise RuntimeError("Le backend 'numba' nécessite Numba et NumPy")  # Lève une erreur si Numba manque
+        _rgb_to_gray = kernels.rgb_to_gray  # Mémorise le noyau compilé
+    _grayscale_backend = name  # Mémorise le backend choisi
+
+
+def set_batch_writer(writer):
+    """
+    Définit l'écrivain par lots utilisé pour sauvegarder les images converties.
+    
+    Avec un écrivain (par exemple io_uring_writer.BatchedFileWriter), les images
+    sont encodées en mémoire puis mises en file ; les fichiers ne sont
+    complets qu'après writer.flush(). None rétablit la sauvegarde synchrone.
+    """
+    global _batch_writer  # Déclare qu'on modifie la variable globale
+    _batch_writer = writer  # Assigne l'écrivain passé en paramètre à la variable globale
+
+
+def set_conversion_cache(cache_dir: Optional[str]):
+    """
+    Active (dossier du cache) ou désactive (None) le cache des conversions.
+    
+    Avec le cache, convert_to_grayscale ne convertit une image que si son
+    contenu (SHA-256) n'a pas déjà été converti avec le même suffixe et le
+    même backend ; sinon le résultat en cache est lié dans le dossier de sortie.
+    """
+    global _cache_dir  # Déclare qu'on modifie la variable globale
+    _cache_dir = cache_dir  # Assigne le dossier du cache (ou None) à la variable globale
+
+
+def set_input_blobs(blobs: Optional[dict]):
+    """
+    Définit le contenu préchargé des images sources ({chemin: bytes}), ou None.
+    
+    Les conversions d'une image présente dans le dictionnaire la décodent depuis
+    la mémoire au lieu de relire le fichier. Les processus créés par fork
+    héritent du dictionnaire sans copie ni sérialisation.
+    """
+    global _input_blobs  # Déclare qu'on modifie la variable globale
+    _input_blobs = blobs  # Assigne le dictionnaire (ou None) à la variable globale
+
+
+def set_skip_up_to_date(enabled: bool):
+    """
+    Active ou désactive le saut des conversions déjà à jour.
+    
+    Activé, convert_to_grayscale ne reconvertit pas une image dont la sortie
+    existe, n'est pas vide et est au moins aussi récente que la source (comme
+    make) : seuls deux appels stat() sont faits. Désactivé par défaut pour que
+    chaque expérience mesure réellement la conversion.
+    """
+    global _skip_up_to_date  # Déclare qu'on modifie la variable globale
+    _skip_up_to_date = enabled  # Mémorise le choix
+
+
+def set_jpeg_draft(enabled: bool):
+    """
+    Active ou désactive le décodage direct des JPEG en niveaux de gris (backend "pillow").
+    
+    Activé, libjpeg ne reconstruit que la composante Y (draft("L")), sans
+    conversion YCbCr -> RGB. Les pixels diffèrent alors de quelques niveaux de
+    ceux obtenus par décodage RGB + conversion : désactivé par défaut pour que
+    toutes les versions comparées produisent les mêmes images.
+    """
+    global _jpeg_draft  # Déclare qu'on modifie la variable globale
+    _jpeg_draft = enabled  # Mémorise le choix
+
+
+def _up_to_date(input_path: str, out_path: str) -> bool:
+    """Indique si out_path existe, n'est pas vide et n'est pas plus ancien que input_path"""
+    try:  # La sortie (ou la source) peut ne pas exister
+        st_out = os.stat(out_path)  # Métadonnées de la sortie
+        return st_out.st_size > 0 and st_out.st_mtime_ns >= os.stat(input_path).st_mtime_ns  # Sortie non vide et plus récente
+    except FileNotFoundError:  # Pas encore de sortie
+        return False  # Conversion nécessaire
+
+
+def _cache_key(suffix: str) -> str:
+    """Clé complémentaire du cache : suffixe, backend et décodage JPEG draft (sa sortie diffère de convert("L"))"""
+    draft = "_draft" if _jpeg_draft and _grayscale_backend == "pillow" else ""  # Le draft n'est utilisé qu'avec le backend Pillow
+    return f"{suffix}_{_grayscale_backend}{draft}"  # Clé distincte pour chaque variante de conversion
+
+
+def _open_input(input_path: str, data: Optional[bytes] = None) -> Image.Image:
+    """Ouvre l'image source depuis data ou depuis la mémoire si elle a été préchargée, sinon depuis le disque"""
+    blob = data if data is not None else _input_blobs.get(input_path) if _input_blobs else None  # Contenu déjà lu (None si absent)
+    return Image.open(io.BytesIO(blob) if blob is not None else input_path)  # Ouvre depuis la mémoire ou le fichier
+
+
+def _convert_file(src: str, dst: str):
+    """Convertit l'image src en niveaux de gris et l'écrit dans dst (sauvegarde synchrone, utilisée par le cache)"""
+    with _open_input(src) as img:  # Ouvre l'image avec Pillow (mémoire ou disque)
+        _to_grayscale(img).save(dst)  # Convertit et sauvegarde directement dans dst
+
+
+def _save_image(img: Image.Image, out_path: str):
+    """Sauvegarde img dans out_path, directement ou via l'écrivain par lots s'il est défini"""
+    if _batch_writer is None:  # Pas d'écrivain par lots
+        img.save(out_path)  # Sauvegarde synchrone
+        return  # Terminé
+    buf = io.BytesIO()  # Tampon en mémoire pour l'image encodée
+    img.save(buf, format=Image.registered_extensions()[os.path.splitext(out_path)[1].lower()])  # Encode dans le format de l'extension de sortie
+    _batch_writer.enqueue(out_path, buf.getbuffer())  # Met l'écriture en file (vue sans copie sur le tampon)
+
+
+def _output_path(input_path: str, output_dir: str, suffix: str):
+    """
+    Retourne (nom_source, nom_sortie, chemin_sortie) pour une image.
+    
+    Utilise les fonctions os.path sur des chaînes plutôt que des objets Path
+    (appelée une fois par image).
+    """
+    in_name = os.path.basename(input_path)  # Nom du fichier source (sans le dossier)
+    base, ext = os.path.splitext(in_name)  # Nom de base et extension
+    out_name = base + suffix + ext  # Nom de fichier de sortie (nom_base + suffixe + extension)
+    return in_name, out_name, os.path.join(output_dir, out_name)  # Chemin complet de sortie (dossier + nom_fichier)
+
+
+def _to_grayscale(img: Image.Image) -> Image.Image:
+    """
+    Convertit une image Pillow en niveaux de gris (mode "L").
+    
+    Avec le backend "pillow" et set_jpeg_draft(True), une image JPEG pas encore
+    décodée est décodée directement en niveaux de gris (draft("L") : libjpeg ne
+    reconstruit que la composante de luminance Y, sans conversion YCbCr -> RGB).
+    Le résultat diffère alors du décodage RGB + conversion de quelques niveaux
+    (arrondis du sous-échantillonnage de la chrominance) : option désactivée
+    par défaut.
+    Avec le backend "numpy", la luminance est calculée en virgule fixe
+    Y = (77*R + 150*G + 29*B) >> 8 (approximation de 0.299/0.587/0.114)
+    sur tout le tableau en une fois. Sinon (ou si l'image est déjà en niveaux
+    de gris), utilise Pillow.
+    """
+    if _grayscale_backend == "pillow" or img.mode == "L":  # Backend Pillow, ou image déjà en niveaux de gris
+        if _jpeg_draft and img.format == "JPEG" and img.mode != "L":  # JPEG couleur, option activée : décodage direct de la luminance
+            img.draft("L", img.size)  # Demande à libjpeg de ne décoder que Y (même taille, sans réduction)
+        return ImageOps.grayscale(img)  # Conversion Pillow standard (simple copie si déjà en "L")
+    rgb = np.asarray(img.convert("RGB"))  # Tableau (H, W, 3) uint8 des canaux R, G, B
+    if _grayscale_backend == "numba":  # Noyau compilé (GIL libéré pendant le calcul)
+        out = np.empty(rgb.shape[:2], dtype=np.uint8)  # Tableau de sortie (H, W)
+        _rgb_to_gray(rgb, out)  # Calcule la luminance de chaque pixel en code natif
+        return Image.fromarray(out, mode="L")  # Reconstruit une image Pillow en niveaux de gris
+    y = rgb[..., 0].astype(np.uint16) * 77  # Contribution du rouge (uint16 pour éviter le débordement)
+    y += rgb[..., 1].astype(np.uint16) * 150  # Ajoute la contribution du vert
+    y += rgb[..., 2].astype(np.uint16) * 29  # Ajoute la contribution du bleu
+    y >>= 8  # Division par 256 (77 + 150 + 29 = 256)
+    return Image.fromarray(y.astype(np.uint8), mode="L")  # Reconstruit une image Pillow en niveaux de gris
+
+
+def _write_log(log_message: str, use_lock: bool):
+    """
+    Écrit un message dans le log global (zone critique).
+    
+    Avec use_lock=True, passe par le logger (protégé par Lock/Sémaphore).
+    Sinon, écrit directement dans le fichier du logger SANS protection
+    (pour démontrer les race conditions).
+    """
+    if use_lock and _global_log is not None:  # Si le logger global sait écrire ET qu'on doit utiliser le lock
+        # Utilise le logger thread-safe (avec lock)
+        _global_log(log_message)  # Écrit le message dans le log de manière thread-safe
+    elif _global_logger:  # Si un logger global existe mais qu'on ne doit PAS utiliser le lock
+        # Utilise le logger sans lock (pour démontrer les problèmes)
+        # Note: Ceci peut causer des race conditions
+        try:  # Bloc try pour gérer les erreurs d'écriture
+            with open(_global_logger.log_file, 'a', encoding='utf-8') as f:  # Ouvre le fichier en mode append (ajout)
+                f.write(f"{log_message}\n")  # Écrit le message suivi d'un saut de ligne (SANS protection)
+        except OSError:  # Erreurs d'écriture possibles
+            pass  # Ignore les erreurs (pour ne pas interrompre le traitement)
+
+
+def _error_text(e: Exception) -> str:
+    """Texte d'erreur d'un résultat : message de l'exception, ou traceback complet si IMG_DEBUG est défini"""
+    return traceback.format_exc() if _DEBUG else f"{type(e).__name__}: {e}"  # Traceback seulement en mode debug
+
+
+def _log_processed(in_name: str, out_name: str, processing_time: float, thread_id: Optional[str], use_lock: bool):
+    """
+    Écrit le message de log d'une image traitée (zone critique).
+    
+    Si le logger sait différer le formatage (AsyncFileLogger.log_deferred),
+    seuls le format et les valeurs sont mis en file : le message est formaté
+    par le thread écrivain, hors du chemin critique des workers.
+    """
+    if use_lock and _global_log_deferred is not None:  # Logger asynchrone : formatage différé
+        _global_log_deferred(_PROCESSED_FMT, in_name, out_name, processing_time, thread_id or 'N/A')  # Met en file le format et les valeurs
+    else:  # Autres loggers : message formaté ici
+        _write_log(_PROCESSED_FMT.format(in_name, out_name, processing_time, thread_id or 'N/A'), use_lock)  # Écrit le message (avec ou sans protection)
 
 
 def convert_to_grayscale(
@@ -43,7 +287,9 @@ def convert_to_grayscale(
     output_dir: str,  # Dossier où sauvegarder l'image convertie
     suffix="_gray",  # Suffixe à ajouter au nom de fichier (par défaut "_gray")
     thread_id: Optional[str] = None,  # Identifiant du thread/processus (optionnel, pour le log)
-    use_lock: bool = True  # Si True, utilise le logger thread-safe (avec lock)
+    use_lock: bool = True,  # Si True, utilise le logger thread-safe (avec lock)
+    ensure_dir: bool = False,  # Si True, crée le dossier de sortie s'il n'existe pas (appel isolé)
+    data: Optional[bytes] = None  # Contenu déjà lu de l'image source (None = images préchargées ou fichier)
 ) -> dict:  # Retourne un dictionnaire avec les informations de traitement
     """
     Convertit une image en niveaux de gris et la sauvegarde dans le dossier de sortie.
@@ -57,65 +303,167 @@ def convert_to_grayscale(
         suffix: Suffixe à ajouter au nom de fichier
         thread_id: Identifiant du thread/processus (pour le log)
         use_lock: Si True, utilise le logger thread-safe (avec lock)
+        ensure_dir: Si True, crée le dossier de sortie s'il n'existe pas. Par défaut le
+            dossier doit déjà exister (le runner le crée avant de lancer chaque expérience),
+            ce qui évite un appel système par image.
+        data: Contenu de l'image source déjà lu par l'appelant (par exemple par un thread
+            d'E/S) : l'image est décodée depuis la mémoire (ignoré avec le cache disque)
     
     Returns:
         Dictionnaire avec les informations de traitement
     """
-    Path(output_dir).mkdir(parents=True, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas (création récursive)
-    in_path = Path(input_path)  # Convertit le chemin d'entrée en objet Path
-    out_name = in_path.stem + suffix + in_path.suffix  # Construit le nom de fichier de sortie (nom_base + suffixe + extension)
-    out_path = Path(output_dir) / out_name  # Construit le chemin complet de sortie (dossier + nom_fichier)
+    if ensure_dir:  # Appel isolé : le dossier de sortie n'a peut-être pas été créé
+        ensure_dirs(output_dir)  # Crée le dossier de sortie (une seule fois par dossier)
+    in_name, out_name, out_path = _output_path(input_path, output_dir, suffix)  # Noms source/sortie et chemin complet de sortie
+    
+    if _skip_up_to_date and _up_to_date(input_path, out_path):  # Sortie déjà à jour : rien à convertir
+        return {  # Retourne un succès immédiat (même format que la conversion)
+            "success": True,  # La sortie existe et est à jour
+            "input": input_path,  # Chemin de l'image source
+            "output": out_path,  # Chemin de l'image de sortie (existante)
+            "processing_time": 0.0,  # Aucune conversion effectuée
+            "thread_id": thread_id,  # Identifiant du thread/processus
+            "cached": True  # Le résultat n'a pas été recalculé
+        }
     
-    start_time = time.perf_counter()  # Enregistre le temps de début du traitement (haute précision)
+    start_ns = time.perf_counter_ns()  # Enregistre le temps de début du traitement (entier en nanosecondes, haute précision)
     
     try:  # Bloc try pour capturer les erreurs
         # Traitement de l'image (opération CPU-bound)
-        with Image.open(in_path) as img:  # Ouvre l'image avec Pillow (gestion automatique de la fermeture)
-            gray = ImageOps.grayscale(img)  # Convertit l'image en niveaux de gris
-            gray.save(out_path)  # Sauvegarde l'image convertie dans le dossier de sortie
+        if _cache_dir is not None:  # Cache activé : ne convertit que les contenus jamais vus
+            cached = cache.get_or_compute(  # Résultat en cache ou calculé puis mis en cache
+                input_path, out_path, _convert_file,  # Source, sortie, fonction de conversion
+                key=_cache_key(suffix), cache_dir=_cache_dir  # Clé complémentaire et dossier du cache
+            )
+        else:  # Pas de cache : conversion normale
+            cached = False  # Résultat calculé
+            with _open_input(input_path, data) as img:  # Ouvre l'image avec Pillow, depuis la mémoire si déjà lue (fermeture automatique)
+                gray = _to_grayscale(img)  # Convertit l'image en niveaux de gris
+                _save_image(gray, out_path)  # Sauvegarde l'image convertie dans le dossier de sortie
         
-        processing_time = time.perf_counter() - start_time  # Calcule le temps de traitement (temps actuel - temps de début)
+        processing_time = (time.perf_counter_ns() - start_ns) * 1e-9  # Calcule le temps de traitement en secondes (différence entière convertie une fois)
         
         # ZONE CRITIQUE : Écriture dans le fichier log
         # Cette opération nécessite une synchronisation si plusieurs threads
         # ou processus y accèdent simultanément
-        log_message = (  # Construit le message de log avec les informations de traitement
-            f"Image traitée: {in_path.name} -> {out_path.name} "  # Nom de l'image source et destination
-            f"(temps: {processing_time:.4f}s, thread: {thread_id or 'N/A'})"  # Temps de traitement et ID du thread
-        )
-        
-        if _global_logger and use_lock:  # Si un logger global existe ET qu'on doit utiliser le lock
-            # Utilise le logger thread-safe (avec lock)
-            _global_logger.log(log_message)  # Écrit le message dans le log de manière thread-safe
-        elif _global_logger:  # Si un logger global existe mais qu'on ne doit PAS utiliser le lock
-            # Utilise le logger sans lock (pour démontrer les problèmes)
-            # Note: Ceci peut causer des race conditions
-            try:  # Bloc try pour gérer les erreurs d'écriture
-                with open(_global_logger.log_file, 'a', encoding='utf-8') as f:  # Ouvre le fichier en mode append (ajout)
-                    f.write(f"{log_message}\n")  # Écrit le message suivi d'un saut de ligne (SANS protection)
-            except:  # Capture toutes les exceptions (erreurs d'écriture possibles)
-                pass  # Ignore les erreurs (pour ne pas interrompre le traitement)
+        _log_processed(in_name, out_name, processing_time, thread_id, use_lock)  # Écrit le message dans le log (avec ou sans protection)
         
         return {  # Retourne un dictionnaire avec les informations de succès
             "success": True,  # Indique que la conversion a réussi
-            "input": str(in_path),  # Chemin de l'image source (converti en string)
-            "output": str(out_path),  # Chemin de l'image de sortie (converti en string)
+            "input": input_path,  # Chemin de l'image source
+            "output": out_path,  # Chemin de l'image de sortie
             "processing_time": processing_time,  # Temps de traitement en secondes
-            "thread_id": thread_id  # Identifiant du thread/processus
+            "thread_id": thread_id,  # Identifiant du thread/processus
+            "cached": cached  # Indique si le résultat venait du cache
         }
     except Exception as e:  # Capture toutes les exceptions pendant le traitement
-        error_time = time.perf_counter() - start_time  # Calcule le temps écoulé avant l'erreur
-        error_msg = traceback.format_exc()  # Récupère la trace complète de l'erreur (formatée)
+        error_time = (time.perf_counter_ns() - start_ns) * 1e-9  # Calcule le temps écoulé avant l'erreur
+        error_msg = _error_text(e)  # Message d'erreur (traceback complet en mode debug)
         
         # Log de l'erreur (zone critique)
-        if _global_logger and use_lock:  # Si un logger global existe ET qu'on doit utiliser le lock
-            _global_logger.log(f"ERREUR: {in_path.name} - {str(e)}")  # Écrit le message d'erreur dans le log de manière thread-safe
+        if use_lock and _global_log is not None:  # Si le logger global sait écrire ET qu'on doit utiliser le lock
+            _global_log(f"ERREUR: {in_name} - {str(e)}")  # Écrit le message d'erreur dans le log de manière thread-safe
         
         return {  # Retourne un dictionnaire avec les informations d'erreur
             "success": False,  # Indique que la conversion a échoué
-            "input": str(in_path),  # Chemin de l'image source (converti en string)
+            "input": input_path,  # Chemin de l'image source
             "output": None,  # Pas d'image de sortie (échec)
-            "error": error_msg,  # Message d'erreur complet avec traceback
+            "error": error_msg,  # Message d'erreur (traceback en mode debug)
             "processing_time": error_time,  # Temps écoulé avant l'erreur
             "thread_id": thread_id  # Identifiant du thread/processus
-        }
\ No newline at end of file
+        }
+
+
+def process_batch(
+    image_paths: List[str],  # Chemins des images à convertir
+    output_dir: str,  # Dossier où sauvegarder les images converties
+    batch: int = 8,  # Nombre maximum d'images empilées dans un même calcul
+    suffix="_gray",  # Suffixe à ajouter au nom de fichier (par défaut "_gray")
+    thread_id: Optional[str] = None,  # Identifiant du thread/processus (optionnel, pour le log)
+    use_lock: bool = True  # Si True, utilise le logger thread-safe (avec lock)
+) -> List[dict]:  # Retourne un dictionnaire d'informations par image (même format que convert_to_grayscale)
+    """
+    Convertit un lot d'images en niveaux de gris avec un seul calcul NumPy par groupe.
+    
+    Les images sont décodées puis regroupées par taille (H, W) ; chaque groupe
+    (au plus `batch` images) est empilé en un tableau (N, H, W, 3) et la luminance
+    est calculée en une seule passe pour tout le groupe. Le temps de traitement
+    d'une image est le temps de son groupe divisé par le nombre d'images du groupe.
+    Nécessite NumPy. La taille de lot par défaut reste modeste car chaque image
+    1920x1278 occupe environ 7 Mo une fois décodée.
+    
+    Args:
+        image_paths: Chemins des images à convertir
+        output_dir: Dossier de sortie
+        batch: Nombre maximum d'images par calcul groupé
+        suffix: Suffixe à ajouter au nom de fichier
+        thread_id: Identifiant du thread/processus (pour le log)
+        use_lock: Si True, utilise le logger thread-safe (avec lock)
+    
+    Returns:
+        Liste de dictionnaires d'informations, dans l'ordre de image_paths
+    """
+    if np is None:  # Le traitement groupé repose sur NumPy
+        raise RuntimeError("process_batch nécessite NumPy")  # Lève une erreur si NumPy manque
+    results = [None] * len(image_paths)  # Un résultat par image, dans l'ordre d'entrée
+    groups = {}  # Dictionnaire {(H, W): [(index, nom_source, nom_sortie, chemin_sortie, tableau_rgb), ...]}
+    
+    for i, input_path in enumerate(image_paths):  # Décode chaque image et la range dans le groupe de sa taille
+        in_name, out_name, out_path = _output_path(input_path, output_dir, suffix)  # Noms source/sortie et chemin complet de sortie
+        start_ns = time.perf_counter_ns()  # Enregistre le temps de début du décodage (nanosecondes)
+        try:  # Bloc try pour capturer les erreurs de décodage
+            with _open_input(input_path) as img:  # Ouvre l'image avec Pillow (mémoire ou disque)
+                rgb = np.asarray(img.convert("RGB"))  # Tableau (H, W, 3) uint8
+        except Exception as e:  # Image illisible : résultat d'erreur pour cette image uniquement
+            _write_log(f"ERREUR: {in_name} - {str(e)}", use_lock)  # Log de l'erreur (zone critique)
+            results[i] = {  # Dictionnaire d'erreur (même format que convert_to_grayscale)
+                "success": False,  # Indique que la conversion a échoué
+                "input": str(input_path),  # Chemin de l'image source
+                "output": None,  # Pas d'image de sortie (échec)
+                "error": _error_text(e),  # Message d'erreur (traceback en mode debug)
+                "processing_time": (time.perf_counter_ns() - start_ns) * 1e-9,  # Temps écoulé avant l'erreur
+                "thread_id": thread_id  # Identifiant du thread/processus
+            }
+            continue  # Passe à l'image suivante
+        groups.setdefault(rgb.shape[:2], []).append((i, in_name, out_name, out_path, rgb))  # Ajoute l'image au groupe de sa taille
+    
+    for items in groups.values():  # Traite chaque groupe de même taille
+        for k in range(0, len(items), batch):  # Découpe le groupe en lots d'au plus `batch` images
+            chunk = items[k:k + batch]  # Lot courant
+            start_ns = time.perf_counter_ns()  # Enregistre le temps de début du lot (nanosecondes)
+            stack = np.stack([rgb for *_, rgb in chunk])  # Tableau (N, H, W, 3) uint8
+            y = stack[..., 0].astype(np.uint16) * 77  # Contribution du rouge pour tout le lot
+            y += stack[..., 1].astype(np.uint16) * 150  # Ajoute la contribution du vert
+            y += stack[..., 2].astype(np.uint16) * 29  # Ajoute la contribution du bleu
+            y >>= 8  # Division par 256 (77 + 150 + 29 = 256)
+            gray = y.astype(np.uint8)  # Tableau (N, H, W) uint8
+            errors = {}  # Erreurs de sauvegarde {index: message}
+            for j, (i, in_name, _, out_path, _) in enumerate(chunk):  # Sauvegarde chaque image du lot
+                try:  # Bloc try pour capturer les erreurs d'écriture
+                    _save_image(Image.fromarray(gray[j], mode="L"), out_path)  # Sauvegarde l'image convertie
+                except Exception as e:  # Sauvegarde impossible : erreur pour cette image uniquement
+                    _write_log(f"ERREUR: {in_name} - {str(e)}", use_lock)  # Log de l'erreur (zone critique)
+                    errors[i] = _error_text(e)  # Message d'erreur (traceback en mode debug)
+            processing_time = (time.perf_counter_ns() - start_ns) * 1e-9 / len(chunk)  # Temps moyen par image du lot
+            
+            for i, in_name, out_name, out_path, _ in chunk:  # Log et résultat pour chaque image du lot
+                if i in errors:  # Image non sauvegardée
+                    results[i] = {  # Dictionnaire d'erreur (même format que convert_to_grayscale)
+                        "success": False,  # Indique que la conversion a échoué
+                        "input": str(image_paths[i]),  # Chemin de l'image source
+                        "output": None,  # Pas d'image de sortie (échec)
+                        "error": errors[i],  # Message d'erreur (traceback en mode debug)
+                        "processing_time": processing_time,  # Temps moyen du lot
+                        "thread_id": thread_id  # Identifiant du thread/processus
+                    }
+                    continue  # Passe à l'image suivante
+                _log_processed(in_name, out_name, processing_time, thread_id, use_lock)  # Écrit le message dans le log (zone critique)
+                results[i] = {  # Dictionnaire de succès (même format que convert_to_grayscale)
+                    "success": True,  # Indique que la conversion a réussi
+                    "input": str(image_paths[i]),  # Chemin de l'image source
+                    "output": out_path,  # Chemin de l'image de sortie
+                    "processing_time": processing_time,  # Temps de traitement moyen en secondes
+                    "thread_id": thread_id,  # Identifiant du thread/processus
+                    "cached": False  # Résultat calculé (pas de cache pour les lots)
+                }
+    return results  # Retourne les résultats dans l'ordre d'entrée
@@ -17,21 +17,87 @@ Rôle détaillé :
 """
 import argparse  # Module pour parser les arguments en ligne de commande
 from pathlib import Path  # Import de Path (non utilisé directement mais gardé pour cohérence)
-from .common import ensure_dirs, list_images  # Import des fonctions utilitaires (création dossiers, liste images)
+from .common import ensure_dirs, list_images, list_images_largest_first, save_results_json, pinning_kwargs, MP_CONTEXT, gil_enabled, default_workers  # Import des fonctions utilitaires (création dossiers, liste images (ordre alphabétique ou par taille), export JSON, épinglage, contexte des pools, détection du GIL, nombre de workers par défaut)
 from .measure import measure_run, export_results  # Import des fonctions de mesure et d'export
-from .versions import (  # Import de tous les modules de versions
-    mono,  # Version séquentielle (baseline)
-    threading_version,  # Version avec threading
-    multiprocessing_version,  # Version avec multiprocessing
-    threadpool_executor,  # Version avec ThreadPoolExecutor
-    processpool_executor  # Version avec ProcessPoolExecutor
-)
+from .processor import set_batch_writer, set_conversion_cache, set_input_blobs, set_skip_up_to_date, set_global_logger, set_jpeg_draft, _output_path  # Import des setters (écrivain par lots, cache, images préchargées, saut des sorties à jour, logger global, décodage JPEG en luminance) et du chemin de sortie d'une image
+from .cache import DEFAULT_CACHE_DIR, prune  # Import du dossier du cache par défaut et de l'éviction LRU
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # Import des pools partagés entre expériences
+from .io_uring_writer import BatchedFileWriter  # Import de l'écrivain par lots (io_uring si disponible)
+from .synchronization_tools import set_async_uring  # Import du setter des écritures io_uring du logger asynchrone
 import os  # Module pour les opérations sur le système de fichiers
-import json  # Module pour la sérialisation/désérialisation JSON
+import functools  # Module pour conserver le nom des fonctions enveloppées (functools.wraps)
+
+
+_writer = None  # Écrivain par lots de l'exécution en cours (None = sauvegarde synchrone)
+
+
+def _flushed(func):
+    """
+    Enveloppe func pour vider l'écrivain par lots à la fin de chaque expérience.
+    
+    Le vidage a lieu dans la fonction mesurée : les écritures différées restent
+    comptées dans le temps total de l'expérience. Les écritures en échec
+    (retournées par flush()) sont reportées sur les résultats de leurs images.
+    """
+    if _writer is None:  # Pas d'écrivain par lots
+        return func  # Rien à envelopper
+    @functools.wraps(func)  # Conserve le nom et la documentation de func
+    def run(image_paths, output_dir, *args, **kwargs):  # Fonction enveloppée (mêmes arguments)
+        res = func(image_paths, output_dir, *args, **kwargs)  # Exécute l'expérience
+        errors = _writer.flush()  # Soumet les écritures encore en file
+        if errors:  # Images dont la sortie n'a pas pu être écrite
+            _mark_write_errors(res.get("runs", ()), output_dir, errors)  # Marque ces images en échec
+        return res  # Retourne les résultats de l'expérience
+    return run  # Retourne la fonction enveloppée
+
+
+def _mark_write_errors(runs, output_dir: str, errors: dict):
+    """Marque en échec (success False, error, output None) les résultats dont l'écriture différée a échoué"""
+    for r in runs:  # Parcourt les résultats individuels
+        src = r.get("input", r.get("image"))  # Chemin de l'image source (clé selon la version)
+        out = r.get("output") or (_output_path(src, output_dir, "_gray")[2] if src else None)  # Chemin de sortie
+        if out in errors:  # Sortie non écrite
+            r.update(success=False, output=None, error=errors[out])  # Résultat d'erreur pour cette image uniquement
+
+
+# Indique si un pool de processus ne serait pas amorti
+def _should_bypass_pool(n: int, n_images: int) -> bool:
+    """True si le démarrage du pool coûterait plus que le parallélisme ne rapporte (1 worker ou moins de 4 images)"""
+    return n == 1 or n_images < 4  # Un seul worker, ou trop peu d'images pour amortir fork/spawn et l'IPC
+
+
+# Remplace une version à base de processus par la version séquentielle si le pool ne serait pas amorti
+def _pool_or_sequential(func, n: int, n_images: int, enabled: bool):
+    """
+    Retourne func, ou (si enabled et _should_bypass_pool) une fonction qui exécute la
+    version séquentielle avec la même signature (les arguments du pool sont ignorés).
+    
+    Le résultat brut porte alors "pool_bypassed": True. Le log est écrit dans le
+    processing.log du dossier de sortie de l'expérience (sans verrou : un seul
+    processus), jamais dans celui de l'expérience précédente.
+    """
+    if not (enabled and _should_bypass_pool(n, n_images)):  # Pool utile ou contournement désactivé
+        return func  # Version à base de processus inchangée
+    from .versions import mono  # Version séquentielle
+    @functools.wraps(func)  # Conserve le nom de la version remplacée
+    def run(image_paths, output_dir, **_pool_kwargs):  # Même signature que les versions à base de processus
+        log_file = os.path.join(output_dir, "processing.log")  # Log propre à cette expérience
+        open(log_file, 'w').close()  # Crée (ou vide) le fichier, comme les loggers des versions remplacées
+        set_global_logger(type('Logger', (), {'log_file': log_file})())  # Logger minimal (écriture sans verrou, un seul processus)
+        res = mono.process_sequential(image_paths, output_dir)  # Traitement séquentiel dans le processus courant
+        res["pool_bypassed"] = True  # Signale que le pool n'a pas été démarré
+        return res  # Retourne les résultats (même format)
+    return run  # Retourne la version séquentielle enveloppée
 
 
 # Lance toutes les expériences de parallélisme et sauvegarde les résultats
-def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
+def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict, batch_size: int = None, use_gpu: bool = False,
+            batched_writes: int = None, async_log: bool = False,
+            sharded_log: bool = False, cache_dir: str = None, reuse_pools: bool = False,
+            preload: bool = False, use_vips: bool = False, pin_workers: bool = False,
+            skip_up_to_date: bool = False, append_log: bool = False, bypass_small_pools: bool = False,
+            local_results: bool = False, use_numba_batch: bool = False, jpeg_draft: bool = False,
+            largest_first: bool = False, uring_log: bool = False, prefetch_io: int = 0):
     """
     Lance toutes les expériences de comparaison des approches de parallélisme.
     
@@ -44,28 +110,128 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
     6. ThreadPoolExecutor avec lock
     7. ThreadPoolExecutor avec semaphore
     8. ProcessPoolExecutor avec lock
+    9. Threading et ThreadPoolExecutor avec logger asynchrone (optionnel, si async_log)
+    10. Threading, ThreadPoolExecutor, multiprocessing et ProcessPoolExecutor avec logs par thread/processus (optionnel, si sharded_log)
+    11. Threading, ThreadPoolExecutor et multiprocessing avec log sans verrou en O_APPEND (optionnel, si append_log)
+    12. GPU par lots (optionnel, si use_gpu)
+    13. libvips en flux (optionnel, si use_vips)
+    14. Numba par lots, un noyau parallèle par lot (optionnel, si use_numba_batch ; séquentiel sous 100 images)
     
     Args:
         images_dir: Dossier contenant les images
         output_dir: Dossier pour les images converties
         results_dir: Dossier pour les résultats de performance
         sizes: Dictionnaire avec les nombres de threads/processus à tester
+        batch_size: Si fourni, la version mono convertit les images par lots (NumPy)
+        use_gpu: Si True, ajoute l'expérience GPU (nécessite CuPy)
+        batched_writes: Si fourni, les images sont écrites par lots de cette taille (io_uring si disponible)
+        async_log: Si True, ajoute les expériences avec logger asynchrone (file + thread écrivain)
+        sharded_log: Si True, ajoute les expériences avec tampons de log par thread/processus fusionnés à la fin
+        cache_dir: Si fourni, les conversions passent par le cache disque de ce dossier (chaque image
+            n'est convertie qu'une fois pour toutes les expériences : les temps ne mesurent plus la conversion)
+        reuse_pools: Si True, les versions ThreadPoolExecutor/ProcessPoolExecutor partagent un pool par
+            taille entre expériences (le démarrage des workers n'est payé qu'une fois)
+        preload: Si True, le contenu des images est lu une seule fois en mémoire et partagé
+            par toutes les expériences (plus de relecture disque par expérience)
+        use_vips: Si True, ajoute l'expérience libvips (nécessite pyvips)
+        pin_workers: Si True, chaque processus worker (multiprocessing/ProcessPoolExecutor) et chaque
+            thread des pools ThreadPoolExecutor est épinglé sur un cœur (os.sched_setaffinity) :
+            moins de migrations entre cœurs
+        skip_up_to_date: Si True, une image dont la sortie existe et est plus récente que la source
+            n'est pas reconvertie (utile pour relancer dans le même dossier de sortie ; les temps
+            ne mesurent alors plus la conversion)
+        append_log: Si True, ajoute les expériences dont le log est écrit sans verrou (un os.write
+            par message en O_APPEND, l'atomicité de l'ajout étant assurée par le noyau)
+        bypass_small_pools: Si True, les expériences à base de processus avec 1 worker ou moins
+            de 4 images exécutent la version séquentielle (le démarrage du pool n'est pas amorti ;
+            résultat marqué "pool_bypassed")
+        local_results: Si True, les versions threading avec lock écrivent chaque résultat dans une
+            case préallouée de la liste (results[i]) : plus de verrou par image sur la liste partagée
+        use_numba_batch: Si True, ajoute l'expérience Numba par lots (décodage en threads, un appel
+            compilé parallèle par lot d'images ; nécessite Numba)
+        jpeg_draft: Si True, les JPEG sont décodés directement en luminance (draft("L")) par le
+            backend Pillow : plus rapide, mais les pixels diffèrent légèrement de la conversion RGB
+        largest_first: Si True, les images sont traitées de la plus grosse à la plus petite (taille
+            du fichier) : les petites images comblent la fin d'exécution au lieu d'un gros paquet traînard
+        uring_log: Si True, le thread écrivain des loggers asynchrones (async_log) soumet ses blocs (en O_DIRECT)
+            par io_uring sans attendre leur écriture (binding liburing ; sinon os.write)
+        prefetch_io: Si > 0, les versions ThreadPoolExecutor lisent les images avec ce nombre de
+            threads d'E/S et ne confient au pool que le décodage, la conversion et l'écriture
     """
+    # Versions importées à la demande : un backend non utilisé n'est jamais chargé
+    from .versions import mono  # Version séquentielle (baseline, toujours exécutée)
+    if sizes.get("threads", [4]):  # Expériences à base de threads demandées
+        from .versions import threading_version, threadpool_executor  # Versions threading et ThreadPoolExecutor
+        if gil_enabled():  # Interpréteur classique
+            print("Note : GIL actif, les versions à base de threads ne dépasseront pas un cœur pour le code Python "
+                  "(multiprocessing/ProcessPoolExecutor, ou CPython free-threaded 3.13t, pour un vrai parallélisme).")  # Avertit que les threads ne passeront pas à l'échelle
+        else:  # CPython free-threaded sans GIL
+            print("Note : GIL désactivé (CPython free-threaded), les threads s'exécutent en parallèle sur plusieurs cœurs.")  # Signale le mode sans GIL
+    if sizes.get("processes", [default_workers()]):  # Expériences à base de processus demandées
+        from .versions import multiprocessing_version, processpool_executor  # Versions multiprocessing et ProcessPoolExecutor
+    if use_gpu:  # Version GPU demandée
+        from .versions import gpu  # Version GPU optionnelle (CuPy)
+        if not gpu.AVAILABLE:  # Vérifie CuPy avant de lancer les expériences
+            raise SystemExit("--gpu demandé mais CuPy n'est pas installé (pip install cupy-cuda12x).")  # Arrête le programme avec un message d'erreur
+    if use_vips:  # Version libvips demandée
+        from .versions import vips  # Version libvips optionnelle (pyvips)
+        if not vips.AVAILABLE:  # Vérifie pyvips avant de lancer les expériences
+            raise SystemExit("--vips demandé mais pyvips/libvips n'est pas installé (pip install pyvips).")  # Arrête le programme avec un message d'erreur
+    if use_numba_batch:  # Version Numba par lots demandée
+        from .versions import numba_batch  # Version Numba par lots optionnelle
+        if not numba_batch.AVAILABLE:  # Vérifie Numba avant de lancer les expériences
+            raise SystemExit("--numba-batch demandé mais Numba n'est pas installé (pip install numba).")  # Arrête le programme avec un message d'erreur
+    global _writer  # Déclare qu'on modifie l'écrivain global
+    _writer = BatchedFileWriter(batched_writes) if batched_writes else None  # Crée l'écrivain par lots si demandé
+    set_batch_writer(_writer)  # Transmet l'écrivain (ou None) au module de traitement
+    set_conversion_cache(cache_dir)  # Active (ou désactive) le cache des conversions
+    set_skip_up_to_date(skip_up_to_date)  # Active (ou désactive) le saut des sorties déjà à jour
+    set_jpeg_draft(jpeg_draft)  # Active (ou désactive) le décodage JPEG direct en luminance
+    set_async_uring(uring_log)  # Active (ou désactive) les écritures io_uring des loggers asynchrones
     ensure_dirs(output_dir, results_dir)  # Crée les dossiers de sortie et résultats s'ils n'existent pas
-    image_paths = list_images(images_dir)  # Liste tous les fichiers images dans le dossier
+    image_paths = (list_images_largest_first if largest_first else list_images)(images_dir)  # Liste tous les fichiers images du dossier (par taille décroissante si demandé)
     
     if not image_paths:  # Vérifie s'il y a des images
         raise SystemExit(f"Aucune image trouvée dans {images_dir}. Ajoute des images puis relance.")  # Arrête le programme avec un message d'erreur
     
+    blobs = None  # Contenu des images en mémoire (None = lecture sur disque)
+    if preload:  # Lit chaque image une seule fois pour toutes les expériences
+        blobs = {}  # Dictionnaire {chemin: bytes}
+        for p in image_paths:  # Parcourt toutes les images
+            with open(p, 'rb') as f:  # Ouvre l'image en lecture binaire
+                blobs[p] = f.read()  # Mémorise le contenu du fichier
+    set_input_blobs(blobs)  # Transmet les images préchargées (ou None) au module de traitement
+    
     experiments = []  # Liste pour stocker tous les résultats d'expériences
     
+    pools = {}  # Pools partagés {(type, taille): executor} (vide = un pool par expérience)
+    if reuse_pools:  # Crée un pool par taille, réutilisé par toutes les expériences de cette taille
+        for n in dict.fromkeys(sizes.get("threads", [4])):  # Un pool de threads par nombre de threads testé (une taille répétée partage le même pool)
+            pools[("thread", n)] = ThreadPoolExecutor(max_workers=n, **pinning_kwargs(pin_workers))  # Pool de threads partagé (épinglé si demandé)
+        for n in dict.fromkeys(sizes.get("processes", [default_workers()])):  # Un pool de processus par nombre de processus testé (une taille répétée partage le même pool)
+            if bypass_small_pools and _should_bypass_pool(n, len(image_paths)):  # Pool qui serait contourné
+                continue  # Pas de pool à démarrer
+            pools[("proc", n)] = ProcessPoolExecutor(max_workers=n, mp_context=MP_CONTEXT, **pinning_kwargs(pin_workers))  # Pool de processus partagé (fork sur POSIX, épinglé si demandé)
+    
+    # Dossiers de sortie de toutes les expériences, créés en une fois avant les mesures
+    log_modes = [mode for mode, on in (("async_log", async_log), ("sharded_log", sharded_log), ("append_log", append_log)) if on]  # Variantes de log demandées
+    names = ["mono"]  # Noms des dossiers de sortie, dans l'ordre des expériences
+    for n in sizes.get("threads", [4]):  # Expériences à base de threads
+        names += [f"threading_{n}_{k}" for k in ["no_lock", "with_lock", "semaphore"] + log_modes]  # Versions threading
+        names += [f"threadpool_{n}_{k}" for k in ["with_lock", "semaphore"] + log_modes]  # Versions ThreadPoolExecutor
+    for n in sizes.get("processes", [default_workers()]):  # Expériences à base de processus
+        names += [f"multiproc_{n}_{k}" for k in ["with_lock"] + [m for m in log_modes if m != "async_log"]]  # Versions multiprocessing (pas de logger asynchrone entre processus)
+        names += [f"processpool_{n}_{k}" for k in ["with_lock"] + (["sharded_log"] if sharded_log else [])]  # Versions ProcessPoolExecutor
+    names += (["gpu"] if use_gpu else []) + (["vips"] if use_vips else []) + (["numba_batch"] if use_numba_batch else [])  # Versions optionnelles
+    out_dirs = {name: os.path.join(output_dir, name) for name in names}  # {nom: chemin du dossier de sortie}
+    ensure_dirs(*out_dirs.values())  # Crée tous les dossiers (une seule fois, hors des temps mesurés)
+    
     # 1: Mono-thread (baseline)
     print("=" * 60)  # Affiche une ligne de séparation
     print("Running mono (séquentiel - baseline)...")  # Affiche le message de démarrage
     print("=" * 60)  # Affiche une ligne de séparation
-    out_mono = os.path.join(output_dir, "mono")  # Construit le chemin du dossier de sortie pour mono
-    os.makedirs(out_mono, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas
-    mono_result = measure_run(mono.process_sequential, image_paths, out_mono)  # Exécute et mesure la version séquentielle
+    out_mono = out_dirs["mono"]  # Dossier de sortie (créé avant les mesures)
+    mono_result = measure_run(_flushed(mono.process_sequential), image_paths, out_mono, batch_size=batch_size)  # Exécute et mesure la version séquentielle
     export_results(results_dir, "mono", mono_result)  # Exporte les résultats au format JSON et CSV
     experiments.append(("mono", mono_result))  # Ajoute les résultats à la liste d'expériences
     
@@ -74,10 +240,9 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
         print("=" * 60)  # Affiche une ligne de séparation
         print(f"Running threading ({n} threads) SANS LOCK (race condition)...")  # Affiche le message avec le nombre de threads
         print("=" * 60)  # Affiche une ligne de séparation
-        out_thread = os.path.join(output_dir, f"threading_{n}_no_lock")  # Construit le chemin du dossier de sortie
-        os.makedirs(out_thread, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas
+        out_thread = out_dirs[f"threading_{n}_no_lock"]  # Dossier de sortie (créé avant les mesures)
         thr_res = measure_run(  # Exécute et mesure la version threading sans lock
-            threading_version.process_threading,  # Fonction à exécuter
+            _flushed(threading_version.process_threading),  # Fonction à exécuter
             image_paths,  # Liste des images à traiter
             out_thread,  # Dossier de sortie
             n_threads=n,  # Nombre de threads
@@ -91,14 +256,14 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
         print("=" * 60)  # Affiche une ligne de séparation
         print(f"Running threading ({n} threads) AVEC LOCK (mutex)...")  # Affiche le message avec le nombre de threads
         print("=" * 60)  # Affiche une ligne de séparation
-        out_thread = os.path.join(output_dir, f"threading_{n}_with_lock")  # Construit le chemin du dossier de sortie
-        os.makedirs(out_thread, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas
+        out_thread = out_dirs[f"threading_{n}_with_lock"]  # Dossier de sortie (créé avant les mesures)
         thr_res = measure_run(  # Exécute et mesure la version threading avec lock
-            threading_version.process_threading,  # Fonction à exécuter
+            _flushed(threading_version.process_threading),  # Fonction à exécuter
             image_paths,  # Liste des images à traiter
             out_thread,  # Dossier de sortie
             n_threads=n,  # Nombre de threads
-            use_lock=True  # Active la protection par lock (correction des race conditions)
+            use_lock=True,  # Active la protection par lock (correction des race conditions)
+            local_results=local_results  # Cases de résultats préallouées si demandé (sans verrou)
         )
         export_results(results_dir, f"threading_{n}_with_lock", thr_res)  # Exporte les résultats
         experiments.append((f"threading_{n}_with_lock", thr_res))  # Ajoute les résultats à la liste
@@ -108,10 +273,9 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
         print("=" * 60)  # Affiche une ligne de séparation
         print(f"Running threading ({n} threads) AVEC SEMAPHORE...")  # Affiche le message avec le nombre de threads
         print("=" * 60)  # Affiche une ligne de séparation
-        out_thread = os.path.join(output_dir, f"threading_{n}_semaphore")  # Construit le chemin du dossier de sortie
-        os.makedirs(out_thread, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas
+        out_thread = out_dirs[f"threading_{n}_semaphore"]  # Dossier de sortie (créé avant les mesures)
         thr_res = measure_run(  # Exécute et mesure la version threading avec semaphore
-            threading_version.process_threading,  # Fonction à exécuter
+            _flushed(threading_version.process_threading),  # Fonction à exécuter
             image_paths,  # Liste des images à traiter
             out_thread,  # Dossier de sortie
             n_threads=n,  # Nombre de threads
@@ -123,18 +287,18 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
         experiments.append((f"threading_{n}_semaphore", thr_res))  # Ajoute les résultats à la liste
     
     # 5: Multiprocessing AVEC lock
-    for n in sizes.get("processes", [os.cpu_count() or 2]):  # Parcourt chaque nombre de processus à tester (défaut: nombre de CPU)
+    for n in sizes.get("processes", [default_workers()]):  # Parcourt chaque nombre de processus à tester (défaut: nombre de CPU)
         print("=" * 60)  # Affiche une ligne de séparation
         print(f"Running multiprocessing ({n} workers) AVEC LOCK...")  # Affiche le message avec le nombre de processus
         print("=" * 60)  # Affiche une ligne de séparation
-        out_mp = os.path.join(output_dir, f"multiproc_{n}_with_lock")  # Construit le chemin du dossier de sortie
-        os.makedirs(out_mp, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas
+        out_mp = out_dirs[f"multiproc_{n}_with_lock"]  # Dossier de sortie (créé avant les mesures)
         mp_res = measure_run(  # Exécute et mesure la version multiprocessing avec lock
-            multiprocessing_version.process_multiprocessing,  # Fonction à exécuter
+            _flushed(_pool_or_sequential(multiprocessing_version.process_multiprocessing, n, len(image_paths), bypass_small_pools)),  # Fonction à exécuter
             image_paths,  # Liste des images à traiter
             out_mp,  # Dossier de sortie
             n_workers=n,  # Nombre de processus workers
-            use_lock=True  # Active la protection par lock multiprocessing
+            use_lock=True,  # Active la protection par lock multiprocessing
+            pin=pin_workers  # Épingle chaque worker sur un cœur si demandé
         )
         export_results(results_dir, f"multiprocessing_{n}_with_lock", mp_res)  # Exporte les résultats
         experiments.append((f"multiprocessing_{n}_with_lock", mp_res))  # Ajoute les résultats à la liste
@@ -144,13 +308,15 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
         print("=" * 60)  # Affiche une ligne de séparation
         print(f"Running ThreadPoolExecutor ({n} workers) AVEC LOCK...")  # Affiche le message avec le nombre de workers
         print("=" * 60)  # Affiche une ligne de séparation
-        out_tpe = os.path.join(output_dir, f"threadpool_{n}_with_lock")  # Construit le chemin du dossier de sortie
-        os.makedirs(out_tpe, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas
+        out_tpe = out_dirs[f"threadpool_{n}_with_lock"]  # Dossier de sortie (créé avant les mesures)
         tpe_res = measure_run(  # Exécute et mesure la version ThreadPoolExecutor avec lock
-            threadpool_executor.process_threadpool,  # Fonction à exécuter
+            _flushed(threadpool_executor.process_threadpool),  # Fonction à exécuter
             image_paths,  # Liste des images à traiter
             out_tpe,  # Dossier de sortie
             max_workers=n,  # Nombre maximum de threads workers
+            executor=pools.get(("thread", n)),  # Pool de threads partagé (None = nouveau pool)
+            pin=pin_workers,  # Épingle chaque thread sur un cœur si demandé
+            prefetch=prefetch_io,  # Threads d'E/S de lecture anticipée (0 = aucun)
             use_lock=True  # Active la protection par lock
         )
         export_results(results_dir, f"threadpool_{n}_with_lock", tpe_res)  # Exporte les résultats
@@ -161,13 +327,15 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
         print("=" * 60)  # Affiche une ligne de séparation
         print(f"Running ThreadPoolExecutor ({n} workers) AVEC SEMAPHORE...")  # Affiche le message avec le nombre de workers
         print("=" * 60)  # Affiche une ligne de séparation
-        out_tpe = os.path.join(output_dir, f"threadpool_{n}_semaphore")  # Construit le chemin du dossier de sortie
-        os.makedirs(out_tpe, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas
+        out_tpe = out_dirs[f"threadpool_{n}_semaphore"]  # Dossier de sortie (créé avant les mesures)
         tpe_res = measure_run(  # Exécute et mesure la version ThreadPoolExecutor avec semaphore
-            threadpool_executor.process_threadpool,  # Fonction à exécuter
+            _flushed(threadpool_executor.process_threadpool),  # Fonction à exécuter
             image_paths,  # Liste des images à traiter
             out_tpe,  # Dossier de sortie
             max_workers=n,  # Nombre maximum de threads workers
+            executor=pools.get(("thread", n)),  # Pool de threads partagé (None = nouveau pool)
+            pin=pin_workers,  # Épingle chaque thread sur un cœur si demandé
+            prefetch=prefetch_io,  # Threads d'E/S de lecture anticipée (0 = aucun)
             use_lock=False,  # Désactive le lock (on utilise le semaphore)
             use_semaphore=True,  # Active le semaphore pour limiter l'accès concurrent
             max_concurrent_log=2  # Nombre maximum de threads pouvant écrire simultanément
@@ -176,22 +344,220 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
         experiments.append((f"threadpool_{n}_semaphore", tpe_res))  # Ajoute les résultats à la liste
     
     # 8: ProcessPoolExecutor AVEC lock
-    for n in sizes.get("processes", [os.cpu_count() or 2]):  # Parcourt chaque nombre de processus à tester (défaut: nombre de CPU)
+    for n in sizes.get("processes", [default_workers()]):  # Parcourt chaque nombre de processus à tester (défaut: nombre de CPU)
         print("=" * 60)  # Affiche une ligne de séparation
         print(f"Running ProcessPoolExecutor ({n} workers) AVEC LOCK...")  # Affiche le message avec le nombre de workers
         print("=" * 60)  # Affiche une ligne de séparation
-        out_ppe = os.path.join(output_dir, f"processpool_{n}_with_lock")  # Construit le chemin du dossier de sortie
-        os.makedirs(out_ppe, exist_ok=True)  # Crée le dossier de sortie s'il n'existe pas
+        out_ppe = out_dirs[f"processpool_{n}_with_lock"]  # Dossier de sortie (créé avant les mesures)
         ppe_res = measure_run(  # Exécute et mesure la version ProcessPoolExecutor avec lock
-            processpool_executor.process_processpool,  # Fonction à exécuter
+            _flushed(_pool_or_sequential(processpool_executor.process_processpool, n, len(image_paths), bypass_small_pools)),  # Fonction à exécuter
             image_paths,  # Liste des images à traiter
             out_ppe,  # Dossier de sortie
             max_workers=n,  # Nombre maximum de processus workers
-            use_lock=True  # Active la protection par lock multiprocessing
+            executor=pools.get(("proc", n)),  # Pool de processus partagé (None = nouveau pool)
+            use_lock=True,  # Active la protection par lock multiprocessing
+            pin=pin_workers  # Épingle chaque worker sur un cœur si demandé
         )
         export_results(results_dir, f"processpool_{n}_with_lock", ppe_res)  # Exporte les résultats
         experiments.append((f"processpool_{n}_with_lock", ppe_res))  # Ajoute les résultats à la liste
     
+    # 9: Logger asynchrone (optionnel) : threading puis ThreadPoolExecutor
+    if async_log:  # Uniquement si demandé (--async-log)
+        for n in sizes.get("threads", [4]):  # Parcourt chaque nombre de threads à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running threading ({n} threads) AVEC LOGGER ASYNCHRONE...")  # Affiche le message avec le nombre de threads
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_thread = out_dirs[f"threading_{n}_async_log"]  # Dossier de sortie (créé avant les mesures)
+            thr_res = measure_run(  # Exécute et mesure la version threading avec logger asynchrone
+                _flushed(threading_version.process_threading),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_thread,  # Dossier de sortie
+                n_threads=n,  # Nombre de threads
+                use_lock=True,  # Protection de la liste des résultats par lock
+                async_log=True,  # Log via la file du logger asynchrone
+                local_results=local_results  # Cases de résultats préallouées si demandé (sans verrou)
+            )
+            export_results(results_dir, f"threading_{n}_async_log", thr_res)  # Exporte les résultats
+            experiments.append((f"threading_{n}_async_log", thr_res))  # Ajoute les résultats à la liste
+        for n in sizes.get("threads", [4]):  # Parcourt chaque nombre de threads à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running ThreadPoolExecutor ({n} workers) AVEC LOGGER ASYNCHRONE...")  # Affiche le message avec le nombre de workers
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_tpe = out_dirs[f"threadpool_{n}_async_log"]  # Dossier de sortie (créé avant les mesures)
+            tpe_res = measure_run(  # Exécute et mesure la version ThreadPoolExecutor avec logger asynchrone
+                _flushed(threadpool_executor.process_threadpool),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_tpe,  # Dossier de sortie
+                max_workers=n,  # Nombre maximum de threads workers
+                executor=pools.get(("thread", n)),  # Pool de threads partagé (None = nouveau pool)
+                pin=pin_workers,  # Épingle chaque thread sur un cœur si demandé
+                prefetch=prefetch_io,  # Threads d'E/S de lecture anticipée (0 = aucun)
+                use_lock=True,  # Log protégé (par la file du logger asynchrone)
+                async_log=True  # Log via la file du logger asynchrone
+            )
+            export_results(results_dir, f"threadpool_{n}_async_log", tpe_res)  # Exporte les résultats
+            experiments.append((f"threadpool_{n}_async_log", tpe_res))  # Ajoute les résultats à la liste
+    
+    # 10: Logs par thread/processus fusionnés à la fin (optionnel)
+    if sharded_log:  # Uniquement si demandé (--sharded-log)
+        for n in sizes.get("threads", [4]):  # Parcourt chaque nombre de threads à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running threading ({n} threads) AVEC LOGS PAR THREAD...")  # Affiche le message avec le nombre de threads
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_thread = out_dirs[f"threading_{n}_sharded_log"]  # Dossier de sortie (créé avant les mesures)
+            thr_res = measure_run(  # Exécute et mesure la version threading avec logs par thread
+                _flushed(threading_version.process_threading),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_thread,  # Dossier de sortie
+                n_threads=n,  # Nombre de threads
+                use_lock=True,  # Protection de la liste des résultats par lock
+                sharded_log=True,  # Log dans un tampon par thread
+                local_results=local_results  # Cases de résultats préallouées si demandé (sans verrou)
+            )
+            export_results(results_dir, f"threading_{n}_sharded_log", thr_res)  # Exporte les résultats
+            experiments.append((f"threading_{n}_sharded_log", thr_res))  # Ajoute les résultats à la liste
+        for n in sizes.get("threads", [4]):  # Parcourt chaque nombre de threads à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running ThreadPoolExecutor ({n} workers) AVEC LOGS PAR THREAD...")  # Affiche le message avec le nombre de workers
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_tpe = out_dirs[f"threadpool_{n}_sharded_log"]  # Dossier de sortie (créé avant les mesures)
+            tpe_res = measure_run(  # Exécute et mesure la version ThreadPoolExecutor avec logs par thread
+                _flushed(threadpool_executor.process_threadpool),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_tpe,  # Dossier de sortie
+                max_workers=n,  # Nombre maximum de threads workers
+                executor=pools.get(("thread", n)),  # Pool de threads partagé (None = nouveau pool)
+                pin=pin_workers,  # Épingle chaque thread sur un cœur si demandé
+                prefetch=prefetch_io,  # Threads d'E/S de lecture anticipée (0 = aucun)
+                use_lock=True,  # Log protégé (fusion des tampons sous verrou)
+                sharded_log=True  # Log dans un tampon par thread
+            )
+            export_results(results_dir, f"threadpool_{n}_sharded_log", tpe_res)  # Exporte les résultats
+            experiments.append((f"threadpool_{n}_sharded_log", tpe_res))  # Ajoute les résultats à la liste
+        for n in sizes.get("processes", [default_workers()]):  # Parcourt chaque nombre de processus à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running multiprocessing ({n} processes) AVEC LOGS PAR PROCESSUS...")  # Affiche le message avec le nombre de processus
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_mp = out_dirs[f"multiproc_{n}_sharded_log"]  # Dossier de sortie (créé avant les mesures)
+            mp_res = measure_run(  # Exécute et mesure la version multiprocessing avec logs par processus
+                _flushed(_pool_or_sequential(multiprocessing_version.process_multiprocessing, n, len(image_paths), bypass_small_pools)),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_mp,  # Dossier de sortie
+                n_workers=n,  # Nombre de processus workers
+                use_lock=True,  # Log protégé (un fichier par processus)
+                sharded_log=True,  # Log dans un fichier par processus, fusionné après le pool
+                pin=pin_workers  # Épingle chaque worker sur un cœur si demandé
+            )
+            export_results(results_dir, f"multiprocessing_{n}_sharded_log", mp_res)  # Exporte les résultats
+            experiments.append((f"multiprocessing_{n}_sharded_log", mp_res))  # Ajoute les résultats à la liste
+        for n in sizes.get("processes", [default_workers()]):  # Parcourt chaque nombre de processus à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running ProcessPoolExecutor ({n} workers) AVEC LOGS PAR PROCESSUS...")  # Affiche le message avec le nombre de workers
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_ppe = out_dirs[f"processpool_{n}_sharded_log"]  # Dossier de sortie (créé avant les mesures)
+            ppe_res = measure_run(  # Exécute et mesure la version ProcessPoolExecutor avec logs par processus
+                _flushed(_pool_or_sequential(processpool_executor.process_processpool, n, len(image_paths), bypass_small_pools)),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_ppe,  # Dossier de sortie
+                max_workers=n,  # Nombre maximum de processus workers
+                executor=pools.get(("proc", n)),  # Pool de processus partagé (None = nouveau pool)
+                use_lock=True,  # Log protégé (un fichier par worker)
+                sharded_log=True,  # Log dans un fichier par worker, fusionné après le pool
+                pin=pin_workers  # Épingle chaque worker sur un cœur si demandé
+            )
+            export_results(results_dir, f"processpool_{n}_sharded_log", ppe_res)  # Exporte les résultats
+            experiments.append((f"processpool_{n}_sharded_log", ppe_res))  # Ajoute les résultats à la liste
+    
+    # 11: Logs sans verrou en ajout atomique O_APPEND (optionnel)
+    if append_log:  # Uniquement si demandé (--append-log)
+        for n in sizes.get("threads", [4]):  # Parcourt chaque nombre de threads à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running threading ({n} threads) AVEC LOG EN AJOUT ATOMIQUE (SANS VERROU)...")  # Affiche le message avec le nombre de threads
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_thread = out_dirs[f"threading_{n}_append_log"]  # Dossier de sortie (créé avant les mesures)
+            thr_res = measure_run(  # Exécute et mesure la version threading avec log O_APPEND
+                _flushed(threading_version.process_threading),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_thread,  # Dossier de sortie
+                n_threads=n,  # Nombre de threads
+                use_lock=True,  # Protection de la liste des résultats par lock
+                append_log=True,  # Log par os.write en O_APPEND, sans verrou
+                local_results=local_results  # Cases de résultats préallouées si demandé (sans verrou)
+            )
+            export_results(results_dir, f"threading_{n}_append_log", thr_res)  # Exporte les résultats
+            experiments.append((f"threading_{n}_append_log", thr_res))  # Ajoute les résultats à la liste
+        for n in sizes.get("threads", [4]):  # Parcourt chaque nombre de threads à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running ThreadPoolExecutor ({n} workers) AVEC LOG EN AJOUT ATOMIQUE (SANS VERROU)...")  # Affiche le message avec le nombre de workers
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_tpe = out_dirs[f"threadpool_{n}_append_log"]  # Dossier de sortie (créé avant les mesures)
+            tpe_res = measure_run(  # Exécute et mesure la version ThreadPoolExecutor avec log O_APPEND
+                _flushed(threadpool_executor.process_threadpool),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_tpe,  # Dossier de sortie
+                max_workers=n,  # Nombre maximum de threads workers
+                executor=pools.get(("thread", n)),  # Pool de threads partagé (None = nouveau pool)
+                pin=pin_workers,  # Épingle chaque thread sur un cœur si demandé
+                prefetch=prefetch_io,  # Threads d'E/S de lecture anticipée (0 = aucun)
+                use_lock=True,  # Log via le logger (atomicité assurée par le noyau)
+                append_log=True  # Log par os.write en O_APPEND, sans verrou
+            )
+            export_results(results_dir, f"threadpool_{n}_append_log", tpe_res)  # Exporte les résultats
+            experiments.append((f"threadpool_{n}_append_log", tpe_res))  # Ajoute les résultats à la liste
+        for n in sizes.get("processes", [default_workers()]):  # Parcourt chaque nombre de processus à tester
+            print("=" * 60)  # Affiche une ligne de séparation
+            print(f"Running multiprocessing ({n} processes) AVEC LOG EN AJOUT ATOMIQUE (SANS VERROU)...")  # Affiche le message avec le nombre de processus
+            print("=" * 60)  # Affiche une ligne de séparation
+            out_mp = out_dirs[f"multiproc_{n}_append_log"]  # Dossier de sortie (créé avant les mesures)
+            mp_res = measure_run(  # Exécute et mesure la version multiprocessing avec log O_APPEND
+                _flushed(_pool_or_sequential(multiprocessing_version.process_multiprocessing, n, len(image_paths), bypass_small_pools)),  # Fonction à exécuter
+                image_paths,  # Liste des images à traiter
+                out_mp,  # Dossier de sortie
+                n_workers=n,  # Nombre de processus workers
+                use_lock=True,  # Log via le logger (atomicité assurée par le noyau)
+                append_log=True,  # Log par os.write en O_APPEND, sans multiprocessing.Lock
+                pin=pin_workers  # Épingle chaque worker sur un cœur si demandé
+            )
+            export_results(results_dir, f"multiprocessing_{n}_append_log", mp_res)  # Exporte les résultats
+            experiments.append((f"multiprocessing_{n}_append_log", mp_res))  # Ajoute les résultats à la liste
+    
+    # 12: GPU par lots (optionnel)
+    if use_gpu:  # Uniquement si demandé (--gpu)
+        print("=" * 60)  # Affiche une ligne de séparation
+        print(f"Running GPU (CuPy, lots de {batch_size or 8} images)...")  # Affiche le message avec la taille des lots
+        print("=" * 60)  # Affiche une ligne de séparation
+        out_gpu = out_dirs["gpu"]  # Dossier de sortie (créé avant les mesures)
+        gpu_res = measure_run(gpu.process_gpu, image_paths, out_gpu, batch=batch_size or 8)  # Exécute et mesure la version GPU
+        export_results(results_dir, "gpu", gpu_res)  # Exporte les résultats
+        experiments.append(("gpu", gpu_res))  # Ajoute les résultats à la liste
+    
+    # 13: libvips en flux (optionnel)
+    if use_vips:  # Uniquement si demandé (--vips)
+        print("=" * 60)  # Affiche une ligne de séparation
+        print("Running libvips (pyvips, pipeline en flux)...")  # Affiche le message de l'expérience
+        print("=" * 60)  # Affiche une ligne de séparation
+        out_vips = out_dirs["vips"]  # Dossier de sortie (créé avant les mesures)
+        vips_res = measure_run(vips.process_vips, image_paths, out_vips)  # Exécute et mesure la version libvips
+        export_results(results_dir, "vips", vips_res)  # Exporte les résultats
+        experiments.append(("vips", vips_res))  # Ajoute les résultats à la liste
+    
+    for ex in pools.values():  # Arrête les pools partagés
+        ex.shutdown()  # Attend la fin des workers
+    
+    # 14: Numba par lots (optionnel), en dernier : le pool de threads de Numba démarré
+    # par cette version ne doit précéder aucun fork (pools de processus arrêtés ci-dessus)
+    if use_numba_batch:  # Uniquement si demandé (--numba-batch)
+        print("=" * 60)  # Affiche une ligne de séparation
+        print(f"Running Numba batch (prange, lots de {batch_size or 64} images)...")  # Affiche le message avec la taille des lots
+        print("=" * 60)  # Affiche une ligne de séparation
+        out_nb = out_dirs["numba_batch"]  # Dossier de sortie (créé avant les mesures)
+        nb_res = measure_run(numba_batch.process_numba_batch, image_paths, out_nb, batch=batch_size or 64)  # Exécute et mesure la version Numba par lots
+        export_results(results_dir, "numba_batch", nb_res)  # Exporte les résultats
+        experiments.append(("numba_batch", nb_res))  # Ajoute les résultats à la liste
+    
+    if cache_dir:  # Cache activé : limite sa taille sur disque
+        prune(1 << 30, cache_dir)  # Garde au plus 1 Gio d'entrées (les moins récemment utilisées sont supprimées)
+    
     # Résumé comparatif
     print("=" * 60)  # Affiche une ligne de séparation
     print("Génération du résumé comparatif...")  # Affiche le message de génération du résumé
@@ -199,6 +565,7 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
     
     summary = {  # Crée le dictionnaire de résumé
         "n_images": len(image_paths),  # Nombre total d'images traitées
+        "gil_enabled": gil_enabled(),  # GIL actif pendant les expériences (False sous CPython free-threaded)
         "experiments": []  # Liste vide pour stocker les données de chaque expérience
     }
     
@@ -217,8 +584,7 @@ def run_all(images_dir: str, output_dir: str, results_dir: str, sizes: dict):
         summary["experiments"].append(exp_data)  # Ajoute les données de cette expérience au résumé
     
     summary_path = os.path.join(results_dir, "summary.json")  # Construit le chemin du fichier de résumé
-    with open(summary_path, "w", encoding="utf-8") as f:  # Ouvre le fichier en mode écriture avec encodage UTF-8
-        json.dump(summary, f, indent=2, ensure_ascii=False)  # Écrit le résumé au format JSON (indenté, avec caractères Unicode)
+    save_results_json(summary_path, summary)  # Écrit le résumé au format JSON en un seul appel (orjson si disponible)
     
     print("=" * 60)  # Affiche une ligne de séparation
     print("Toutes les expériences sont terminées!")  # Affiche le message de fin
@@ -234,8 +600,34 @@ if __name__ == "__main__":  # Vérifie si le script est exécuté directement (p
     parser.add_argument("--images", default="./images", help="Folder with images")  # Argument pour le dossier d'images (défaut: ./images)
     parser.add_argument("--output", default="./output", help="Folder for output images")  # Argument pour le dossier de sortie (défaut: ./output)
     parser.add_argument("--results", default="./results", help="Folder for results")  # Argument pour le dossier de résultats (défaut: ./results)
-    parser.add_argument("--threads", nargs="+", type=int, default=[2, 4, 8], help="Thread counts to test")  # Argument pour les nombres de threads (défaut: 2, 4, 8)
-    parser.add_argument("--processes", nargs="+", type=int, default=[2, 4], help="Process counts to test")  # Argument pour les nombres de processus (défaut: 2, 4)
+    parser.add_argument("--threads", nargs="+", type=int, default=[2, 4, 8], help="Thread counts to test (0 = no thread-based experiment)")  # Argument pour les nombres de threads (défaut: 2, 4, 8)
+    parser.add_argument("--processes", nargs="+", type=int, default=[2, 4], help="Process counts to test (0 = no process-based experiment)")  # Argument pour les nombres de processus (défaut: 2, 4)
+    parser.add_argument("--batch-size", type=int, default=None, help="Batch size for the mono version (requires NumPy)")  # Argument pour la conversion par lots de la version mono (défaut: image par image)
+    parser.add_argument("--batched-writes", type=int, default=None, help="Write output images in batches of this size (io_uring when liburing is installed)")  # Argument pour l'écriture groupée des images (défaut: sauvegarde synchrone)
+    parser.add_argument("--async-log", action="store_true", help="Also run the threading/threadpool versions with the asynchronous logger")  # Argument pour ajouter les expériences avec logger asynchrone
+    parser.add_argument("--sharded-log", action="store_true", help="Also run the versions with per-thread/per-process log buffers merged at the end")  # Argument pour ajouter les expériences avec logs par thread/processus
+    parser.add_argument("--append-log", action="store_true", help="Also run the versions with a lock-free O_APPEND logger")  # Argument pour ajouter les expériences avec log sans verrou
+    parser.add_argument("--uring-log", action="store_true", help="With --async-log, the writer thread submits log blocks through io_uring (liburing binding, else os.write)")  # Argument pour les écritures io_uring du logger asynchrone
+    parser.add_argument("--prefetch-io", type=int, default=0, help="ThreadPoolExecutor versions read input files with this many I/O threads ahead of the compute pool")  # Argument pour la lecture anticipée des images
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_DIR, default=None, help="Reuse converted images across experiments from this cache folder (default: ~/.cache/img_gray)")  # Argument pour activer le cache des conversions
+    parser.add_argument("--reuse-pools", action="store_true", help="Share one ThreadPoolExecutor/ProcessPoolExecutor per size across experiments")  # Argument pour réutiliser les pools entre expériences
+    parser.add_argument("--preload", action="store_true", help="Read every input image once into memory and share it across experiments")  # Argument pour précharger les images en mémoire
+    parser.add_argument("--gpu", action="store_true", help="Also run the GPU batch version (requires CuPy)")  # Argument pour ajouter l'expérience GPU
+    parser.add_argument("--vips", action="store_true", help="Also run the libvips streaming version (requires pyvips)")  # Argument pour ajouter l'expérience libvips
+    parser.add_argument("--numba-batch", action="store_true", help="Also run the Numba batch version (one parallel compiled call per batch, requires Numba)")  # Argument pour ajouter l'expérience Numba par lots
+    parser.add_argument("--pin-workers", action="store_true", help="Pin each multiprocessing/ProcessPoolExecutor worker and ThreadPoolExecutor thread to one CPU core")  # Argument pour épingler les processus workers
+    parser.add_argument("--bypass-small-pools", action="store_true", help="Run process-based experiments sequentially when there is 1 worker or fewer than 4 images")  # Argument pour contourner les pools non amortis
+    parser.add_argument("--local-results", action="store_true", help="Threading versions with a lock store each result in a preallocated slot instead of appending under a lock")  # Argument pour les cases de résultats préallouées
+    parser.add_argument("--jpeg-draft", action="store_true", help="Decode JPEG inputs straight to luma (faster, output pixels differ slightly)")  # Argument pour le décodage JPEG en luminance
+    parser.add_argument("--largest-first", action="store_true", help="Process the largest input files first (reduces the tail when image sizes vary)")  # Argument pour l'ordonnancement par taille décroissante
+    parser.add_argument("--skip-up-to-date", action="store_true", help="Do not reconvert images whose output exists and is newer than the input")  # Argument pour sauter les sorties déjà à jour
     args = parser.parse_args()  # Parse les arguments de la ligne de commande
-    sizes = {"threads": args.threads, "processes": args.processes}  # Crée le dictionnaire avec les tailles à tester
-    run_all(args.images, args.output, args.results, sizes)  # Lance toutes les expériences avec les paramètres fournis
+    sizes = {"threads": [n for n in args.threads if n > 0], "processes": [n for n in args.processes if n > 0]}  # Crée le dictionnaire avec les tailles à tester (0 = aucune)
+    run_all(args.images, args.output, args.results, sizes, batch_size=args.batch_size, use_gpu=args.gpu,
+            batched_writes=args.batched_writes, async_log=args.async_log,
+            sharded_log=args.sharded_log, cache_dir=args.cache,
+            reuse_pools=args.reuse_pools, preload=args.preload, use_vips=args.vips,
+            pin_workers=args.pin_workers, skip_up_to_date=args.skip_up_to_date,
+            append_log=args.append_log, bypass_small_pools=args.bypass_small_pools,
+            local_results=args.local_results, use_numba_batch=args.numba_batch, jpeg_draft=args.jpeg_draft,
+            largest_first=args.largest_first, uring_log=args.uring_log, prefetch_io=args.prefetch_io)  # Lance toutes les expériences avec les paramètres fournis
@@ -12,15 +12,53 @@ Ce module fournit des classes et outils pour :
 3. Limiter l'accès concurrent avec des Sémaphores
 4. Mesurer l'impact de la synchronisation sur les performances
 5. Gérer la synchronisation entre processus (multiprocessing)
+6. Centraliser les écritures de log dans un thread dédié (logger asynchrone, io_uring optionnel)
+7. Tamponner le log par thread/processus et fusionner à la fin (sharding)
+8. Écrire le log sans verrou en s'appuyant sur l'ajout atomique du noyau (O_APPEND)
+9. Compter sans verrou avec une opération C atomique sous le GIL (itertools.count)
+10. Agréger les métriques de tous les processus en mémoire partagée (RawArray)
+11. Compter entre processus sans verrou, une case partagée par processus (ShardedProcessCounter)
 
 Toutes les classes incluent des métriques de synchronisation pour analyser
 la contention et les temps d'attente sur les verrous.
 """
 import threading  # Module pour la création et gestion de threads
+import os  # Module pour les écritures bas niveau (os.write, os.fsync)
+import queue  # Module pour la file sans verrou applicatif (SimpleQueue) du logger asynchrone
 import multiprocessing  # Module pour la création et gestion de processus
 import time  # Module pour mesurer le temps (perf_counter pour haute précision)
-from typing import Dict, Any  # Types pour les annotations de type
+import itertools  # Module pour le compteur atomique sans verrou (itertools.count)
+import array  # Module pour les tableaux de doubles préalloués (échantillons des temps d'attente)
+import errno  # Codes d'erreur (EINVAL : O_DIRECT refusé par le système de fichiers)
+import mmap  # Tampons alignés sur une page pour les écritures O_DIRECT du logger asynchrone
+from typing import Dict, Any, Sequence  # Types pour les annotations de type
+
+try:  # NumPy est optionnel (percentiles sur les échantillons conservés)
+    import numpy as np  # Module de calcul numérique sur tableaux
+except ImportError:  # Si NumPy n'est pas installé
+    np = None  # Repli sur un tri Python
+try:  # Le binding liburing est optionnel (écritures io_uring du logger asynchrone, Linux uniquement)
+    import liburing  # Binding Python de liburing (io_uring)
+except ImportError:  # Si liburing n'est pas installé (ou hors Linux)
+    liburing = None  # Repli sur os.write
 from collections import defaultdict  # Import non utilisé mais gardé pour compatibilité
+from .common import default_workers  # Nombre de cœurs autorisés (nombre de permis par défaut du sémaphore)
+
+_LOG_BUF = 1 << 20  # Taille du tampon (1 Mio) du fichier de log gardé ouvert en mode context manager
+_ASYNC_BATCH = 256  # Nombre maximum de messages retirés de la file en une fois par le logger asynchrone
+_ASYNC_BLOCK = 128 << 10  # Taille (128 Kio) à partir de laquelle le logger asynchrone écrit ses messages accumulés
+_ASYNC_URING = False  # Valeur par défaut de use_uring pour les loggers asynchrones (voir set_async_uring)
+_DIRECT_ALIGN = 4096  # Alignement (adresse, taille, position) des écritures O_DIRECT : multiple des tailles de bloc usuelles
+
+
+def set_async_uring(enabled: bool):
+    """
+    Active ou désactive par défaut les écritures io_uring des loggers asynchrones créés ensuite.
+    
+    Sans le binding liburing (ou hors Linux), les loggers écrivent avec os.write.
+    """
+    global _ASYNC_URING  # Déclare qu'on modifie la variable globale
+    _ASYNC_URING = enabled  # Mémorise le choix
 
 
 class SynchronizationMetrics:
@@ -32,39 +70,103 @@ class SynchronizationMetrics:
     - Temps passé en attente sur les sémaphores
     - Nombre de contentions (fois où un thread/processus a dû attendre)
     - Nombre d'acquisitions de verrous/sémaphores
+    
+    Par défaut, seuls des agrégats sont gardés (nombre, somme, maximum). Avec
+    capacity > 0, les capacity premiers temps d'attente de chaque type sont
+    aussi conservés dans des tableaux de doubles préalloués (aucune
+    réallocation pendant la mesure ; les mesures suivantes ne sont comptées
+    que dans les agrégats), par exemple pour tracer un histogramme.
     """
     
-    def __init__(self):
-        """Initialise les conteneurs pour stocker les métriques de synchronisation"""
-        self.lock_wait_times = []  # Liste pour stocker tous les temps d'attente sur les verrous
-        self.semaphore_wait_times = []  # Liste pour stocker tous les temps d'attente sur les sémaphores
+    def __init__(self, capacity: int = 0):
+        """Initialise les agrégats des métriques de synchronisation (et les tableaux d'échantillons si capacity > 0)"""
+        self._capacity = capacity  # Nombre maximum d'échantillons conservés par type d'attente (0 = aucun)
+        self._lock_samples = array.array('d', bytes(8 * capacity)) if capacity else None  # Temps d'attente sur verrous, préalloués
+        self._semaphore_samples = array.array('d', bytes(8 * capacity)) if capacity else None  # Temps d'attente sur sémaphores, préalloués
+        self._lock_wait_n = 0  # Nombre de mesures d'attente sur les verrous
+        self._lock_wait_sum = 0.0  # Somme des temps d'attente sur les verrous
+        self._lock_wait_max = 0.0  # Temps d'attente maximum sur un verrou
+        self._semaphore_wait_n = 0  # Nombre de mesures d'attente sur les sémaphores
+        self._semaphore_wait_sum = 0.0  # Somme des temps d'attente sur les sémaphores
         self.lock_acquire_count = 0  # Compteur du nombre total d'acquisitions de verrous
         self.semaphore_acquire_count = 0  # Compteur du nombre total d'acquisitions de sémaphores
         self.contention_count = 0  # Compteur du nombre de fois où un thread/processus a dû attendre (temps > 0)
         
     def record_lock_wait(self, wait_time: float):
         """Enregistre le temps d'attente sur un verrou"""
-        self.lock_wait_times.append(wait_time)  # Ajoute le temps d'attente à la liste
+        if self._lock_wait_n < self._capacity:  # Place libre dans le tableau d'échantillons (toujours faux si capacity = 0)
+            self._lock_samples[self._lock_wait_n] = wait_time  # Conserve l'échantillon (écriture en place, sans allocation)
+        self._lock_wait_n += 1  # Compte la mesure
+        self._lock_wait_sum += wait_time  # Cumule le temps d'attente
+        if wait_time > self._lock_wait_max:  # Nouveau maximum
+            self._lock_wait_max = wait_time  # Mémorise le maximum
         if wait_time > 0:  # Si le temps d'attente est supérieur à 0, c'est une contention
             self.contention_count += 1  # Incrémente le compteur de contention
             
     def record_semaphore_wait(self, wait_time: float):
         """Enregistre le temps d'attente sur un sémaphore"""
-        self.semaphore_wait_times.append(wait_time)  # Ajoute le temps d'attente à la liste
+        if self._semaphore_wait_n < self._capacity:  # Place libre dans le tableau d'échantillons (toujours faux si capacity = 0)
+            self._semaphore_samples[self._semaphore_wait_n] = wait_time  # Conserve l'échantillon (écriture en place, sans allocation)
+        self._semaphore_wait_n += 1  # Compte la mesure
+        self._semaphore_wait_sum += wait_time  # Cumule le temps d'attente
         if wait_time > 0:  # Si le temps d'attente est supérieur à 0, c'est une contention
             self.contention_count += 1  # Incrémente le compteur de contention
             
+    def lock_wait_samples(self) -> memoryview:
+        """Retourne une vue (sans copie) sur les temps d'attente sur verrous conservés (vide si capacity = 0)"""
+        if self._lock_samples is None:  # Aucun échantillon conservé
+            return memoryview(array.array('d'))  # Vue vide
+        return memoryview(self._lock_samples)[:min(self._lock_wait_n, self._capacity)]  # Partie remplie du tableau
+        
+    def semaphore_wait_samples(self) -> memoryview:
+        """Retourne une vue (sans copie) sur les temps d'attente sur sémaphores conservés (vide si capacity = 0)"""
+        if self._semaphore_samples is None:  # Aucun échantillon conservé
+            return memoryview(array.array('d'))  # Vue vide
+        return memoryview(self._semaphore_samples)[:min(self._semaphore_wait_n, self._capacity)]  # Partie remplie du tableau
+            
+    def wait_percentiles(self, percentiles: Sequence[float] = (50, 90, 99), kind: str = "lock") -> Dict[str, float]:
+        """
+        Calcule à la demande des percentiles sur les échantillons conservés (capacity > 0).
+        
+        Args:
+            percentiles: Percentiles à calculer (entre 0 et 100)
+            kind: "lock" (attentes sur verrous) ou "semaphore" (attentes sur sémaphores)
+            
+        Returns:
+            Dictionnaire {"p50": ..., "p90": ...} (vide si aucun échantillon)
+        """
+        samples = self.lock_wait_samples() if kind == "lock" else self.semaphore_wait_samples()  # Vue sur les échantillons
+        if not len(samples):  # Aucun échantillon conservé
+            return {}  # Rien à calculer
+        if np is not None:  # NumPy disponible : réduction vectorisée sur le tampon, sans copie
+            values = np.percentile(np.frombuffer(samples, dtype=np.float64), percentiles)  # Tous les percentiles en un appel
+        else:  # Repli sans NumPy : tri puis rang le plus proche
+            ordered = sorted(samples)  # Échantillons triés
+            values = [ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))] for q in percentiles]  # Rang de chaque percentile
+        return {f"p{q:g}": float(v) for q, v in zip(percentiles, values)}  # Associe chaque percentile à sa valeur
+            
+    @classmethod
+    def from_lock_totals(cls, n: int, total: float, maximum: float, contentions: int) -> "SynchronizationMetrics":
+        """Crée des métriques à partir d'agrégats d'attente sur verrous déjà calculés (ex. en mémoire partagée)"""
+        metrics = cls()  # Métriques vides
+        metrics._lock_wait_n = n  # Nombre de mesures d'attente
+        metrics._lock_wait_sum = total  # Somme des temps d'attente
+        metrics._lock_wait_max = maximum  # Temps d'attente maximum
+        metrics.lock_acquire_count = n  # Une acquisition par mesure
+        metrics.contention_count = contentions  # Nombre de contentions
+        return metrics  # Retourne les métriques reconstituées
+            
     def get_stats(self) -> Dict[str, Any]:
-        """Retourne les statistiques de synchronisation calculées"""
-        total_lock_wait = sum(self.lock_wait_times) if self.lock_wait_times else 0  # Somme tous les temps d'attente sur verrous
-        total_semaphore_wait = sum(self.semaphore_wait_times) if self.semaphore_wait_times else 0  # Somme tous les temps d'attente sur sémaphores
+        """Retourne les statistiques de synchronisation (calculées en O(1) depuis les agrégats)"""
+        total_lock_wait = self._lock_wait_sum  # Temps total d'attente sur verrous
+        total_semaphore_wait = self._semaphore_wait_sum  # Temps total d'attente sur sémaphores
         
         return {  # Retourne un dictionnaire avec toutes les statistiques
             "total_lock_wait_time": total_lock_wait,  # Temps total passé en attente sur les verrous
-            "avg_lock_wait_time": total_lock_wait / len(self.lock_wait_times) if self.lock_wait_times else 0,  # Temps moyen d'attente sur les verrous
-            "max_lock_wait_time": max(self.lock_wait_times) if self.lock_wait_times else 0,  # Temps maximum d'attente sur un verrou
+            "avg_lock_wait_time": total_lock_wait / self._lock_wait_n if self._lock_wait_n else 0,  # Temps moyen d'attente sur les verrous
+            "max_lock_wait_time": self._lock_wait_max,  # Temps maximum d'attente sur un verrou
             "total_semaphore_wait_time": total_semaphore_wait,  # Temps total passé en attente sur les sémaphores
-            "avg_semaphore_wait_time": total_semaphore_wait / len(self.semaphore_wait_times) if self.semaphore_wait_times else 0,  # Temps moyen d'attente sur les sémaphores
+            "avg_semaphore_wait_time": total_semaphore_wait / self._semaphore_wait_n if self._semaphore_wait_n else 0,  # Temps moyen d'attente sur les sémaphores
             "lock_acquire_count": self.lock_acquire_count,  # Nombre total d'acquisitions de verrous
             "semaphore_acquire_count": self.semaphore_acquire_count,  # Nombre total d'acquisitions de sémaphores
             "contention_count": self.contention_count,  # Nombre total de contentions
@@ -87,16 +189,41 @@ class ThreadSafeCounter:
         self._lock = threading.Lock()  # Crée un verrou pour protéger l'accès au compteur
         self._metrics = SynchronizationMetrics()  # Crée un objet pour collecter les métriques
         
+    def _acquire(self) -> float:
+        """
+        Acquiert le verrou et retourne le temps d'attente.
+        
+        Essaie d'abord de prendre le verrou sans attendre (opération atomique en
+        espace utilisateur, sans appel système) : s'il est libre, l'attente est
+        nulle et aucun chronométrage n'est fait. Sinon, mesure l'attente bloquante.
+        """
+        if self._lock.acquire(False):  # Chemin rapide : verrou libre
+            return 0.0  # Aucune attente
+        start_wait = time.perf_counter()  # Enregistre le temps avant l'attente bloquante
+        self._lock.acquire()  # Attend la libération du verrou (contention)
+        return time.perf_counter() - start_wait  # Temps d'attente pour acquérir le verrou
+        
     def increment(self) -> int:
         """Incrémente le compteur de manière thread-safe"""
-        start_wait = time.perf_counter()  # Enregistre le temps avant d'essayer d'acquérir le verrou
-        with self._lock:  # Acquiert le verrou (bloque si un autre thread l'a déjà)
-            wait_time = time.perf_counter() - start_wait  # Calcule le temps d'attente pour acquérir le verrou
+        wait_time = self._acquire()  # Acquiert le verrou (chemin rapide sans mesure si le verrou est libre)
+        try:  # Utilise try/finally pour garantir la libération du verrou
             self._metrics.record_lock_wait(wait_time)  # Enregistre le temps d'attente dans les métriques
             self._metrics.lock_acquire_count += 1  # Incrémente le compteur d'acquisitions
             self._value += 1  # Incrémente la valeur du compteur (zone critique protégée)
             return self._value  # Retourne la nouvelle valeur
-            # Le verrou est automatiquement libéré à la sortie du bloc with
+        finally:  # Bloc exécuté dans tous les cas
+            self._lock.release()  # Libère le verrou
+            
+    def add(self, n: int) -> int:
+        """Ajoute n au compteur en une seule acquisition du verrou (incrémentations groupées)"""
+        wait_time = self._acquire()  # Acquiert le verrou une seule fois pour les n incrémentations
+        try:  # Utilise try/finally pour garantir la libération du verrou
+            self._metrics.record_lock_wait(wait_time)  # Enregistre le temps d'attente dans les métriques
+            self._metrics.lock_acquire_count += 1  # Une seule acquisition pour tout le lot
+            self._value += n  # Ajoute n à la valeur du compteur (zone critique protégée)
+            return self._value  # Retourne la nouvelle valeur
+        finally:  # Bloc exécuté dans tous les cas
+            self._lock.release()  # Libère le verrou
             
     def get(self) -> int:
         """Récupère la valeur actuelle du compteur de manière thread-safe"""
@@ -109,6 +236,40 @@ class ThreadSafeCounter:
         return self._metrics.get_stats()  # Retourne toutes les statistiques de synchronisation
 
 
+class AtomicCounter:
+    """
+    Compteur thread-safe SANS verrou à l'incrémentation, basé sur itertools.count.
+    
+    next() sur un itertools.count est une seule opération en C : sous le GIL,
+    elle ne peut pas être interrompue par un autre thread, donc aucune
+    incrémentation n'est perdue. Contrairement à ThreadSafeCounter, increment()
+    ne prend aucun verrou et n'a pas de métriques d'attente. Seule
+    l'incrémentation de 1 est atomique : pas de méthode add(n).
+    
+    Chaque increment() retourne une valeur unique (celle produite par son
+    propre next()). get() ne consomme aucune valeur : il lit la prochaine
+    valeur du compteur dans sa représentation (repr(count(n)) == "count(n)",
+    lue en C sans l'avancer). Il est exact une fois les threads terminés et
+    approximatif seulement pendant des incrémentations concurrentes.
+    """
+    
+    def __init__(self, initial_value: int = 0):
+        """Initialise le compteur avec une valeur de départ"""
+        self._count = itertools.count(initial_value + 1)  # Prochaine valeur retournée par increment()
+        
+    def increment(self) -> int:
+        """Incrémente le compteur et retourne la nouvelle valeur (unique même entre threads)"""
+        return next(self._count)  # Incrément atomique sous le GIL, sans verrou
+        
+    def get(self) -> int:
+        """Récupère la valeur actuelle sans avancer le compteur"""
+        return int(repr(self._count)[6:-1]) - 1  # "count(n)" : n est la prochaine valeur, la valeur actuelle est n - 1
+        
+    def get_metrics(self) -> Dict[str, Any]:
+        """Retourne les métriques de synchronisation (toutes nulles : aucun verrou à l'incrémentation)"""
+        return SynchronizationMetrics().get_stats()  # Statistiques vides, même format que les autres compteurs
+
+
 class UnsafeCounter:
     """
     Compteur NON thread-safe pour démontrer les race conditions.
@@ -118,15 +279,23 @@ class UnsafeCounter:
     pas atomiques, ce qui peut causer des pertes d'incrémentations.
     """
     
-    def __init__(self, initial_value: int = 0):
-        """Initialise le compteur avec une valeur de départ"""
+    def __init__(self, initial_value: int = 0, demo_delay: float = 0.0):
+        """
+        Initialise le compteur avec une valeur de départ.
+        
+        demo_delay (secondes) ne sert qu'aux démonstrations pédagogiques : une
+        pause entre la lecture et l'écriture rend la race condition visible.
+        Par défaut (0.0), increment() ne fait aucun appel système.
+        """
         self._value = initial_value  # Valeur initiale du compteur (pas de protection)
+        self._demo_delay = demo_delay  # Pause entre lecture et écriture (0 = aucune)
         
     def increment(self) -> int:
         """Incrémente le compteur SANS protection (race condition possible)"""
         # Simulation d'une opération non atomique
         temp = self._value  # Lit la valeur actuelle dans une variable temporaire
-        time.sleep(0.0001)  # Simule un délai de traitement (rend la race condition plus probable)
+        if self._demo_delay:  # Mode démonstration uniquement
+            time.sleep(self._demo_delay)  # Simule un délai de traitement (rend la race condition plus probable)
         self._value = temp + 1  # Écrit la nouvelle valeur (peut écraser les modifications d'autres threads)
         return self._value  # Retourne la nouvelle valeur (peut être incorrecte si plusieurs threads incrémentent)
         
@@ -149,22 +318,50 @@ class ThreadSafeFileLogger:
         self.log_file = log_file  # Stocke le chemin du fichier de log
         self._lock = threading.Lock()  # Crée un verrou pour protéger l'écriture dans le fichier
         self._metrics = SynchronizationMetrics()  # Crée un objet pour collecter les métriques
-        # Créer le fichier s'il n'existe pas
-        with open(self.log_file, 'w') as f:  # Ouvre le fichier en mode écriture
-            f.write("")  # Écrit une chaîne vide pour créer/initialiser le fichier
+        # Fichier ouvert une seule fois et gardé ouvert : log() ne fait plus qu'une écriture en tampon
+        # Mode binaire : les lignes arrivent déjà encodées, le verrou ne couvre qu'une copie d'octets
+        self._f = open(self.log_file, 'ab', buffering=_LOG_BUF)  # Crée le fichier, en mode append avec un grand tampon
+        self._f.truncate(0)  # Vide le log d'une exécution précédente
             
     def log(self, message: str):
         """Écrit un message dans le fichier de manière thread-safe"""
+        line = f"{message}\n".encode('utf-8')  # Construit et encode la ligne AVANT de prendre le verrou (zone critique plus courte)
         start_wait = time.perf_counter()  # Enregistre le temps avant d'essayer d'acquérir le verrou
         with self._lock:  # Acquiert le verrou (bloque si un autre thread écrit déjà)
             wait_time = time.perf_counter() - start_wait  # Calcule le temps d'attente pour acquérir le verrou
             self._metrics.record_lock_wait(wait_time)  # Enregistre le temps d'attente dans les métriques
             self._metrics.lock_acquire_count += 1  # Incrémente le compteur d'acquisitions
             # Zone critique : écriture dans le fichier
-            with open(self.log_file, 'a', encoding='utf-8') as f:  # Ouvre le fichier en mode append (ajout)
-                f.write(f"{message}\n")  # Écrit le message suivi d'un saut de ligne
+            if self._f is not None:  # Fichier ouvert (cas normal)
+                self._f.write(line)  # Copie les octets dans le tampon, sans open/close ni encodage
+            else:  # Logger déjà fermé : ouverture à chaque message
+                with open(self.log_file, 'ab') as f:  # Ouvre le fichier en mode append (ajout)
+                    f.write(line)  # Écrit la ligne
             # Le verrou est automatiquement libéré à la sortie du bloc with
                 
+    def __enter__(self):
+        """Retourne le logger (le fichier est déjà ouvert) ; il sera fermé à la sortie du bloc with"""
+        if self._f is None:  # Logger fermé puis réutilisé
+            self._f = open(self.log_file, 'ab', buffering=_LOG_BUF)  # Rouvre le fichier en mode append
+        return self  # Retourne le logger pour l'utiliser dans le bloc with
+        
+    def __exit__(self, exc_type, exc_value, tb):
+        """Vide le tampon et ferme le fichier de log à la sortie du bloc with"""
+        self.close()  # Écrit les messages en attente et ferme le fichier
+        
+    def flush(self):
+        """Écrit dans le fichier les messages encore dans le tampon (le fichier reste ouvert)"""
+        with self._lock:  # Pas de flush pendant une écriture d'un autre thread
+            if self._f is not None:  # Si le fichier est ouvert
+                self._f.flush()  # Vide le tampon dans le fichier
+        
+    def close(self):
+        """Vide le tampon et ferme le fichier de log s'il est ouvert"""
+        with self._lock:  # Pas de fermeture pendant une écriture d'un autre thread
+            if self._f is not None:  # Si le fichier est ouvert
+                self._f.close()  # Vide le tampon et ferme le fichier
+                self._f = None  # Revient au mode ouverture à chaque message
+                
     def get_metrics(self) -> Dict[str, Any]:
         """Retourne les métriques de synchronisation collectées"""
         return self._metrics.get_stats()  # Retourne toutes les statistiques de synchronisation
@@ -177,34 +374,481 @@ class SemaphoreFileLogger:
     Contrairement au Lock qui n'autorise qu'un seul accès, le Sémaphore permet
     à N threads d'accéder simultanément à la ressource. Cela réduit la contention
     tout en contrôlant la charge sur la ressource.
+    
+    Par défaut, N vaut la moitié des cœurs autorisés (au moins 2). get_metrics()
+    fournit le taux de blocage (semaphore_block_ratio : part des acquisitions
+    qui ont dû attendre un permis) et suggest_permits() en déduit le nombre de
+    permis à utiliser pour l'exécution suivante.
     """
     
-    def __init__(self, log_file: str, max_concurrent: int = 2):
-        """Initialise le logger avec le chemin du fichier et le nombre max d'accès simultanés"""
+    def __init__(self, log_file: str, max_concurrent: int = None):
+        """Initialise le logger avec le chemin du fichier et le nombre max d'accès simultanés (None = max(2, cœurs // 2))"""
         self.log_file = log_file  # Stocke le chemin du fichier de log
+        if max_concurrent is None:  # Nombre de permis non spécifié
+            max_concurrent = max(2, default_workers() // 2)  # Moitié des cœurs autorisés, au moins 2
+        self.max_concurrent = max_concurrent  # Nombre de permis du sémaphore
         self._semaphore = threading.Semaphore(max_concurrent)  # Crée un sémaphore autorisant max_concurrent accès simultanés
         self._metrics = SynchronizationMetrics()  # Crée un objet pour collecter les métriques
-        # Créer le fichier s'il n'existe pas
-        with open(self.log_file, 'w') as f:  # Ouvre le fichier en mode écriture
-            f.write("")  # Écrit une chaîne vide pour créer/initialiser le fichier
+        # Descripteur ouvert une seule fois, en ajout : chaque os.write va en fin de fichier d'un seul bloc,
+        # même quand plusieurs threads (jusqu'à max_concurrent) écrivent en même temps
+        self._fd = os.open(log_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o666)  # Crée/vide le fichier et le garde ouvert
             
     def log(self, message: str):
         """Écrit un message en utilisant un sémaphore pour limiter l'accès"""
-        start_wait = time.perf_counter()  # Enregistre le temps avant d'essayer d'acquérir le sémaphore
-        self._semaphore.acquire()  # Acquiert un permis du sémaphore (bloque si max_concurrent threads ont déjà le permis)
-        try:  # Utilise try/finally pour garantir la libération du sémaphore même en cas d'erreur
+        data = f"{message}\n".encode('utf-8')  # Encode la ligne AVANT de prendre le sémaphore (zone critique plus courte)
+        if self._semaphore.acquire(False):  # Chemin rapide : permis libre, aucune attente à mesurer
+            wait_time = 0.0  # Aucune attente
+        else:  # Tous les permis sont pris
+            start_wait = time.perf_counter()  # Enregistre le temps avant l'attente bloquante
+            self._semaphore.acquire()  # Acquiert un permis du sémaphore (bloque tant que max_concurrent threads ont le permis)
             wait_time = time.perf_counter() - start_wait  # Calcule le temps d'attente pour acquérir le sémaphore
+        try:  # Utilise try/finally pour garantir la libération du sémaphore même en cas d'erreur
             self._metrics.record_semaphore_wait(wait_time)  # Enregistre le temps d'attente dans les métriques
             self._metrics.semaphore_acquire_count += 1  # Incrémente le compteur d'acquisitions
             # Zone critique : écriture dans le fichier (limitée par le sémaphore)
-            with open(self.log_file, 'a', encoding='utf-8') as f:  # Ouvre le fichier en mode append (ajout)
-                f.write(f"{message}\n")  # Écrit le message suivi d'un saut de ligne
+            if self._fd is not None:  # Descripteur ouvert (cas normal)
+                os.write(self._fd, data)  # Un seul appel système, sans open/close (pas de tampon partagé entre threads)
+            else:  # Logger déjà fermé : ouverture à chaque message
+                with open(self.log_file, 'ab') as f:  # Ouvre le fichier en mode append (ajout)
+                    f.write(data)  # Écrit la ligne
         finally:  # Bloc exécuté dans tous les cas (succès ou erreur)
             self._semaphore.release()  # Libère le permis du sémaphore pour permettre à un autre thread d'écrire
             
+    def __enter__(self):
+        """Retourne le logger (le fichier est déjà ouvert) ; il sera fermé à la sortie du bloc with"""
+        if self._fd is None:  # Logger fermé puis réutilisé
+            self._fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o666)  # Rouvre le fichier en ajout
+        return self  # Retourne le logger pour l'utiliser dans le bloc with
+        
+    def __exit__(self, exc_type, exc_value, tb):
+        """Ferme le fichier de log à la sortie du bloc with"""
+        self.close()  # Ferme le fichier
+        
+    def close(self):
+        """Ferme le fichier de log s'il est ouvert (aucun tampon à vider : chaque message est déjà écrit)"""
+        if self._fd is not None:  # Si le fichier est ouvert
+            os.close(self._fd)  # Ferme le descripteur
+            self._fd = None  # Revient au mode ouverture à chaque message
+                
+    def block_ratio(self) -> float:
+        """Retourne la part des acquisitions du sémaphore qui ont dû attendre (0.0 sans acquisition)"""
+        n = self._metrics.semaphore_acquire_count  # Nombre d'acquisitions
+        return self._metrics.contention_count / n if n else 0.0  # Taux de blocage (acquisitions avec une attente non nulle)
+        
+    def suggest_permits(self) -> int:
+        """
+        Propose un nombre de permis pour l'exécution suivante d'après le taux de blocage observé.
+        
+        Plus d'un quart des acquisitions bloquées : le sémaphore limite le débit,
+        le nombre de permis est doublé (borné par le nombre de cœurs autorisés).
+        Moins de 5 % : la moitié des permis suffit (au moins 1). Sinon, inchangé.
+        """
+        ratio = self.block_ratio()  # Taux de blocage observé
+        if ratio > 0.25:  # Contention forte
+            return max(self.max_concurrent, min(2 * self.max_concurrent, default_workers()))  # Plus de permis
+        if ratio < 0.05:  # Presque aucune attente
+            return max(1, self.max_concurrent // 2)  # Moins de permis
+        return self.max_concurrent  # Nombre de permis adapté
+                
     def get_metrics(self) -> Dict[str, Any]:
-        """Retourne les métriques de synchronisation collectées"""
-        return self._metrics.get_stats()  # Retourne toutes les statistiques de synchronisation
+        """Retourne les métriques de synchronisation collectées, le nombre de permis et le taux de blocage"""
+        stats = self._metrics.get_stats()  # Statistiques de synchronisation
+        stats["semaphore_permits"] = self.max_concurrent  # Nombre de permis du sémaphore
+        stats["semaphore_block_ratio"] = self.block_ratio()  # Part des acquisitions qui ont attendu
+        return stats  # Retourne toutes les statistiques
+
+
+class AsyncFileLogger:
+    """
+    Logger asynchrone : les threads déposent leurs messages dans une file, un seul thread écrit.
+    
+    log() se contente d'ajouter le message à une queue.SimpleQueue (aucun verrou
+    applicatif, aucune ouverture de fichier) ; un thread écrivain dédié vide la
+    file par paquets d'au plus 256 messages et accumule les lignes encodées
+    jusqu'à block octets (128 Kio) avant de les écrire en un seul os.write :
+    des blocs de 64 à 256 Kio coûtent bien moins d'appels système (et de temps
+    CPU) que des écritures par message. block=0 écrit chaque paquet aussitôt.
+    La zone critique (le fichier) n'est donc accédée que par un seul thread.
+    close() écrit le reste, attend la fin du thread puis fait un fsync.
+    
+    Avec use_uring (et le binding liburing), le thread écrivain garde son propre
+    anneau io_uring (les wrappers de liburing ne sont pas thread-safe) : chaque
+    bloc est soumis sans attendre sa fin, et le thread continue de vider la file
+    pendant l'écriture. Une seule écriture est en cours à la fois (l'ordre des
+    blocs est conservé) ; sa complétion est récupérée avant la soumission suivante.
+    
+    Avec direct (par défaut : activé avec io_uring), les blocs passent par un
+    second descripteur ouvert en O_DIRECT, sans cache de pages : seule la plus
+    grande partie alignée sur 4 Kio de chaque bloc est écrite, depuis deux
+    tampons mmap alignés utilisés en alternance (l'un est copié pendant que
+    l'autre est en cours d'écriture). Le reste non aligné attend le bloc
+    suivant ; la fin du log est écrite par le descripteur normal à la
+    fermeture. Si O_DIRECT est refusé (tmpfs, plateforme sans O_DIRECT), le
+    logger revient aux écritures normales.
+    
+    log(message) est un attribut d'instance : la méthode put de la file
+    elle-même (code C, sans appel Python intermédiaire). Il n'y a pas de
+    méthode log dans la classe ; une sous-classe qui veut filtrer ou
+    transformer les messages remplace self.log dans son __init__.
+    """
+    
+    def __init__(self, log_file: str, batch: int = _ASYNC_BATCH, block: int = _ASYNC_BLOCK, use_uring: bool = None,
+                 direct: bool = None):
+        """Initialise le logger, crée le fichier de log et démarre le thread écrivain (use_uring=None : set_async_uring ; direct=None : comme io_uring)"""
+        self.log_file = log_file  # Stocke le chemin du fichier de log
+        self._batch = batch  # Nombre maximum de messages retirés de la file en une fois
+        self._block = block  # Nombre d'octets accumulés avant une écriture (0 = écriture par paquet)
+        self._q = queue.SimpleQueue()  # File multi-producteurs / un consommateur
+        self._metrics = SynchronizationMetrics()  # Métriques (aucune attente sur verrou à enregistrer)
+        self._messages = 0  # Nombre de messages écrits (mis à jour par le thread écrivain)
+        self._writes = 0  # Nombre d'appels os.write (mis à jour par le thread écrivain)
+        self._uring = (_ASYNC_URING if use_uring is None else use_uring) and liburing is not None  # Écritures io_uring (si le binding est installé)
+        self._inflight = None  # Bloc en cours d'écriture io_uring (gardé en vie jusqu'à sa complétion)
+        self._offset = 0  # Position de fin des blocs soumis (le fichier est vidé à l'ouverture)
+        self._fd = os.open(log_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o666)  # Crée/vide le fichier et le garde ouvert
+        self._dfd = None  # Descripteur O_DIRECT (None = écritures normales)
+        self._direct_bytes = 0  # Octets écrits en O_DIRECT
+        if self._uring if direct is None else direct:  # Écritures O_DIRECT demandées
+            self._open_direct()  # Ouvre le descripteur et les tampons alignés (ou y renonce)
+        self._thr = threading.Thread(target=self._drain, daemon=True)  # Thread écrivain dédié
+        self._thr.start()  # Démarre le thread écrivain
+        self.log = self._q.put  # log(message) appelle directement SimpleQueue.put (code C, sans appel Python intermédiaire)
+        
+    def _open_direct(self):
+        """Ouvre le descripteur O_DIRECT et ses deux tampons alignés ; sans effet si O_DIRECT est indisponible"""
+        flag = getattr(os, "O_DIRECT", 0)  # O_DIRECT n'existe pas sur toutes les plateformes (macOS, Windows)
+        if not flag:  # Plateforme sans O_DIRECT
+            return  # Écritures normales
+        try:  # Certains systèmes de fichiers (tmpfs) refusent O_DIRECT à l'ouverture
+            self._dfd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | flag)  # Second descripteur sur le même fichier
+        except OSError:  # O_DIRECT refusé
+            return  # Écritures normales
+        size = max(_DIRECT_ALIGN, -(-self._block // _DIRECT_ALIGN) * _DIRECT_ALIGN)  # Taille d'un bloc, arrondie au multiple de 4 Kio supérieur
+        self._stages = (mmap.mmap(-1, size), mmap.mmap(-1, size))  # Deux tampons alignés sur une page (anonymes)
+        self._stage = 0  # Tampon à remplir au prochain bloc
+        
+    def _disable_direct(self):
+        """Renonce à O_DIRECT (système de fichiers qui refuse l'écriture) : retour au descripteur normal"""
+        os.close(self._dfd)  # Ferme le descripteur O_DIRECT
+        self._dfd = None  # Les écritures suivantes passent par le descripteur normal
+        
+    def log_deferred(self, fmt: str, *args):
+        """Dépose un format et ses valeurs : le message est formaté (fmt.format(*args)) par le thread écrivain"""
+        self._q.put((fmt, args))  # Ajoute le couple (format, valeurs) à la file, sans formater
+        
+    def _drain(self):
+        """Boucle du thread écrivain : vide la file par paquets et écrit par blocs d'au moins block octets"""
+        ring = None  # Anneau io_uring du thread écrivain
+        if self._uring:  # Écritures io_uring demandées
+            ring = liburing.io_uring()  # Anneau propre à ce thread
+            liburing.io_uring_queue_init(2, ring, 0)  # Une écriture en cours (plus une entrée de marge)
+        try:  # Termine l'écriture en cours et libère l'anneau même en cas d'erreur
+            self._drain_loop(ring)  # Vide la file jusqu'au marqueur de fin
+        finally:  # Toujours libérer l'anneau
+            if ring is not None:  # Anneau créé
+                self._uring_reap(ring)  # Attend la dernière écriture
+                liburing.io_uring_queue_exit(ring)  # Détruit l'anneau
+                
+    def _drain_loop(self, ring):
+        """Vide la file par paquets et écrit par blocs (os.write, ou io_uring si ring est fourni)"""
+        q = self._q  # Référence locale à la file
+        buf = bytearray()  # Lignes encodées en attente d'écriture
+        while True:  # Jusqu'à la réception du marqueur de fin
+            msg = q.get()  # Attend au moins un message
+            batch = []  # Messages du paquet courant
+            while msg is not None:  # None est le marqueur de fin envoyé par close()
+                batch.append(msg)  # Ajoute le message au paquet
+                if len(batch) >= self._batch:  # Paquet plein
+                    break  # Écrit le paquet
+                try:  # Récupère les messages déjà en attente sans bloquer
+                    msg = q.get_nowait()  # Message suivant
+                except queue.Empty:  # Plus de message en attente
+                    break  # Écrit le paquet
+            if batch:  # Ajoute le paquet courant au bloc
+                lines = [m if m.__class__ is str else m[0].format(*m[1]) for m in batch]  # Formate les messages différés
+                buf += ("\n".join(lines) + "\n").encode("utf-8")  # Encode tout le paquet en une fois
+                self._messages += len(batch)  # Compte les messages écrits
+            if buf and (len(buf) >= self._block or msg is None):  # Bloc plein, ou fin : écrit le reste
+                if self._dfd is not None:  # O_DIRECT : partie alignée seulement
+                    self._write_direct(ring, buf)  # Écrit la partie alignée (le reste reste dans buf)
+                if self._dfd is None and ring is not None:  # io_uring : soumission sans attendre la fin de l'écriture
+                    self._uring_write(ring, self._fd, bytes(buf))  # Copie du bloc (gardée jusqu'à la complétion)
+                    buf.clear()  # Le bloc suivant s'accumule pendant l'écriture
+                elif self._dfd is None or msg is None:  # Écriture synchrone (ou fin non alignée du log en O_DIRECT)
+                    if ring is not None:  # Une écriture io_uring peut être en cours
+                        self._uring_reap(ring)  # L'attend pour garder l'ordre
+                    while buf:  # Reprend les écritures partielles
+                        del buf[:os.write(self._fd, buf)]  # Écrit et retire les octets écrits
+                self._writes += 1  # Compte les appels d'écriture
+            if msg is None:  # Marqueur de fin reçu
+                return  # Termine le thread écrivain
+                
+    def _write_direct(self, ring, buf: bytearray):
+        """Écrit en O_DIRECT la plus grande partie de buf alignée sur 4 Kio, via les tampons alignés, et la retire de buf"""
+        n = len(buf) - len(buf) % _DIRECT_ALIGN  # Octets écrits en O_DIRECT (le reste attend le bloc suivant)
+        done = 0  # Octets déjà écrits
+        while done < n and self._dfd is not None:  # Par morceaux de la taille d'un tampon
+            stage = self._stages[self._stage]  # Tampon libre (l'autre est peut-être en cours d'écriture)
+            self._stage ^= 1  # Alterne les deux tampons
+            k = min(len(stage), n - done)  # Taille du morceau (multiple de 4 Kio)
+            stage[:k] = buf[done:done + k]  # Copie dans le tampon aligné
+            view = memoryview(stage)[:k]  # Adresse alignée (début d'une page)
+            if ring is not None:  # io_uring : soumission sans attendre
+                self._uring_reap(ring)  # Complétion du morceau précédent (peut renoncer à O_DIRECT)
+                if self._dfd is None:  # O_DIRECT refusé sur le morceau précédent (réécrit normalement)
+                    break  # Le morceau (et la suite) restent dans buf
+                self._uring_write(ring, self._dfd, view)  # Écriture O_DIRECT asynchrone
+                self._direct_bytes += k  # Octets soumis en O_DIRECT
+            else:  # Écriture synchrone
+                try:  # Certains systèmes de fichiers acceptent l'ouverture mais refusent l'écriture
+                    while view:  # Reprend les écritures partielles
+                        view = view[os.write(self._dfd, view):]  # Écrit et avance du nombre d'octets écrits
+                except OSError as e:  # Écriture refusée
+                    if e.errno != errno.EINVAL:  # Vraie erreur d'écriture
+                        raise  # Relance l'erreur
+                    self._disable_direct()  # Retour au descripteur normal
+                    break  # Le morceau (et la suite) restent dans buf
+                self._direct_bytes += k  # Octets écrits en O_DIRECT
+            done += k  # Morceau écrit
+        del buf[:done]  # Retire les octets écrits
+        
+    def _uring_write(self, ring, fd: int, data):
+        """Soumet l'écriture de data dans l'anneau, après la complétion de l'écriture précédente"""
+        self._uring_reap(ring)  # Une seule écriture en cours : les blocs restent dans l'ordre
+        sqe = liburing.io_uring_get_sqe(ring)  # Entrée de soumission libre
+        liburing.io_uring_prep_write(sqe, fd, data, len(data), self._offset)  # Écriture en fin de fichier
+        liburing.io_uring_submit(ring)  # Un io_uring_enter, sans attendre la complétion
+        self._inflight = (fd, data)  # Garde le bloc en vie pendant l'écriture
+        self._offset += len(data)  # Position du bloc suivant
+        
+    def _uring_reap(self, ring):
+        """Attend la complétion de l'écriture en cours (s'il y en a une) et termine une écriture partielle"""
+        if self._inflight is None:  # Aucune écriture en cours
+            return  # Rien à attendre
+        fd, data = self._inflight  # Descripteur et bloc en cours d'écriture
+        cqe = liburing.io_uring_cqe()  # Entrée de complétion
+        liburing.io_uring_wait_cqe(ring, cqe)  # Attend la fin de l'écriture
+        res = cqe.res  # Nombre d'octets écrits (ou -errno)
+        liburing.io_uring_cqe_seen(ring, cqe)  # Marque la complétion comme traitée
+        self._inflight = None  # Plus d'écriture en cours
+        if res == -errno.EINVAL and fd == self._dfd:  # O_DIRECT refusé à l'écriture
+            self._disable_direct()  # Retour au descripteur normal
+            self._direct_bytes -= len(data)  # Le bloc n'a pas été écrit en O_DIRECT
+            fd, res = self._fd, 0  # Le bloc entier est réécrit normalement
+        if res < 0:  # Erreur renvoyée par le noyau
+            raise OSError(-res, os.strerror(-res), self.log_file)  # Lève l'erreur avec le chemin du log
+        view = memoryview(data)[res:]  # Reste d'une écriture partielle (rare sur fichier régulier)
+        while view:  # Termine l'écriture de manière synchrone (O_APPEND : en fin de fichier)
+            view = view[os.write(fd, view):]  # Écrit et avance du nombre d'octets écrits
+                
+    def __enter__(self):
+        """Retourne le logger pour l'utiliser dans un bloc with"""
+        return self  # Le fichier est déjà ouvert et le thread déjà démarré
+        
+    def __exit__(self, exc_type, exc_value, tb):
+        """Écrit les messages en attente et ferme le fichier à la sortie du bloc with"""
+        self.close()  # Vide la file et ferme le fichier
+        
+    def close(self):
+        """Attend l'écriture de tous les messages en file, fait un fsync puis ferme le fichier"""
+        if self._fd is None:  # Déjà fermé
+            return  # Rien à faire
+        self._q.put(None)  # Marqueur de fin (après tous les messages déjà déposés)
+        self._thr.join()  # Attend que le thread écrivain ait tout écrit
+        if self._dfd is not None:  # Descripteur O_DIRECT ouvert
+            os.close(self._dfd)  # Ferme le descripteur (écritures déjà sur disque)
+            self._dfd = None  # Plus d'écriture O_DIRECT
+        os.fsync(self._fd)  # Force l'écriture sur disque (une seule fois)
+        os.close(self._fd)  # Ferme le fichier
+        self._fd = None  # Marque le logger comme fermé
+                
+    def get_metrics(self) -> Dict[str, Any]:
+        """Retourne les métriques (pas d'attente sur verrou) et le nombre d'écritures groupées"""
+        stats = self._metrics.get_stats()  # Statistiques de synchronisation (toutes nulles)
+        stats["async_messages"] = self._messages  # Nombre de messages écrits par le thread écrivain
+        stats["async_write_calls"] = self._writes  # Nombre d'écritures (un os.write ou une soumission io_uring par bloc)
+        stats["async_uring"] = self._uring  # Indique si les blocs sont écrits par io_uring
+        stats["async_direct_bytes"] = self._direct_bytes  # Octets écrits en O_DIRECT (0 = écritures normales)
+        return stats  # Retourne toutes les statistiques
+
+
+class ShardedFileLogger:
+    """
+    Logger à tampons par thread (sharding) fusionnés dans le fichier de log global.
+    
+    Chaque thread ajoute ses messages à sa propre liste (threading.local), sans
+    aucune synchronisation. Le verrou n'est pris qu'une fois par paquet de
+    flush_every messages, ou à la fermeture, pour fusionner le tampon dans le
+    fichier. Dans un processus fils (fork), chaque processus écrit dans son
+    propre fichier « log_file.<pid> » ; close(), appelé dans le processus
+    parent, fusionne ces fichiers dans le log global.
+    Les lignes sont regroupées par thread/processus (pas dans l'ordre chronologique global).
+    """
+    
+    def __init__(self, log_file: str, flush_every: int = _ASYNC_BATCH, owner_pid: int = None):
+        """
+        Initialise le logger avec le chemin du fichier de log et la taille des paquets fusionnés.
+        
+        owner_pid permet de recréer le logger dans un processus worker (pool déjà démarré,
+        pas d'héritage par fork) : le logger écrit alors dans le shard du worker, sans
+        toucher au fichier global ni aux shards existants ; owner_pid fusionnera à la fin.
+        """
+        self.log_file = log_file  # Stocke le chemin du fichier de log
+        self._flush_every = flush_every  # Nombre de messages par fusion dans le fichier global
+        self._pid = os.getpid() if owner_pid is None else owner_pid  # Processus propriétaire (seul à écrire directement dans le fichier global)
+        self._lock = threading.Lock()  # Verrou pris une fois par fusion (et pour enregistrer un tampon)
+        self._local = threading.local()  # Tampon propre à chaque thread
+        self._buffers = []  # Liste de tous les tampons (pour la fusion finale)
+        self._shard_pid = None  # Processus fils propriétaire du fichier shard ouvert
+        self._shard_fd = None  # Descripteur du fichier shard du processus fils
+        self._merges = 0  # Nombre de fusions dans le fichier global
+        self._metrics = SynchronizationMetrics()  # Crée un objet pour collecter les métriques
+        if owner_pid is not None:  # Logger recréé dans un worker : le processus propriétaire a déjà préparé les fichiers
+            return  # Ni troncature ni suppression des shards
+        # Créer le fichier s'il n'existe pas
+        with open(self.log_file, 'w') as f:  # Ouvre le fichier en mode écriture
+            f.write("")  # Écrit une chaîne vide pour créer/initialiser le fichier
+        for shard in self._shards():  # Shards laissés par une exécution précédente
+            os.remove(shard)  # Supprime le shard obsolète
+            
+    def log(self, message: str):
+        """Ajoute un message au tampon du thread courant (ou au shard du processus fils)"""
+        if os.getpid() != self._pid:  # Processus fils : écrit dans son propre fichier
+            self._log_shard(message)  # Écriture sans verrou dans le shard du processus
+            return  # Terminé
+        buf = getattr(self._local, "buf", None)  # Tampon du thread courant
+        if buf is None:  # Premier message de ce thread
+            buf = self._local.buf = []  # Crée le tampon du thread
+            with self._lock:  # Enregistre le tampon (une seule fois par thread)
+                self._buffers.append(buf)  # Ajoute le tampon à la liste globale
+        buf.append(message)  # Ajoute le message (aucune synchronisation)
+        if len(buf) >= self._flush_every:  # Tampon plein
+            self._merge(buf)  # Fusionne le tampon dans le fichier global
+            
+    def _merge(self, buf: list):
+        """Écrit le contenu de buf dans le fichier global en une seule prise du verrou"""
+        if not buf:  # Rien à fusionner
+            return  # Terminé
+        start_wait = time.perf_counter()  # Enregistre le temps avant d'essayer d'acquérir le verrou
+        with self._lock:  # Acquiert le verrou une seule fois pour tout le paquet
+            wait_time = time.perf_counter() - start_wait  # Calcule le temps d'attente pour acquérir le verrou
+            self._metrics.record_lock_wait(wait_time)  # Enregistre le temps d'attente dans les métriques
+            self._metrics.lock_acquire_count += 1  # Incrémente le compteur d'acquisitions
+            lines = buf[:]  # Copie du paquet
+            del buf[:]  # Vide le tampon du thread
+            with open(self.log_file, 'a', encoding='utf-8') as f:  # Ouvre le fichier en mode append (ajout)
+                f.write("\n".join(lines) + "\n")  # Écrit tout le paquet en un seul appel
+            self._merges += 1  # Compte les fusions
+            
+    def _shards(self) -> list:
+        """Retourne les chemins des fichiers shard « log_file.<pid> » existants"""
+        folder = os.path.dirname(self.log_file) or "."  # Dossier du fichier de log
+        prefix = os.path.basename(self.log_file) + "."  # Préfixe des fichiers shard
+        with os.scandir(folder) as it:  # Parcourt le dossier du log
+            return sorted(e.path for e in it if e.name.startswith(prefix) and e.name[len(prefix):].isdigit())  # Shards triés par pid
+            
+    def _log_shard(self, message: str):
+        """Écrit un message dans le fichier shard du processus courant (ouvert une fois par processus)"""
+        pid = os.getpid()  # Processus courant
+        if self._shard_pid != pid:  # Premier message de ce processus
+            self._shard_fd = os.open(f"{self.log_file}.{pid}", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o666)  # Ouvre le shard du processus
+            self._shard_pid = pid  # Mémorise le propriétaire du shard
+        os.write(self._shard_fd, f"{message}\n".encode("utf-8"))  # Écriture non tamponnée (le pool peut terminer le processus sans préavis)
+        
+    def close(self):
+        """Fusionne tous les tampons des threads et les shards des processus fils dans le fichier global"""
+        if os.getpid() != self._pid:  # Seul le processus propriétaire fusionne
+            return  # Rien à faire dans un processus fils
+        with self._lock:  # Copie la liste des tampons
+            buffers = list(self._buffers)  # Tampons enregistrés jusqu'ici
+        for buf in buffers:  # Fusionne chaque tampon restant
+            self._merge(buf)  # Écrit le reste du tampon
+        for shard in self._shards():  # Fusionne chaque shard des processus fils
+            with open(shard, 'r', encoding='utf-8') as src:  # Lit le shard
+                data = src.read()  # Contenu complet du shard
+            with self._lock:  # Une prise de verrou par shard
+                with open(self.log_file, 'a', encoding='utf-8') as f:  # Ouvre le fichier global en mode append
+                    f.write(data)  # Ajoute le contenu du shard
+                self._merges += 1  # Compte les fusions
+            os.remove(shard)  # Supprime le shard fusionné
+            
+    def __enter__(self):
+        """Retourne le logger pour l'utiliser dans un bloc with"""
+        return self  # Rien à ouvrir : les tampons sont créés à la demande
+        
+    def __exit__(self, exc_type, exc_value, tb):
+        """Fusionne les tampons et les shards à la sortie du bloc with"""
+        self.close()  # Fusionne tout dans le fichier global
+                
+    def get_metrics(self) -> Dict[str, Any]:
+        """Retourne les métriques de synchronisation et le nombre de fusions"""
+        stats = self._metrics.get_stats()  # Statistiques de synchronisation (une acquisition par fusion)
+        stats["sharded_merges"] = self._merges  # Nombre de fusions dans le fichier global
+        return stats  # Retourne toutes les statistiques
+
+
+class AppendFileLogger:
+    """
+    Logger sans verrou applicatif : chaque message est écrit par un seul os.write
+    sur un descripteur ouvert en O_APPEND.
+    
+    Avec O_APPEND, le noyau place chaque write() à la fin du fichier et, sous
+    Linux, un write() sur un fichier régulier n'est pas entrelacé avec celui d'un
+    autre thread ou processus : une ligne de log courte écrite d'un seul appel
+    arrive entière. Le verrou threading/multiprocessing devient inutile, aussi
+    bien entre threads qu'entre processus (la sérialisation a lieu dans le noyau).
+    Le descripteur est ouvert au premier message de chaque processus.
+    """
+    
+    def __init__(self, log_file: str, record_metrics: bool = False):
+        """Initialise le logger (record_metrics=True : mesure le temps passé dans os.write)"""
+        self.log_file = log_file  # Stocke le chemin du fichier de log
+        self._record = record_metrics  # Mesure optionnelle des écritures (deux perf_counter par message)
+        self._fd = None  # Descripteur du fichier de log, ouvert au premier log() de chaque processus
+        self._fd_pid = None  # Processus propriétaire du descripteur
+        self._writes = 0  # Nombre d'appels os.write (si record_metrics)
+        self._write_time = 0.0  # Temps total passé dans os.write (si record_metrics)
+        self._metrics = SynchronizationMetrics()  # Métriques de synchronisation (aucun verrou : toujours nulles)
+        # Créer le fichier s'il n'existe pas
+        with open(self.log_file, 'w') as f:  # Ouvre le fichier en mode écriture
+            f.write("")  # Écrit une chaîne vide pour créer/initialiser le fichier
+            
+    def log(self, message: str):
+        """Écrit un message en fin de fichier d'un seul appel système, sans verrou"""
+        data = f"{message}\n".encode('utf-8')  # Ligne complète (un seul write pour qu'elle ne soit pas coupée)
+        pid = os.getpid()  # Processus courant
+        if self._fd_pid != pid:  # Premier message de ce processus (ou logger hérité par fork/pickle)
+            self._fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)  # Ouverture en ajout atomique
+            self._fd_pid = pid  # Mémorise le propriétaire du descripteur
+        if self._record:  # Mesure demandée
+            start = time.perf_counter()  # Temps avant l'écriture
+            os.write(self._fd, data)  # Écrit la ligne en fin de fichier (atomique, sans verrou)
+            self._write_time += time.perf_counter() - start  # Cumule le temps d'écriture (sérialisation dans le noyau comprise)
+            self._writes += 1  # Compte les écritures
+        else:  # Chemin le plus court
+            os.write(self._fd, data)  # Écrit la ligne en fin de fichier (atomique, sans verrou)
+            
+    def close(self):
+        """Ferme le descripteur du fichier de log s'il appartient au processus courant"""
+        if self._fd is not None and self._fd_pid == os.getpid():  # Descripteur ouvert par ce processus
+            os.close(self._fd)  # Ferme le descripteur
+        self._fd = self._fd_pid = None  # Le prochain log() rouvrira le fichier
+        
+    def __enter__(self):
+        """Retourne le logger pour l'utiliser dans un bloc with"""
+        return self  # Le descripteur est ouvert à la demande
+        
+    def __exit__(self, exc_type, exc_value, tb):
+        """Ferme le descripteur à la sortie du bloc with"""
+        self.close()  # Ferme le fichier
+                
+    def get_metrics(self) -> Dict[str, Any]:
+        """Retourne les métriques (pas d'attente sur verrou) et, si mesurées, les écritures du processus courant"""
+        stats = self._metrics.get_stats()  # Statistiques de synchronisation (toutes nulles)
+        if self._record:  # Mesure activée
+            stats["append_writes"] = self._writes  # Nombre d'appels os.write
+            stats["append_write_time"] = self._write_time  # Temps total passé dans os.write
+        return stats  # Retourne toutes les statistiques
 
 
 class ProcessSafeCounter:
@@ -212,26 +856,34 @@ class ProcessSafeCounter:
     Compteur process-safe utilisant multiprocessing.Value pour partager entre processus.
     
     Les processus ne partagent pas la mémoire comme les threads. Pour partager
-    une variable entre processus, on utilise multiprocessing.Value qui crée
-    une variable partagée en mémoire partagée.
+    une variable entre processus, on utilise multiprocessing.RawValue qui crée
+    une variable en mémoire partagée. RawValue n'a pas de verrou interne
+    (contrairement à multiprocessing.Value, dont chaque lecture et chaque
+    écriture de .value prend son propre RLock) : le seul verrou est self._lock.
     """
     
     def __init__(self, initial_value: int = 0):
         """Initialise le compteur avec une valeur de départ partagée entre processus"""
-        self._value = multiprocessing.Value('i', initial_value)  # Crée une variable partagée de type entier ('i')
-        self._lock = multiprocessing.Lock()  # Crée un verrou multiprocessing pour protéger l'accès
+        self._value = multiprocessing.RawValue('l', initial_value)  # Crée une variable partagée de type entier long ('l'), sans verrou interne
+        self._lock = multiprocessing.Lock()  # Crée un verrou multiprocessing pour protéger l'accès (unique verrou du compteur)
         self._metrics = SynchronizationMetrics()  # Crée un objet pour collecter les métriques
         
     def increment(self) -> int:
         """Incrémente le compteur de manière process-safe"""
-        start_wait = time.perf_counter()  # Enregistre le temps avant d'essayer d'acquérir le verrou
-        with self._lock:  # Acquiert le verrou multiprocessing (bloque si un autre processus l'a déjà)
+        if self._lock.acquire(False):  # Chemin rapide : verrou libre, aucune attente à mesurer
+            wait_time = 0.0  # Aucune attente
+        else:  # Verrou pris par un autre processus
+            start_wait = time.perf_counter()  # Enregistre le temps avant l'attente bloquante
+            self._lock.acquire()  # Acquiert le verrou multiprocessing (bloque tant qu'un autre processus l'a)
             wait_time = time.perf_counter() - start_wait  # Calcule le temps d'attente pour acquérir le verrou
+        try:  # Utilise try/finally pour garantir la libération du verrou
             self._metrics.record_lock_wait(wait_time)  # Enregistre le temps d'attente dans les métriques
             self._metrics.lock_acquire_count += 1  # Incrémente le compteur d'acquisitions
-            self._value.value += 1  # Incrémente la valeur partagée (accès via .value)
-            return self._value.value  # Retourne la nouvelle valeur
-            # Le verrou est automatiquement libéré à la sortie du bloc with
+            value = self._value.value + 1  # Nouvelle valeur (lecture de la mémoire partagée, sans verrou interne)
+            self._value.value = value  # Écrit la nouvelle valeur partagée
+            return value  # Retourne la nouvelle valeur
+        finally:  # Bloc exécuté dans tous les cas
+            self._lock.release()  # Libère le verrou
             
     def get(self) -> int:
         """Récupère la valeur actuelle de manière process-safe"""
@@ -244,37 +896,128 @@ class ProcessSafeCounter:
         return self._metrics.get_stats()  # Retourne toutes les statistiques de synchronisation
 
 
+class ShardedProcessCounter:
+    """
+    Compteur entre processus sans verrou sur le chemin chaud : une case par processus.
+    
+    ProcessSafeCounter prend un verrou multiprocessing (un sémaphore POSIX) à
+    chaque incrément. Ici, chaque processus réserve une fois, sous verrou, sa
+    propre case d'un RawArray partagé (hérité par fork), puis l'incrémente seul,
+    sans verrou : aucun autre processus n'y écrit. get() additionne les cases.
+    
+    Une case n'a qu'un écrivain : dans un même processus, un seul thread doit
+    incrémenter (cas des workers d'un pool de processus) ; sinon, utiliser
+    ProcessSafeCounter. increment() retourne le compte du processus courant,
+    pas le total (qui demanderait de lire toutes les cases).
+    """
+    
+    def __init__(self, initial_value: int = 0, max_processes: int = 64):
+        """Initialise le compteur avec max_processes cases partagées (une par processus qui incrémente)"""
+        self._initial = initial_value  # Valeur de départ, ajoutée au total
+        self._slots = multiprocessing.RawArray('q', max_processes)  # Une case entière 64 bits par processus, sans verrou interne
+        self._next_slot = multiprocessing.RawValue('i', 0)  # Prochaine case libre (protégée par _lock)
+        self._lock = multiprocessing.Lock()  # Verrou pris une seule fois par processus, pour réserver sa case
+        self._slot = -1  # Case du processus courant
+        self._slot_pid = None  # Processus propriétaire de _slot (un fils hérite de la valeur du parent)
+        
+    def _claim_slot(self) -> int:
+        """Réserve la case du processus courant (premier incrément de ce processus)"""
+        with self._lock:  # Seul passage sous verrou
+            slot = self._next_slot.value  # Première case libre
+            if slot >= len(self._slots):  # Plus de case disponible
+                raise RuntimeError(f"ShardedProcessCounter : plus de {len(self._slots)} processus (augmenter max_processes)")  # Erreur explicite
+            self._next_slot.value = slot + 1  # Case réservée
+        self._slot, self._slot_pid = slot, os.getpid()  # Mémorise la case de ce processus
+        return slot  # Retourne la case réservée
+        
+    def increment(self) -> int:
+        """Incrémente la case du processus courant, sans verrou, et retourne le compte de ce processus"""
+        slot = self._slot if self._slot_pid == os.getpid() else self._claim_slot()  # Case de ce processus
+        value = self._slots[slot] + 1  # Nouveau compte du processus (seul écrivain de la case)
+        self._slots[slot] = value  # Écrit la case partagée
+        return value  # Retourne le compte du processus courant
+        
+    def get(self) -> int:
+        """Retourne le total de tous les processus (somme des cases, sans verrou)"""
+        return self._initial + sum(self._slots)  # Valeur de départ + incréments de chaque processus
+        
+    def get_metrics(self) -> Dict[str, Any]:
+        """Retourne les métriques de synchronisation (toutes nulles : aucun verrou à l'incrémentation)"""
+        return SynchronizationMetrics().get_stats()  # Statistiques vides, même format que les autres compteurs
+
+
 class ProcessSafeFileLogger:
     """
     Logger process-safe utilisant un Lock multiprocessing pour écrire dans un fichier.
     
     L'écriture dans un fichier nécessite une synchronisation même entre processus,
     car plusieurs processus peuvent essayer d'écrire simultanément dans le même fichier.
+    
+    Les métriques d'attente sont cumulées dans un tableau en mémoire partagée
+    (RawArray, hérité par fork), mis à jour sous le verrou déjà pris pour
+    l'écriture : get_metrics(), appelé dans le processus principal, voit les
+    attentes de tous les workers sans Manager ni message entre processus.
     """
     
-    def __init__(self, log_file: str):
-        """Initialise le logger avec le chemin du fichier de log"""
+    N_COUNTERS = 4  # Taille du tableau partagé : [acquisitions, attente totale, attente max, contentions]
+    
+    def __init__(self, log_file: str, truncate: bool = True, lock=None, counters=None):
+        """
+        Initialise le logger avec le chemin du fichier de log (truncate=False : garde le contenu existant).
+        
+        lock permet de partager un verrou multiprocessing déjà créé (hérité par fork) entre
+        les loggers créés séparément dans chaque processus ; sans lock, un nouveau verrou est créé.
+        counters (RawArray('d', N_COUNTERS)) joue le même rôle pour les métriques ; il est remis
+        à zéro par le logger qui crée le fichier (truncate=True).
+        """
         self.log_file = log_file  # Stocke le chemin du fichier de log
-        self._lock = multiprocessing.Lock()  # Crée un verrou multiprocessing pour protéger l'écriture
-        self._metrics = SynchronizationMetrics()  # Crée un objet pour collecter les métriques
+        self._lock = lock if lock is not None else multiprocessing.Lock()  # Verrou multiprocessing partagé, ou nouveau verrou pour protéger l'écriture
+        self._counters = counters if counters is not None else multiprocessing.RawArray('d', self.N_COUNTERS)  # Métriques en mémoire partagée (protégées par _lock)
+        if truncate:  # Nouveau log : nouvelles métriques
+            self._counters[:] = [0.0] * self.N_COUNTERS  # Remet les compteurs à zéro
+        self._fd = None  # Descripteur du fichier de log, ouvert au premier log() de chaque processus
+        self._fd_pid = None  # Processus propriétaire du descripteur (un descripteur hérité n'est pas réutilisé)
         # Créer le fichier s'il n'existe pas
-        with open(self.log_file, 'w') as f:  # Ouvre le fichier en mode écriture
-            f.write("")  # Écrit une chaîne vide pour créer/initialiser le fichier
+        if truncate:  # Nouveau log (processus principal)
+            with open(self.log_file, 'w') as f:  # Ouvre le fichier en mode écriture
+                f.write("")  # Écrit une chaîne vide pour créer/initialiser le fichier
+            
+    def _get_fd(self) -> int:
+        """Retourne le descripteur du fichier de log pour le processus courant (ouvert une fois par processus)"""
+        pid = os.getpid()  # Processus courant
+        if self._fd_pid != pid:  # Premier message de ce processus (ou logger hérité par fork/pickle)
+            self._fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)  # Ouverture en ajout : chaque write va en fin de fichier
+            self._fd_pid = pid  # Mémorise le propriétaire du descripteur
+        return self._fd  # Descripteur de ce processus
             
     def log(self, message: str):
         """Écrit un message dans le fichier de manière process-safe"""
+        data = f"{message}\n".encode('utf-8')  # Encode la ligne AVANT de prendre le verrou (zone critique plus courte)
         start_wait = time.perf_counter()  # Enregistre le temps avant d'essayer d'acquérir le verrou
         self._lock.acquire()  # Acquiert le verrou multiprocessing (bloque si un autre processus écrit déjà)
         try:  # Utilise try/finally pour garantir la libération du verrou même en cas d'erreur
             wait_time = time.perf_counter() - start_wait  # Calcule le temps d'attente pour acquérir le verrou
-            self._metrics.record_lock_wait(wait_time)  # Enregistre le temps d'attente dans les métriques
-            self._metrics.lock_acquire_count += 1  # Incrémente le compteur d'acquisitions
-            # Zone critique : écriture dans le fichier
-            with open(self.log_file, 'a', encoding='utf-8') as f:  # Ouvre le fichier en mode append (ajout)
-                f.write(f"{message}\n")  # Écrit le message suivi d'un saut de ligne
+            c = self._counters  # Métriques partagées (déjà protégées par le verrou pris)
+            c[0] += 1  # Incrémente le compteur d'acquisitions
+            c[1] += wait_time  # Cumule le temps d'attente
+            if wait_time > c[2]:  # Nouveau maximum
+                c[2] = wait_time  # Mémorise le temps d'attente maximum
+            if wait_time > 0:  # Si le temps d'attente est supérieur à 0, c'est une contention
+                c[3] += 1  # Incrémente le compteur de contention
+            # Zone critique : écriture dans le fichier (un seul appel système, sans tampon :
+            # les workers d'un pool se terminent sans vider les tampons Python)
+            os.write(self._get_fd(), data)  # Écrit la ligne en fin de fichier
         finally:  # Bloc exécuté dans tous les cas (succès ou erreur)
             self._lock.release()  # Libère le verrou pour permettre à un autre processus d'écrire
             
+    def close(self):
+        """Ferme le descripteur du fichier de log s'il appartient au processus courant"""
+        if self._fd is not None and self._fd_pid == os.getpid():  # Descripteur ouvert par ce processus
+            os.close(self._fd)  # Ferme le descripteur
+        self._fd = self._fd_pid = None  # Le prochain log() rouvrira le fichier
+            
     def get_metrics(self) -> Dict[str, Any]:
-        """Retourne les métriques de synchronisation collectées"""
-        return self._metrics.get_stats()  # Retourne toutes les statistiques de synchronisation
+        """Retourne les métriques de synchronisation collectées par tous les processus"""
+        with self._lock:  # Lecture cohérente du tableau partagé
+            n, total, maximum, contentions = self._counters[:]  # Copie des compteurs partagés
+        return SynchronizationMetrics.from_lock_totals(int(n), total, maximum, int(contentions)).get_stats()  # Même format que les autres loggers
@@ -1,17 +1,27 @@
 # src/versions/__init__.py
-"""Module contenant toutes les versions de parallélisme"""
+"""
+Module contenant toutes les versions de parallélisme.
 
-from . import mono
-from . import threading_version
-from . import multiprocessing_version
-from . import threadpool_executor
-from . import processpool_executor
+Les sous-modules sont importés à la demande (au premier accès à
+versions.<nom>) : une version non utilisée (GPU, libvips, processus...)
+n'est jamais chargée.
+"""
+import importlib  # Module pour l'import à la demande des sous-modules
 
 __all__ = [
     'mono',
     'threading_version',
     'multiprocessing_version',
     'threadpool_executor',
-    'processpool_executor'
+    'processpool_executor',
+    'gpu',
+    'vips',
+    'numba_batch'
 ]
 
+
+def __getattr__(name):
+    """Importe le sous-module demandé au premier accès (PEP 562)"""
+    if name in __all__:  # Version connue
+        return importlib.import_module(f".{name}", __name__)  # Import (mis en cache dans sys.modules et comme attribut du paquet)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")  # Attribut inconnu
@@ -0,0 +1,140 @@
+# src/versions/gpu.py
+"""
+Version GPU (optionnelle) - conversion par lots sur carte graphique avec CuPy.
+
+Ce module implémente la conversion en niveaux de gris sur GPU. Les images
+sont décodées sur le CPU avec Pillow, regroupées par taille en lots
+(N, H, W, 3), transférées sur le GPU où la luminance est calculée en un seul
+noyau, puis recopiées en mémoire centrale pour être sauvegardées.
+
+Rôle détaillé :
+- Regroupe les images de même taille en lots
+- Calcule la luminance Y = (77*R + 150*G + 29*B) >> 8 sur GPU (même formule
+  que les backends NumPy/Numba de processor.py)
+- Alterne deux streams CUDA : le décodage du lot suivant sur le CPU se fait
+  pendant que le GPU calcule le lot courant
+- Aucune synchronisation entre threads nécessaire (un seul thread hôte)
+
+Nécessite CuPy et une carte NVIDIA ; AVAILABLE vaut False sinon.
+"""
+from typing import List, Dict  # Types pour les annotations de type
+import os  # Module pour la manipulation de chemins en chaînes (os.path)
+from PIL import Image  # Import de Pillow pour le décodage/encodage des images
+from ..common import Timer  # Import de la classe Timer pour mesurer le temps
+
+try:  # CuPy et NumPy sont optionnels
+    import numpy as np  # Module de calcul numérique sur tableaux (côté CPU)
+    import cupy as cp  # Module de calcul sur GPU compatible NumPy
+except ImportError:  # Si CuPy ou NumPy ne sont pas installés
+    np = None  # Pas de NumPy
+    cp = None  # Pas de CuPy
+
+AVAILABLE = cp is not None  # Indique si la version GPU est utilisable
+
+
+def _decode(path: str):
+    """Décode une image en tableau (H, W, 3) uint8 (fichier fermé à la sortie), ou retourne l'exception"""
+    try:  # Bloc try pour capturer les erreurs de décodage
+        with Image.open(path) as img:  # Ouvre l'image avec Pillow (fermeture automatique du fichier)
+            return np.asarray(img.convert("RGB"))  # Tableau (H, W, 3) uint8
+    except Exception as e:  # Image corrompue (l'en-tête était lisible)
+        return e  # L'erreur est traitée par l'appelant
+
+
+def _gray_on_gpu(stack, stream):
+    """
+    Lance le calcul de la luminance d'un lot (N, H, W, 3) uint8 sur un stream CUDA.
+
+    Retourne le tableau GPU (N, H, W) uint8 ; le calcul est asynchrone par
+    rapport au CPU tant que le stream n'est pas synchronisé.
+    """
+    with stream:  # Toutes les opérations suivantes sont mises en file sur ce stream
+        d = cp.asarray(stack)  # Copie hôte -> GPU du lot
+        w = cp.asarray([77, 150, 29], dtype=cp.uint16)  # Poids de luminance en virgule fixe (somme = 256)
+        return ((d.astype(cp.uint16) * w).sum(axis=-1, dtype=cp.uint16) >> 8).astype(cp.uint8)  # Luminance de chaque pixel du lot
+
+
+# Traite les images par lots sur GPU
+def process_gpu(image_paths: List[str], output_dir: str, batch: int = 8, suffix: str = "_gray") -> Dict:
+    """
+    Traite les images par lots sur GPU avec CuPy.
+
+    Args:
+        image_paths: Liste des chemins vers les images
+        output_dir: Dossier de sortie
+        batch: Nombre maximum d'images par lot transféré sur le GPU
+        suffix: Suffixe à ajouter au nom de fichier
+
+    Returns:
+        Dictionnaire avec les statistiques de traitement (même format que les autres versions)
+    """
+    if not AVAILABLE:  # Vérifie que CuPy est installé
+        raise RuntimeError("La version GPU nécessite CuPy (et une carte NVIDIA)")  # Lève une erreur si CuPy manque
+
+    timer = Timer()  # Crée un chronomètre pour mesurer le temps total
+    timer.start()  # Démarre le chronomètre
+
+    # Décodage CPU et regroupement par taille
+    groups = {}  # Dictionnaire {(W, H): [(chemin_entrée, chemin_sortie), ...]} (clé = img.size de Pillow)
+    runs = []  # Liste des résultats individuels
+    for p in image_paths:  # Parcourt toutes les images
+        base, ext = os.path.splitext(os.path.basename(p))  # Nom de base et extension de l'image source
+        out_path = os.path.join(output_dir, base + suffix + ext)  # Construit le chemin complet de sortie
+        try:  # Lecture de l'en-tête seulement (le décodage complet se fait lot par lot)
+            with Image.open(p) as img:  # Ouvre l'image avec Pillow
+                size = img.size  # Taille (W, H) lue dans l'en-tête
+        except Exception as e:  # Image illisible
+            runs.append({"image": p, "elapsed": 0.0, "success": False, "error": str(e)})  # Résultat d'erreur pour cette image
+            continue  # Passe à l'image suivante
+        groups.setdefault(size, []).append((p, out_path))  # Ajoute l'image au groupe de sa taille
+
+    chunks = [  # Liste des lots (au plus `batch` images de même taille)
+        items[k:k + batch]  # Lot courant
+        for items in groups.values()  # Parcourt chaque groupe de même taille
+        for k in range(0, len(items), batch)  # Découpe le groupe en lots
+    ]
+
+    streams = (cp.cuda.Stream(non_blocking=True), cp.cuda.Stream(non_blocking=True))  # Deux streams pour recouvrir décodage CPU et calcul GPU
+    pending = None  # Lot en cours de calcul sur le GPU : (lot, tableau_gpu, stream, chronomètre)
+
+    for k, chunk in enumerate(chunks + [None]):  # Un tour de plus pour terminer le dernier lot
+        launched = None  # Lot lancé pendant ce tour
+        if chunk is not None:  # Décode le lot suivant pendant que le GPU calcule le précédent
+            t = Timer()  # Chronomètre du lot
+            t.start()  # Démarre le chronomètre du lot
+            decoded = [_decode(p) for p, _ in chunk]  # Décode chaque image du lot (erreur par image)
+            for (p, _), rgb in zip(chunk, decoded):  # Résultats d'erreur des images illisibles
+                if isinstance(rgb, Exception):  # Décodage impossible
+                    runs.append({"image": p, "elapsed": 0.0, "success": False, "error": str(rgb)})  # Résultat d'erreur pour cette image
+            good = [(item, rgb) for item, rgb in zip(chunk, decoded) if not isinstance(rgb, Exception)]  # Images décodées
+            if good:  # Au moins une image à convertir dans ce lot
+                stack = np.stack([rgb for _, rgb in good])  # Tableau (N, H, W, 3) uint8
+                stream = streams[k % 2]  # Alterne les streams
+                launched = ([item for item, _ in good], _gray_on_gpu(stack, stream), stream, t)  # Lance le calcul (asynchrone)
+
+        if pending is not None:  # Termine le lot précédent
+            prev_chunk, d_gray, prev_stream, t = pending  # Récupère le lot précédent
+            prev_stream.synchronize()  # Attend la fin du calcul sur le GPU
+            host = cp.asnumpy(d_gray)  # Copie GPU -> hôte du lot converti
+            errors = {}  # Erreurs de sauvegarde {chemin_entrée: message}
+            for j, (p, out_path) in enumerate(prev_chunk):  # Sauvegarde chaque image du lot
+                try:  # Une sortie impossible à écrire n'interrompt pas le lot
+                    Image.fromarray(host[j], mode="L").save(out_path)  # Sauvegarde l'image convertie
+                except OSError as e:  # Écriture impossible
+                    errors[p] = str(e)  # Mémorise l'erreur de cette image
+            elapsed = t.stop() / len(prev_chunk)  # Temps moyen par image du lot
+            for p, _ in prev_chunk:  # Ajoute les informations de chaque image du lot
+                if p in errors:  # Sauvegarde échouée
+                    runs.append({"image": p, "elapsed": elapsed, "success": False, "error": errors[p]})  # Résultat d'erreur pour cette image
+                else:  # Image convertie et sauvegardée
+                    runs.append({"image": p, "elapsed": elapsed, "success": True, "processing_time": elapsed})  # Même format que la version mono
+        pending = launched  # Le lot lancé devient le lot en attente
+
+    total = timer.stop()  # Arrête le chronomètre et récupère le temps total
+    return {  # Retourne un dictionnaire avec toutes les statistiques
+        "total_time": total,  # Temps total de traitement
+        "n_images": len(image_paths),  # Nombre d'images traitées
+        "runs": runs,  # Liste de tous les résultats individuels
+        "batch_size": batch,  # Taille des lots transférés sur le GPU
+        "sync_metrics": {}  # Pas de métriques de synchronisation (un seul thread hôte)
+    }
@@ -20,12 +20,16 @@ Aucune race condition possible car :
 """
 from typing import List, Dict  # Types pour les annotations de type
 from pathlib import Path  # Import de Path (non utilisé directement mais gardé pour cohérence)
-from ..processor import convert_to_grayscale  # Import de la fonction de conversion d'images
-from ..common import Timer  # Import de la classe Timer pour mesurer le temps
+from ..processor import convert_to_grayscale, process_batch  # Import des fonctions de conversion d'images (unitaire et par lots)
+from ..common import Timer  # Import de la classe Timer pour mesurer le temps total
+from time import perf_counter, perf_counter_ns  # Horloges haute précision appelées directement (pas d'objet Timer par image ; ns = entiers, sans float)
+import array  # Module pour le tableau préalloué des durées par image (entiers 64 bits)
+
+__all__ = ["process_sequential"]  # Seule fonction publique du module (une seule implémentation de la version séquentielle)
 
 
 # Traite les images de manière séquentielle (une par une, sans parallélisme)
-def process_sequential(image_paths: List[str], output_dir: str) -> Dict:
+def process_sequential(image_paths: List[str], output_dir: str, batch_size: int = None) -> Dict:
     """
     Traite les images de manière séquentielle.
     
@@ -34,9 +38,13 @@ def process_sequential(image_paths: List[str], output_dir: str) -> Dict:
     - Pas de partage de ressources entre threads/processus
     - Pas de race condition possible
     
+    Si batch_size est fourni, les images sont converties par lots avec
+    process_batch (un seul calcul NumPy par lot d'images de même taille).
+    
     Args:
         image_paths: Liste des chemins vers les images
         output_dir: Dossier de sortie
+        batch_size: Taille des lots (None = une image à la fois, nécessite NumPy sinon)
     
     Returns:
         Dictionnaire avec les statistiques de traitement
@@ -45,22 +53,46 @@ def process_sequential(image_paths: List[str], output_dir: str) -> Dict:
     stats = {"runs": []}  # Initialise le dictionnaire de statistiques avec une liste vide pour les résultats individuels
     timer.start()  # Démarre le chronomètre pour mesurer le temps total de traitement
     
-    for p in image_paths:  # Parcourt chaque image dans la liste
-        t = Timer()  # Crée un nouveau chronomètre pour mesurer le temps de traitement de cette image
-        t.start()  # Démarre le chronomètre pour cette image
-        res = convert_to_grayscale(p, output_dir, use_lock=False)  # Convertit l'image (use_lock=False car pas de threads)
-        elapsed = t.stop()  # Arrête le chronomètre et récupère le temps écoulé pour cette image
-        stats["runs"].append({  # Ajoute les informations de traitement de cette image à la liste
-            "image": p,  # Chemin de l'image traitée
-            "elapsed": elapsed,  # Temps écoulé pour traiter cette image
-            "success": res.get("success", False),  # Indique si la conversion a réussi (valeur par défaut: False)
-            "processing_time": res.get("processing_time", elapsed)  # Temps de traitement depuis le résultat (ou elapsed si absent)
-        })
+    append = stats["runs"].append  # Méthode append résolue une seule fois (pas de recherche par image)
+    
+    if batch_size:  # Conversion par lots
+        for k in range(0, len(image_paths), batch_size):  # Parcourt les images par tranches de batch_size
+            chunk = image_paths[k:k + batch_size]  # Tranche courante
+            t0 = perf_counter()  # Temps de début de la tranche
+            batch_res = process_batch(chunk, output_dir, batch=batch_size, use_lock=False)  # Convertit la tranche (use_lock=False car pas de threads)
+            elapsed = (perf_counter() - t0) / len(chunk)  # Temps moyen par image de la tranche
+            for p, res in zip(chunk, batch_res):  # Ajoute les informations de chaque image de la tranche
+                append({  # Même format que la conversion image par image
+                    "image": p,  # Chemin de l'image traitée
+                    "elapsed": elapsed,  # Temps moyen par image de la tranche
+                    "success": res.get("success", False),  # Indique si la conversion a réussi
+                    "processing_time": res.get("processing_time", elapsed)  # Temps de traitement depuis le résultat
+                })
+    else:  # Conversion image par image
+        # Boucle chronométrée réduite au minimum : durées en nanosecondes (entiers) dans un
+        # tableau préalloué, résultats bruts gardés tels quels ; les dictionnaires des runs
+        # sont construits après la boucle
+        n = len(image_paths)  # Nombre d'images
+        ticks = array.array('q', bytes(8 * n))  # Durée de chaque image en ns (préallouée, sans float par image)
+        raw = [None] * n  # Résultat de conversion de chaque image
+        for i, p in enumerate(image_paths):  # Parcourt chaque image dans la liste
+            t0 = perf_counter_ns()  # Temps de début de cette image (entier)
+            raw[i] = convert_to_grayscale(p, output_dir, use_lock=False)  # Convertit l'image (use_lock=False car pas de threads)
+            ticks[i] = perf_counter_ns() - t0  # Temps écoulé pour cette image (ns)
+        for p, dt, res in zip(image_paths, ticks, raw):  # Construit les informations de chaque image, hors de la boucle chronométrée
+            elapsed = dt / 1e9  # Temps écoulé en secondes
+            append({  # Ajoute les informations de traitement de cette image à la liste
+                "image": p,  # Chemin de l'image traitée
+                "elapsed": elapsed,  # Temps écoulé pour traiter cette image
+                "success": res.get("success", False),  # Indique si la conversion a réussi (valeur par défaut: False)
+                "processing_time": res.get("processing_time", elapsed)  # Temps de traitement depuis le résultat (ou elapsed si absent)
+            })
     
     total = timer.stop()  # Arrête le chronomètre principal et récupère le temps total
     stats.update({  # Met à jour le dictionnaire de statistiques avec les informations globales
         "total_time": total,  # Temps total de traitement de toutes les images
         "n_images": len(image_paths),  # Nombre total d'images traitées
+        "batch_size": batch_size,  # Taille des lots (None = image par image)
         "sync_metrics": {}  # Pas de métriques de synchronisation en séquentiel (dictionnaire vide)
     })
     return stats  # Retourne le dictionnaire complet avec toutes les statistiques
@@ -16,34 +16,74 @@ Rôle détaillé :
 - Mesure les performances et métriques de synchronisation
 - Compare avec threading (pas de GIL, mais synchronisation nécessaire pour ressources partagées)
 """
-from multiprocessing import Pool, Manager  # Import de Pool pour créer un pool de processus et Manager pour partager des objets
 from typing import List, Dict  # Types pour les annotations de type
 from ..processor import convert_to_grayscale, set_global_logger  # Import de la fonction de conversion et du setter de logger
-from ..common import Timer  # Import de la classe Timer pour mesurer le temps
+from ..common import Timer, pinning_kwargs, MP_CONTEXT, default_workers  # Import de la classe Timer, des arguments d'épinglage des workers, du contexte des pools et du nombre de workers par défaut
 import os  # Module pour les opérations sur le système de fichiers
-from ..synchronization_tools import ProcessSafeFileLogger, ProcessSafeCounter  # Import des outils de synchronisation pour processus
+import array  # Module pour les colonnes de temps renvoyées par les workers (doubles compacts)
+from ..synchronization_tools import ProcessSafeFileLogger, ProcessSafeCounter, ShardedFileLogger, AppendFileLogger  # Import des outils de synchronisation pour processus
 
 
-# Fonction wrapper pour convertir une image (utilisée par multiprocessing.Pool)
-def _convert_wrapper(args):
+_job = None  # (image_paths, output_dir, n_workers, use_lock) de l'appel en cours, hérité par les workers (fork)
+
+
+# Fonction wrapper pour convertir une tranche d'images (workers démarrés par fork)
+def _convert_batch(start: int, stop: int):
     """
-    Wrapper pour la conversion d'image dans un processus séparé.
-    Les processus ne partagent pas la mémoire, donc le logger doit être
-    passé ou recréé dans chaque processus.
+    Convertit les images d'indices start..stop-1 de la liste héritée du processus principal.
     
-    Cette fonction est exécutée dans chaque processus worker. Elle reçoit
-    les arguments sous forme de tuple et appelle convert_to_grayscale.
+    Avec fork, les workers héritent de _job (copie à l'écriture) : seuls les
+    bornes de la tranche sont sérialisées à l'aller (décomposées en C par
+    starmap, sans dépaquetage Python). Au retour, les résultats
+    sont renvoyés en colonnes (un tableau par champ) plutôt qu'en un
+    dictionnaire par image : les clés et les chemins d'entrée ne sont pas
+    répétés dans le pickle. _rows_from_batch reconstruit les dictionnaires.
     """
-    path, output_dir, thread_id, use_lock = args  # Décompose le tuple d'arguments en variables séparées
-    return convert_to_grayscale(path, output_dir, thread_id=thread_id, use_lock=use_lock)  # Appelle la fonction de conversion et retourne le résultat
+    paths, output_dir, n_workers, use_lock = _job  # Paramètres hérités du processus principal
+    success = bytearray()  # Réussite de chaque image (0/1)
+    times = array.array('d')  # Temps de traitement de chaque image
+    cached = bytearray()  # Résultat venu du cache (0/1)
+    outputs = []  # Chemin de sortie de chaque image (None en cas d'échec)
+    errors = {}  # Messages d'erreur {position dans la tranche: message}
+    for i in range(start, stop):  # Parcourt les images de la tranche
+        res = convert_to_grayscale(paths[i], output_dir, thread_id=f"P{i % n_workers}", use_lock=use_lock)  # Convertit l'image
+        success.append(res["success"])  # Réussite
+        times.append(res["processing_time"])  # Temps de traitement
+        cached.append(bool(res.get("cached")))  # Cache
+        outputs.append(res["output"])  # Chemin de sortie
+        if "error" in res:  # Échec de la conversion
+            errors[i - start] = res["error"]  # Message d'erreur
+    return start, bytes(success), times, bytes(cached), outputs, errors  # Colonnes de la tranche
+
+
+# Reconstruit les dictionnaires de résultats d'une tranche (processus principal)
+def _rows_from_batch(batch, paths: List[str], n_workers: int) -> List[Dict]:
+    """Retourne les dictionnaires de résultats (même format que convert_to_grayscale) d'une tranche en colonnes"""
+    start, success, times, cached, outputs, errors = batch  # Colonnes de la tranche
+    rows = []  # Dictionnaires reconstruits
+    for k in range(len(success)):  # Parcourt les images de la tranche
+        i = start + k  # Indice de l'image dans la liste complète
+        row = {"success": bool(success[k]), "input": paths[i], "output": outputs[k]}  # Champs communs
+        if k in errors:  # Échec : même format que le dictionnaire d'erreur
+            row["error"] = errors[k]  # Message d'erreur
+        row["processing_time"] = times[k]  # Temps de traitement
+        row["thread_id"] = f"P{i % n_workers}"  # Identifiant du processus (recalculé, non transmis)
+        if k not in errors:  # Succès : indique l'origine du résultat
+            row["cached"] = bool(cached[k])  # Résultat venu du cache
+        rows.append(row)  # Ajoute le dictionnaire
+    return rows  # Retourne les résultats de la tranche
 
 
 # Traite les images en parallèle en utilisant multiprocessing.Pool (processus séparés)
 def process_multiprocessing(
     image_paths: List[str],  # Liste des chemins vers les images à traiter
     output_dir: str,  # Dossier où sauvegarder les images converties
-    n_workers: int = None,  # Nombre de processus workers (None = nombre de CPU)
-    use_lock: bool = True  # Si True, utilise un Lock multiprocessing pour protéger les zones critiques
+    n_workers: int = None,  # Nombre de processus workers (None = nombre de cœurs autorisés)
+    use_lock: bool = True,  # Si True, utilise un Lock multiprocessing pour protéger les zones critiques
+    sharded_log: bool = False,  # Si True (avec use_lock), chaque processus écrit son propre log, fusionné à la fin
+    append_log: bool = False,  # Si True (avec use_lock), écrit le log sans verrou (ajout atomique O_APPEND)
+    pin: bool = False,  # Si True, chaque processus worker est épinglé sur un cœur
+    chunksize: int = None  # Nombre d'images envoyées à un worker par tâche (None = len(image_paths) // (4 * n_workers))
 ) -> Dict:  # Retourne un dictionnaire avec les statistiques et métriques
     """
     Traite les images en parallèle avec des processus séparés.
@@ -59,14 +99,22 @@ def process_multiprocessing(
         output_dir: Dossier de sortie
         n_workers: Nombre de processus workers
         use_lock: Si True, utilise un Lock multiprocessing pour protéger les zones critiques
+        sharded_log: Si True (avec use_lock), chaque processus écrit dans log_file.<pid>, fusionné après le pool
+        append_log: Si True (avec use_lock), chaque message est écrit par un seul os.write en O_APPEND,
+            sans multiprocessing.Lock (le noyau sérialise les ajouts)
+        pin: Si True, le worker N est épinglé sur le N-ième cœur autorisé (os.sched_setaffinity)
+        chunksize: Nombre d'images par tâche envoyée aux workers (None = environ 4 paquets par worker)
     
     Returns:
         Dictionnaire avec les statistiques et métriques de synchronisation
     """
     import multiprocessing  # Import de multiprocessing (redondant mais gardé pour clarté)
+    global _job  # Déclare qu'on modifie les paramètres hérités par les workers
     
     if n_workers is None:  # Si le nombre de workers n'est pas spécifié
-        n_workers = os.cpu_count() or 2  # Utilise le nombre de CPU disponibles (ou 2 par défaut)
+        n_workers = default_workers()  # Utilise le nombre de cœurs autorisés pour ce processus
+    if chunksize is None:  # Taille des paquets non spécifiée
+        chunksize = max(1, len(image_paths) // (4 * n_workers))  # Environ 4 paquets par worker (équilibre charge / coût IPC)
     
     # Créer le logger process-safe
     log_file = os.path.join(output_dir, "processing.log")  # Construit le chemin du fichier de log
@@ -74,7 +122,12 @@ def process_multiprocessing(
     if use_lock:  # Si on doit utiliser un lock
         # Le logger doit être créé dans chaque processus
         # On passe le chemin du fichier et recréons le logger dans chaque worker
-        logger = ProcessSafeFileLogger(log_file)  # Crée un logger process-safe avec lock multiprocessing
+        if sharded_log:  # Un fichier de log par processus, sans verrou partagé
+            logger = ShardedFileLogger(log_file)  # Crée un logger à shards par processus (hérité par fork)
+        elif append_log:  # Ajout atomique du noyau, sans verrou partagé
+            logger = AppendFileLogger(log_file)  # Crée un logger O_APPEND sans verrou (hérité par fork)
+        else:  # Verrou multiprocessing partagé
+            logger = ProcessSafeFileLogger(log_file)  # Crée un logger process-safe avec lock multiprocessing
     else:  # Si on ne veut pas de protection
         logger = type('Logger', (), {'log_file': log_file})()  # Crée un objet logger minimal sans protection
     
@@ -84,13 +137,34 @@ def process_multiprocessing(
     t.start()  # Démarre le chronomètre
     
     # Préparer les arguments pour chaque image
-    args = [  # Crée une liste de tuples d'arguments pour chaque image
-        (p, output_dir, f"P{i % n_workers}", use_lock)  # Tuple avec (chemin, dossier_sortie, id_processus, use_lock)
-        for i, p in enumerate(image_paths)  # Parcourt toutes les images avec leur index
-    ]
+    if MP_CONTEXT.get_start_method() == "fork":  # Les workers héritent de la mémoire du processus principal
+        _job = (image_paths, output_dir, n_workers, use_lock)  # Paramètres communs, hérités par fork (avant la création du pool)
+        n = len(image_paths)  # Nombre d'images
+        func, args = _convert_batch, [(k, min(k + chunksize, n)) for k in range(0, n, chunksize)]  # Une tâche par tranche (seules les bornes sont envoyées)
+    else:  # spawn : rien n'est hérité, chaque tâche transporte ses arguments
+        # starmap décompose les tuples en C : convert_to_grayscale est appelée
+        # directement, sans wrapper Python intermédiaire par image
+        func = convert_to_grayscale  # Fonction de conversion (arguments positionnels)
+        args = [  # Crée une liste de tuples d'arguments pour chaque image
+            (p, output_dir, "_gray", f"P{i % n_workers}", use_lock)  # Tuple avec (chemin, dossier_sortie, suffixe, id_processus, use_lock)
+            for i, p in enumerate(image_paths)  # Parcourt toutes les images avec leur index
+        ]
+    
+    try:  # Libère les paramètres hérités même en cas d'erreur
+        with MP_CONTEXT.Pool(processes=n_workers, **pinning_kwargs(pin)) as pool:  # Crée un pool de n_workers processus (fork sur POSIX, épinglés si pin)
+            if func is _convert_batch:  # Tranches en colonnes
+                results = []  # Résultats reconstruits
+                for batch in pool.starmap(func, args, chunksize=1):  # Une tranche par tâche, bornes passées en arguments positionnels
+                    results.extend(_rows_from_batch(batch, image_paths, n_workers))  # Reconstruit ses dictionnaires
+            else:  # Un tuple d'arguments par image
+                results = pool.starmap(func, args, chunksize=chunksize)  # Distribue les tâches par paquets (tuples décomposés en C) et collecte les résultats
+    finally:  # Bloc exécuté dans tous les cas
+        _job = None  # Les paramètres ne servent plus (le pool est arrêté)
     
-    with Pool(processes=n_workers) as pool:  # Crée un pool de n_workers processus (gestion automatique)
-        results = pool.map(_convert_wrapper, args)  # Distribue les tâches aux processus et collecte les résultats
+    if isinstance(logger, ShardedFileLogger):  # Les logs des processus sont dans des fichiers séparés
+        logger.close()  # Fusionne les shards dans le log global (compté dans le temps total)
+    elif isinstance(logger, (ProcessSafeFileLogger, AppendFileLogger)):  # Descripteur éventuellement ouvert dans le processus principal
+        logger.close()  # Ferme le descripteur du processus principal
     
     total = t.stop()  # Arrête le chronomètre et récupère le temps total
     
@@ -0,0 +1,139 @@
+# src/versions/numba_batch.py
+"""
+Version Numba par lots (optionnelle) - un seul noyau parallèle par lot d'images.
+
+Ce module implémente la conversion en niveaux de gris en séparant les E/S du
+calcul. Les images sont décodées par un pool de threads (Pillow libère le GIL
+pendant le décodage et l'encodage), rangées à plat dans un seul tampon uint8
+avec une table de positions, puis converties par un seul appel au noyau
+kernels.rgb_to_gray_batch, parallélisé par Numba (prange sur les images).
+
+Rôle détaillé :
+- Décode un lot d'images en parallèle (ThreadPoolExecutor, E/S uniquement)
+- Concatène les pixels RGB du lot dans un tampon unique (tailles quelconques)
+- Convertit tout le lot en un seul appel compilé, sans GIL ni pickle :
+  plus de tâche Python (ni d'aller-retour IPC) par image
+- Encode et sauvegarde les résultats avec le même pool de threads
+- Aucun verrou : chaque thread ne touche que ses propres images
+- En dessous de min_images, exécute la version séquentielle : la compilation
+  et le démarrage des threads de Numba ne seraient pas amortis
+
+Nécessite Numba et NumPy ; AVAILABLE vaut False sinon.
+"""
+from typing import List, Dict  # Types pour les annotations de type
+from concurrent.futures import ThreadPoolExecutor  # Pool de threads pour le décodage et l'encodage
+import os  # Module pour la manipulation de chemins en chaînes (os.path)
+from PIL import Image  # Import de Pillow pour le décodage/encodage des images
+from ..common import Timer, default_workers  # Import de la classe Timer et du nombre de workers par défaut
+from ..processor import set_global_logger  # Setter du logger global (réinitialisé pour la version séquentielle)
+from .. import kernels  # Noyaux compilés avec Numba (optionnels)
+
+np = kernels.np  # NumPy (None si indisponible)
+
+AVAILABLE = kernels.AVAILABLE  # Indique si la version Numba par lots est utilisable
+
+_warmed_up = False  # Indique si le noyau parallèle a déjà été appelé dans ce processus
+
+
+def _warm_up():
+    """
+    Compile le noyau (ou le charge depuis le cache) sur un lot factice, une fois par processus.
+    
+    Pas à l'import : le premier appel démarre le pool de threads de Numba
+    (OpenMP/TBB/workqueue), qui ne survit pas à un fork. Le runner n'exécute
+    cette version qu'après toutes les expériences à base de processus.
+    """
+    global _warmed_up  # Déclare qu'on modifie l'indicateur du module
+    if not _warmed_up:  # Premier appel dans ce processus
+        kernels.rgb_to_gray_batch(np.zeros(48, dtype=np.uint8), np.zeros(1, dtype=np.int64), np.full(1, 16, dtype=np.int64), np.empty(16, dtype=np.uint8))  # Lot d'une image 4x4 factice
+        _warmed_up = True  # Ne pré-chauffe plus
+
+
+def _decode(path: str):
+    """Décode une image en tableau (H, W, 3) uint8, ou retourne l'exception si elle est illisible"""
+    try:  # Bloc try pour capturer les erreurs de décodage
+        with Image.open(path) as img:  # Ouvre l'image avec Pillow (fermeture automatique)
+            return np.asarray(img.convert("RGB"))  # Tableau (H, W, 3) uint8
+    except Exception as e:  # Image illisible
+        return e  # L'erreur est traitée par l'appelant
+
+
+# Traite les images par lots avec un noyau Numba parallèle
+def process_numba_batch(image_paths: List[str], output_dir: str, n_threads: int = None, batch: int = 64,
+                        suffix: str = "_gray", min_images: int = 100) -> Dict:
+    """
+    Traite les images par lots : décodage en threads, un appel Numba par lot, encodage en threads.
+
+    Args:
+        image_paths: Liste des chemins vers les images
+        output_dir: Dossier de sortie
+        n_threads: Nombre de threads pour le décodage/encodage (None = nombre de cœurs autorisés)
+        batch: Nombre maximum d'images converties par appel au noyau (limite la mémoire)
+        suffix: Suffixe à ajouter au nom de fichier
+        min_images: En dessous de ce nombre d'images, la version séquentielle est exécutée
+            à la place (résultat marqué "batch_bypassed")
+
+    Returns:
+        Dictionnaire avec les statistiques de traitement (même format que les autres versions)
+    """
+    if not AVAILABLE:  # Vérifie que Numba est installé
+        raise RuntimeError("La version Numba par lots nécessite Numba et NumPy")  # Lève une erreur si Numba manque
+    if len(image_paths) < min_images:  # Trop peu d'images pour amortir la compilation et les threads de Numba
+        from . import mono  # Version séquentielle
+        set_global_logger(None)  # Pas de log : la version par lots n'en écrit pas (et pas dans le log d'une autre expérience)
+        res = mono.process_sequential(image_paths, output_dir)  # Traitement image par image
+        res["batch_bypassed"] = True  # Signale que le noyau par lots n'a pas été utilisé
+        return res  # Retourne les résultats (même format)
+    _warm_up()  # Compile ou charge le noyau hors du temps mesuré
+
+    timer = Timer()  # Crée un chronomètre pour mesurer le temps total
+    runs = []  # Liste des résultats individuels
+    timer.start()  # Démarre le chronomètre
+
+    with ThreadPoolExecutor(max_workers=n_threads or default_workers()) as ex:  # Threads d'E/S (décodage/encodage)
+        for k in range(0, len(image_paths), batch):  # Parcourt les images par lots
+            chunk = image_paths[k:k + batch]  # Lot courant
+            t = Timer()  # Chronomètre du lot
+            t.start()  # Démarre le chronomètre du lot
+            decoded = list(ex.map(_decode, chunk))  # Décode le lot en parallèle (dans l'ordre)
+            ok = [(p, rgb) for p, rgb in zip(chunk, decoded) if not isinstance(rgb, Exception)]  # Images lisibles
+            for p, rgb in zip(chunk, decoded):  # Résultats d'erreur des images illisibles
+                if isinstance(rgb, Exception):  # Décodage impossible
+                    runs.append({"image": p, "elapsed": 0.0, "success": False, "error": str(rgb)})  # Résultat d'erreur pour cette image
+            if not ok:  # Aucune image lisible dans ce lot
+                continue  # Passe au lot suivant
+
+            # Table de positions : image i = pixels offsets[i] .. offsets[i] + n_pixels[i]
+            n_pixels = np.array([rgb.shape[0] * rgb.shape[1] for _, rgb in ok], dtype=np.int64)  # Nombre de pixels de chaque image
+            offsets = np.zeros(len(ok), dtype=np.int64)  # Premier pixel de chaque image
+            np.cumsum(n_pixels[:-1], out=offsets[1:])  # Positions cumulées
+            rgb_flat = np.concatenate([rgb.reshape(-1) for _, rgb in ok])  # Pixels RGB de tout le lot, à plat
+            out_flat = np.empty(int(n_pixels.sum()), dtype=np.uint8)  # Résultat de tout le lot
+            kernels.rgb_to_gray_batch(rgb_flat, offsets, n_pixels, out_flat)  # Un seul appel compilé pour tout le lot
+
+            def _save(i: int):  # Sauvegarde l'image i du lot (exécutée par un thread d'E/S) ; retourne l'erreur ou None
+                p, rgb = ok[i]  # Chemin et tableau source
+                base, ext = os.path.splitext(os.path.basename(p))  # Nom de base et extension de l'image source
+                gray = out_flat[offsets[i]:offsets[i] + n_pixels[i]].reshape(rgb.shape[:2])  # Vue (H, W) sur le résultat
+                try:  # Une sortie impossible à écrire n'interrompt pas le lot
+                    Image.fromarray(gray, mode="L").save(os.path.join(output_dir, base + suffix + ext))  # Encode et sauvegarde
+                except OSError as e:  # Écriture impossible
+                    return str(e)  # Erreur de cette image
+                return None  # Image sauvegardée
+
+            errors = list(ex.map(_save, range(len(ok))))  # Sauvegarde le lot en parallèle (une erreur ou None par image)
+            elapsed = t.stop() / len(chunk)  # Temps moyen par image du lot
+            for (p, _), error in zip(ok, errors):  # Ajoute les informations de chaque image du lot
+                if error is not None:  # Sauvegarde échouée
+                    runs.append({"image": p, "elapsed": elapsed, "success": False, "error": error})  # Résultat d'erreur pour cette image
+                else:  # Image convertie et sauvegardée
+                    runs.append({"image": p, "elapsed": elapsed, "success": True, "processing_time": elapsed})  # Même format que la version mono
+
+    total = timer.stop()  # Arrête le chronomètre et récupère le temps total
+    return {  # Retourne un dictionnaire avec toutes les statistiques
+        "total_time": total,  # Temps total de traitement
+        "n_images": len(image_paths),  # Nombre d'images traitées
+        "runs": runs,  # Liste de tous les résultats individuels
+        "batch_size": batch,  # Nombre maximum d'images par appel au noyau
+        "sync_metrics": {}  # Pas de métriques de synchronisation (aucun verrou)
+    }
@@ -11,47 +11,91 @@ cycle de vie des processus et le retour des résultats via des futures.
 
 Rôle détaillé :
 - Utilise ProcessPoolExecutor pour créer et gérer un pool de processus
-- Soumet les tâches de conversion via submit() qui retourne des futures
-- Collecte les résultats au fur et à mesure avec as_completed()
+- Soumet les tâches de conversion par paquets via map(chunksize=...) : un seul
+  aller-retour IPC (pickle + file) par paquet au lieu d'un futur par image
+- Pool créé pour l'appel avec fork : les paramètres communs sont hérités par les
+  workers, chaque tâche ne sérialise que l'indice de son image
 - Démontre la synchronisation entre processus avec multiprocessing.Lock()
+- Variante sans verrou : un fichier de log par worker, fusionné après le pool (sharded_log)
 - Mesure les performances et métriques de synchronisation
 - Compare avec ThreadPoolExecutor (pas de GIL, vraie parallélisation)
 """
-from concurrent.futures import ProcessPoolExecutor, as_completed  # Import de ProcessPoolExecutor et as_completed pour gérer les futures
+from concurrent.futures import ProcessPoolExecutor  # Import de ProcessPoolExecutor pour gérer le pool de processus
+from contextlib import nullcontext  # Contexte neutre pour un executor fourni par l'appelant (pas de shutdown)
 from typing import List, Dict  # Types pour les annotations de type
 from ..processor import convert_to_grayscale, set_global_logger  # Import de la fonction de conversion et du setter de logger
-from ..common import Timer  # Import de la classe Timer pour mesurer le temps
+from ..common import Timer, pinning_kwargs, MP_CONTEXT, default_workers  # Import de la classe Timer, des arguments d'épinglage des workers, du contexte des pools et du nombre de workers par défaut
 import os  # Module pour les opérations sur le système de fichiers
-from ..synchronization_tools import ProcessSafeFileLogger  # Import de l'outil de synchronisation pour processus
+from ..synchronization_tools import ProcessSafeFileLogger, ShardedFileLogger  # Import des outils de synchronisation pour processus
+
+_worker_log_file = None  # Fichier de log (et mode) du logger déjà créé dans ce processus worker
+
+# Verrou du log partagé par le processus principal et tous les workers : créé à l'import,
+# avant tout pool, il est hérité par fork (MP_CONTEXT), y compris par les workers d'un pool
+# partagé démarré avant l'expérience. Chaque worker recrée son logger mais garde ce verrou.
+_LOG_LOCK = MP_CONTEXT.Lock()  # Verrou multiprocessing commun à tous les loggers de ce module
+_LOG_COUNTERS = MP_CONTEXT.RawArray('d', ProcessSafeFileLogger.N_COUNTERS)  # Métriques du log en mémoire partagée (même héritage que le verrou)
+
+
+# Crée le logger du processus worker (une fois par fichier de log)
+def _ensure_worker_logger(use_lock: bool, log_file: str, sharded: bool):
+    """
+    Crée le logger dans le processus worker s'il n'existe pas encore pour ce fichier.
+    Le logger doit être recréé dans chaque processus car la mémoire n'est pas partagée
+    (sans vider le fichier déjà créé par le processus principal).
+    """
+    global _worker_log_file  # Déclare qu'on modifie la variable globale du worker
+    if use_lock and log_file and (log_file, sharded) != _worker_log_file:  # Premier appel de ce worker pour ce fichier de log
+        if sharded:  # Un fichier de log par worker, sans verrou
+            logger = ShardedFileLogger(log_file, owner_pid=os.getppid())  # Écrit dans log_file.<pid> ; le processus principal fusionne
+        else:  # Fichier de log commun protégé par le verrou partagé
+            logger = ProcessSafeFileLogger(log_file, truncate=False, lock=_LOG_LOCK, counters=_LOG_COUNTERS)  # Crée le logger de ce processus (le fichier existe déjà, verrou hérité du parent)
+        set_global_logger(logger)  # Définit le logger global pour ce processus
+        _worker_log_file = (log_file, sharded)  # Mémorise le fichier de log (et le mode) du logger créé
 
 
 # Fonction wrapper pour convertir une image (utilisée par ProcessPoolExecutor)
 def _wrapper(args):
     """
     Wrapper pour la conversion d'image dans un processus séparé.
-    Le logger doit être recréé dans chaque processus car la mémoire n'est pas partagée.
     
     Cette fonction est exécutée dans chaque processus worker. Elle reçoit
-    les arguments sous forme de tuple, recrée le logger dans le processus,
-    et appelle convert_to_grayscale.
+    les arguments sous forme de tuple, crée le logger dans le processus (une
+    seule fois par worker et par fichier de log), et appelle convert_to_grayscale.
+    Utilisée avec un pool partagé (démarré avant l'appel) ou sans fork.
     """
-    path, output_dir, thread_id, use_lock, log_file = args  # Décompose le tuple d'arguments en variables séparées
-    
-    # Recréer le logger dans chaque processus
-    if use_lock and log_file:  # Si on doit utiliser un lock et qu'un fichier de log est fourni
-        from ..synchronization_tools import ProcessSafeFileLogger  # Import du logger process-safe (dans chaque processus)
-        logger = ProcessSafeFileLogger(log_file)  # Crée un nouveau logger dans ce processus
-        set_global_logger(logger)  # Définit le logger global pour ce processus
-    
+    path, output_dir, thread_id, use_lock, log_file, sharded = args  # Décompose le tuple d'arguments en variables séparées
+    _ensure_worker_logger(use_lock, log_file, sharded)  # Crée le logger dans ce processus si nécessaire
     return convert_to_grayscale(path, output_dir, thread_id=thread_id, use_lock=use_lock)  # Appelle la fonction de conversion et retourne le résultat
 
 
+_job = None  # (image_paths, output_dir, max_workers, use_lock, log_file, sharded_log) de l'appel en cours, hérité par les workers (fork)
+
+
+# Fonction wrapper pour convertir l'image d'indice i (pool créé pour l'appel, fork)
+def _convert_index(i: int):
+    """
+    Convertit l'image d'indice i de la liste héritée du processus principal.
+    
+    Les workers d'un pool créé après l'affectation de _job en héritent par fork
+    (copie à l'écriture) : les paramètres constants ne sont jamais sérialisés,
+    seul l'entier i est envoyé avec chaque tâche.
+    """
+    paths, output_dir, max_workers, use_lock, log_file, sharded = _job  # Paramètres hérités du processus principal
+    _ensure_worker_logger(use_lock, log_file, sharded)  # Crée le logger dans ce processus si nécessaire
+    return convert_to_grayscale(paths[i], output_dir, thread_id=f"P{i % max_workers}", use_lock=use_lock)  # Appelle la fonction de conversion et retourne le résultat
+
+
 # Traite les images en parallèle en utilisant ProcessPoolExecutor (processus séparés)
 def process_processpool(
     image_paths: List[str],  # Liste des chemins vers les images à traiter
     output_dir: str,  # Dossier où sauvegarder les images converties
-    max_workers: int = None,  # Nombre maximum de processus (None = nombre de CPU)
-    use_lock: bool = True  # Si True, utilise un Lock multiprocessing pour protéger les zones critiques
+    max_workers: int = None,  # Nombre maximum de processus (None = nombre de cœurs autorisés)
+    use_lock: bool = True,  # Si True, utilise un Lock multiprocessing pour protéger les zones critiques
+    executor: ProcessPoolExecutor = None,  # Pool de processus existant à réutiliser (None = crée un pool pour cet appel)
+    pin: bool = False,  # Si True, chaque processus worker du nouveau pool est épinglé sur un cœur
+    chunksize: int = None,  # Nombre d'images envoyées à un worker par tâche (None = len(image_paths) // (4 * max_workers))
+    sharded_log: bool = False  # Si True (avec use_lock), chaque worker écrit son propre log, fusionné après le pool
 ) -> Dict:  # Retourne un dictionnaire avec les statistiques et métriques
     """
     Traite les images en parallèle avec ProcessPoolExecutor.
@@ -70,18 +114,31 @@ def process_processpool(
         output_dir: Dossier de sortie
         max_workers: Nombre maximum de processus
         use_lock: Si True, utilise un Lock multiprocessing pour protéger les zones critiques
+        executor: Pool de processus existant (réutilisé entre expériences, pas arrêté à la fin)
+        pin: Si True, le worker N du pool créé est épinglé sur le N-ième cœur autorisé
+            (sans effet sur un executor fourni, épinglé ou non à sa création)
+        chunksize: Nombre d'images par tâche envoyée aux workers (None = même heuristique
+            que multiprocessing.Pool.map : environ 4 paquets par worker)
+        sharded_log: Si True (avec use_lock), chaque worker écrit dans log_file.<pid> sans verrou ;
+            les fichiers sont fusionnés dans le log global après le pool (compté dans le temps total)
     
     Returns:
         Dictionnaire avec les statistiques et métriques de synchronisation
     """
+    global _job  # Déclare qu'on modifie les paramètres hérités par les workers
+    
     if max_workers is None:  # Si le nombre de workers n'est pas spécifié
-        max_workers = os.cpu_count() or 2  # Utilise le nombre de CPU disponibles (ou 2 par défaut)
+        max_workers = default_workers()  # Utilise le nombre de cœurs autorisés pour ce processus
+    if chunksize is None:  # Taille des paquets non spécifiée
+        chunksize = max(1, len(image_paths) // (4 * max_workers))  # Environ 4 paquets par worker (équilibre charge / coût IPC)
     
     # Créer le logger process-safe
     log_file = os.path.join(output_dir, "processing.log")  # Construit le chemin du fichier de log
     
-    if use_lock:  # Si on doit utiliser un lock
-        logger = ProcessSafeFileLogger(log_file)  # Crée un logger process-safe avec lock multiprocessing
+    if use_lock and sharded_log:  # Un fichier de log par worker, sans verrou partagé
+        logger = ShardedFileLogger(log_file)  # Crée le logger à shards (crée le log global, supprime les anciens shards)
+    elif use_lock:  # Si on doit utiliser un lock
+        logger = ProcessSafeFileLogger(log_file, lock=_LOG_LOCK, counters=_LOG_COUNTERS)  # Crée un logger process-safe avec le lock multiprocessing partagé par les workers
     else:  # Si on ne veut pas de protection
         logger = type('Logger', (), {'log_file': log_file})()  # Crée un objet logger minimal sans protection
     
@@ -91,26 +148,35 @@ def process_processpool(
     timer.start()  # Démarre le chronomètre
     results = []  # Liste pour stocker les résultats
     
-    with ProcessPoolExecutor(max_workers=max_workers) as ex:  # Crée un pool de processus (gestion automatique)
-        # Préparer les arguments avec le chemin du log pour chaque processus
-        futures = {  # Crée un dictionnaire {future: chemin_image} pour suivre les tâches
-            ex.submit(  # Soumet une tâche au pool et retourne un future
-                _wrapper,  # Fonction wrapper à exécuter dans le processus
-                (p, output_dir, f"P{i % max_workers}", use_lock, log_file)  # Tuple d'arguments (chemin, dossier_sortie, id_processus, use_lock, log_file)
-            ): p  # Clé du dictionnaire : chemin de l'image
-            for i, p in enumerate(image_paths)  # Parcourt toutes les images avec leur index
-        }
-        
-        # Collecter les résultats au fur et à mesure
-        for fut in as_completed(futures):  # Parcourt les futures au fur et à mesure de leur complétion
-            res = fut.result()  # Récupère le résultat du future (bloque si pas encore prêt)
-            results.append(res)  # Ajoute le résultat à la liste
+    inherit = executor is None and MP_CONTEXT.get_start_method() == "fork"  # Les workers du nouveau pool hériteront de _job
+    if inherit:  # Pool créé par cet appel : workers forkés après l'affectation
+        _job = (image_paths, output_dir, max_workers, use_lock, log_file, sharded_log)  # Paramètres communs, hérités par fork
+    pool = nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=max_workers, mp_context=MP_CONTEXT, **pinning_kwargs(pin))  # Pool fourni ou nouveau pool (fork sur POSIX, épinglé si pin)
+    try:  # Remet _job à None même en cas d'erreur
+        with pool as ex:  # Utilise le pool de processus (un nouveau pool est arrêté à la sortie du bloc)
+            if inherit:  # Paramètres hérités : seul l'indice de l'image est sérialisé
+                tasks, func = range(len(image_paths)), _convert_index  # Indices des images
+            else:  # Pool partagé (workers déjà démarrés) ou démarrage sans fork
+                tasks = (  # Tuples d'arguments (chemin, dossier_sortie, id_processus, use_lock, log_file, sharded_log), générés à la demande
+                    (p, output_dir, f"P{i % max_workers}", use_lock, log_file, sharded_log)  # Arguments d'une image
+                    for i, p in enumerate(image_paths)  # Parcourt toutes les images avec leur index
+                )
+                func = _wrapper  # Wrapper recevant tous les arguments
+            
+            # Envoie les images par paquets de chunksize et collecte les résultats (dans l'ordre des images)
+            results.extend(ex.map(func, tasks, chunksize=chunksize))  # Un futur par paquet au lieu d'un par image
+    finally:  # Le pool est arrêté
+        _job = None  # Les paramètres ne servent plus
+    
+    if isinstance(logger, ShardedFileLogger):  # Les logs des workers sont dans des fichiers séparés
+        logger.close()  # Fusionne les shards dans le log global (compté dans le temps total)
+    elif isinstance(logger, ProcessSafeFileLogger):  # Descripteur éventuellement ouvert dans le processus principal
+        logger.close()  # Ferme le descripteur du processus principal
     
     total = timer.stop()  # Arrête le chronomètre et récupère le temps total
     
     # Récupérer les métriques de synchronisation
-    # Note: Les métriques du logger ne peuvent pas être récupérées directement
-    # car elles sont dans des processus séparés. On peut les lire depuis le fichier.
+    # Les métriques du logger process-safe sont cumulées par tous les workers en mémoire partagée
     logger_metrics = {}  # Initialise le dictionnaire de métriques du logger
     if hasattr(logger, 'get_metrics'):  # Vérifie si le logger a une méthode get_metrics
         try:  # Bloc try pour gérer les erreurs possibles
@@ -11,9 +11,10 @@ avec des mécanismes de synchronisation.
 
 Rôle détaillé :
 - Crée plusieurs threads pour traiter les images en parallèle
-- Utilise une Queue pour distribuer le travail entre les threads
+- Répartit les images entre les threads à l'avance (une tranche par thread, sans file ni verrou de distribution)
 - Démontre les race conditions avec une version sans protection
 - Corrige les race conditions avec des Lock (mutex)
+- Variante sans verrou sur les résultats : une case préallouée par image, écrite par son seul thread
 - Limite l'accès concurrent avec des Sémaphores
 - Mesure les temps d'attente sur les verrous
 - Collecte les métriques de synchronisation
@@ -21,39 +22,37 @@ Rôle détaillé :
 import threading  # Module pour la création et gestion de threads
 from typing import List, Dict  # Types pour les annotations de type
 from ..processor import convert_to_grayscale, set_global_logger  # Import de la fonction de conversion et du setter de logger
-from ..common import Timer  # Import de la classe Timer pour mesurer le temps
-from queue import Queue, Empty  # Import de Queue pour distribuer le travail et Empty pour les exceptions
+from ..common import Timer, default_workers  # Import de la classe Timer et du nombre de workers par défaut
 from ..synchronization_tools import (  # Import des outils de synchronisation
     ThreadSafeFileLogger,  # Logger thread-safe avec Lock
     SemaphoreFileLogger,  # Logger avec Sémaphore pour limiter l'accès
+    AsyncFileLogger,  # Logger asynchrone (file + thread écrivain dédié)
+    ShardedFileLogger,  # Logger à tampons par thread fusionnés à la fin
+    AppendFileLogger,  # Logger sans verrou (ajout atomique O_APPEND)
     UnsafeCounter,  # Compteur non thread-safe (démonstration)
     ThreadSafeCounter  # Compteur thread-safe avec Lock
 )
 import os  # Module pour les opérations sur le système de fichiers
-import time  # Module pour mesurer le temps (perf_counter pour haute précision)
+import time  # Module pour mesurer le temps (perf_counter_ns pour haute précision)
+import array  # Module pour les temps par image préalloués (entiers 64 bits compacts)
 
 
-# Fonction exécutée par chaque thread : récupère une image de la queue et la traite
-def worker_without_lock(in_q: Queue, out_list: List, output_dir: str, lock: threading.Lock, thread_id: str):
+# Fonction exécutée par chaque thread : traite les images de sa tranche
+def worker_without_lock(paths: List[str], out_list: List, output_dir: str, lock: threading.Lock, thread_id: str):
     """
     Worker sans protection pour démontrer les race conditions.
     L'écriture dans la liste partagée n'est pas protégée.
     
     Cette fonction est exécutée par chaque thread et traite les images
-    une par une. Elle ne protège pas l'accès à la liste partagée, ce qui
-    peut causer des race conditions.
+    de sa tranche une par une. Elle ne protège pas l'accès à la liste
+    partagée, ce qui peut causer des race conditions.
     """
-    while True:  # Boucle infinie jusqu'à ce que la queue soit vide
-        try:  # Bloc try pour gérer l'exception Empty
-            path = in_q.get_nowait()  # Récupère une image de la queue sans attendre (lève Empty si la queue est vide)
-        except Empty:  # Si la queue est vide, on a terminé
-            return  # Sort de la fonction (le thread se termine)
-        
-        t = Timer()  # Crée un chronomètre pour mesurer le temps de traitement de cette image
-        t.start()  # Démarre le chronomètre
+    now = time.perf_counter_ns  # Horloge monotone (entiers en ns), résolue une seule fois
+    for path in paths:  # Parcourt les images attribuées à ce thread (aucune synchronisation pour la distribution)
+        t0 = now()  # Horodatage de début (pas d'objet Timer alloué par image)
         # Conversion sans lock (peut causer des race conditions dans le log)
         res = convert_to_grayscale(path, output_dir, thread_id=thread_id, use_lock=False)  # Convertit l'image SANS protection (race condition possible)
-        elapsed = t.stop()  # Arrête le chronomètre et récupère le temps écoulé
+        elapsed = (now() - t0) / 1e9  # Temps écoulé en secondes
         
         # ZONE CRITIQUE NON PROTÉGÉE : Ajout dans la liste partagée
         # Sans lock, plusieurs threads peuvent modifier simultanément
@@ -63,35 +62,29 @@ def worker_without_lock(in_q: Queue, out_list: List, output_dir: str, lock: thre
             "success": res.get("success", False),  # Indique si la conversion a réussi
             "thread_id": thread_id  # Identifiant du thread
         })
-        in_q.task_done()  # Indique à la queue qu'une tâche est terminée
 
 
-# Fonction exécutée par chaque thread : récupère une image de la queue et la traite
-def worker_with_lock(in_q: Queue, out_list: List, output_dir: str, lock: threading.Lock, thread_id: str):
+# Fonction exécutée par chaque thread : traite les images de sa tranche
+def worker_with_lock(paths: List[str], out_list: List, output_dir: str, lock: threading.Lock, thread_id: str):
     """
     Worker avec protection Lock pour éviter les race conditions.
     L'écriture dans la liste partagée est protégée par un mutex.
     
     Cette fonction est exécutée par chaque thread et traite les images
-    une par une. Elle protège l'accès à la liste partagée avec un verrou,
-    garantissant qu'un seul thread peut modifier la liste à la fois.
+    de sa tranche une par une. Elle protège l'accès à la liste partagée
+    avec un verrou, garantissant qu'un seul thread peut modifier la liste à la fois.
     """
-    while True:  # Boucle infinie jusqu'à ce que la queue soit vide
-        try:  # Bloc try pour gérer l'exception Empty
-            path = in_q.get_nowait()  # Récupère une image de la queue sans attendre (lève Empty si la queue est vide)
-        except Empty:  # Si la queue est vide, on a terminé
-            return  # Sort de la fonction (le thread se termine)
-        
-        t = Timer()  # Crée un chronomètre pour mesurer le temps de traitement de cette image
-        t.start()  # Démarre le chronomètre
+    now = time.perf_counter_ns  # Horloge monotone (entiers en ns), résolue une seule fois
+    for path in paths:  # Parcourt les images attribuées à ce thread (aucune synchronisation pour la distribution)
+        t0 = now()  # Horodatage de début (pas d'objet Timer alloué par image)
         # Conversion avec lock (thread-safe)
         res = convert_to_grayscale(path, output_dir, thread_id=thread_id, use_lock=True)  # Convertit l'image AVEC protection (thread-safe)
-        elapsed = t.stop()  # Arrête le chronomètre et récupère le temps écoulé
+        t1 = now()  # Fin de la conversion, et début de l'attente du verrou
+        elapsed = (t1 - t0) / 1e9  # Temps écoulé en secondes
         
         # ZONE CRITIQUE PROTÉGÉE : Ajout dans la liste partagée avec Lock
-        start_wait = time.perf_counter()  # Enregistre le temps avant d'essayer d'acquérir le verrou
         with lock:  # Acquiert le verrou (bloque si un autre thread l'a déjà)
-            wait_time = time.perf_counter() - start_wait  # Calcule le temps d'attente pour acquérir le verrou
+            wait_time = (now() - t1) / 1e9  # Calcule le temps d'attente pour acquérir le verrou (en secondes)
             out_list.append({  # Ajoute le résultat à la liste partagée (PROTÉGÉ par le verrou)
                 "image": path,  # Chemin de l'image traitée
                 "elapsed": elapsed,  # Temps écoulé pour traiter cette image
@@ -100,17 +93,47 @@ def worker_with_lock(in_q: Queue, out_list: List, output_dir: str, lock: threadi
                 "lock_wait_time": wait_time  # Temps passé en attente du verrou
             })
             # Le verrou est automatiquement libéré à la sortie du bloc with
-        in_q.task_done()  # Indique à la queue qu'une tâche est terminée
+
+
+# Fonction exécutée par chaque thread : traite sa tranche et remplit ses cases de résultats
+def worker_local(paths: List[str], out_list: List, output_dir: str, lock: threading.Lock, thread_id: str,
+                 slots: range):
+    """
+    Worker sans verrou sur les résultats : out_list est préallouée, une case par image.
+    
+    slots donne l'indice de chaque image de la tranche dans image_paths ; le
+    thread écrit out_list[slot] = {...}, une affectation d'élément de liste
+    atomique sous le GIL (et protégée par le verrou interne de la liste sans
+    GIL). Aucune case n'a deux écrivains, donc aucun verrou, aucune fusion
+    après join(), et les résultats restent dans l'ordre des images.
+    lock n'est pas utilisé (mêmes premiers arguments que les autres workers).
+    Pendant la boucle, seuls deux horodatages et un booléen sont gardés par
+    image (tableaux préalloués) ; les dictionnaires sont créés après la boucle.
+    """
+    now = time.perf_counter_ns  # Horloge monotone (entiers en ns), résolue une seule fois
+    elapsed_ns = array.array('q', bytes(8 * len(paths)))  # Temps de chaque image en ns (préalloué, mis à zéro)
+    success = bytearray(len(paths))  # Réussite de chaque image (0/1)
+    for k, path in enumerate(paths):  # Parcourt les images attribuées à ce thread
+        t0 = now()  # Horodatage de début (pas d'objet Timer alloué par image)
+        res = convert_to_grayscale(path, output_dir, thread_id=thread_id, use_lock=True)  # Convertit l'image (log protégé par le logger)
+        elapsed_ns[k] = now() - t0  # Temps écoulé en ns
+        success[k] = res.get("success", False)  # Indique si la conversion a réussi
+    for slot, path, ns, ok in zip(slots, paths, elapsed_ns, success):  # Crée les résultats hors de la boucle mesurée image par image
+        out_list[slot] = {"image": path, "elapsed": ns / 1e9, "success": bool(ok), "thread_id": thread_id}  # Case de cette image (même format que les autres workers)
 
 
 # Traite les images en parallèle en utilisant des threads Python
 def process_threading(
     image_paths: List[str],  # Liste des chemins vers les images à traiter
     output_dir: str,  # Dossier où sauvegarder les images converties
-    n_threads: int = 4,  # Nombre de threads à créer (par défaut: 4)
+    n_threads: int = None,  # Nombre de threads à créer (None = nombre de cœurs autorisés)
     use_lock: bool = True,  # Si True, utilise un Lock pour protéger les zones critiques
     use_semaphore: bool = False,  # Si True, utilise un Semaphore pour limiter l'accès au log
-    max_concurrent_log: int = 2  # Nombre maximum de threads pouvant écrire simultanément dans le log
+    max_concurrent_log: int = None,  # Nombre maximum de threads pouvant écrire simultanément dans le log (None = max(2, cœurs // 2))
+    async_log: bool = False,  # Si True (avec use_lock), utilise le logger asynchrone au lieu du Lock
+    sharded_log: bool = False,  # Si True (avec use_lock), utilise des tampons de log par thread fusionnés à la fin
+    append_log: bool = False,  # Si True (avec use_lock), écrit le log sans verrou (ajout atomique O_APPEND)
+    local_results: bool = False  # Si True (avec use_lock), une case de résultat préallouée par image, sans verrou
 ) -> Dict:  # Retourne un dictionnaire avec les statistiques et métriques
     """
     Traite les images en parallèle avec des threads.
@@ -123,15 +146,24 @@ def process_threading(
     Args:
         image_paths: Liste des chemins vers les images
         output_dir: Dossier de sortie
-        n_threads: Nombre de threads
+        n_threads: Nombre de threads (None = nombre de cœurs autorisés, os.sched_getaffinity)
         use_lock: Si True, utilise un Lock pour protéger les zones critiques
         use_semaphore: Si True, utilise un Semaphore pour limiter l'accès au log
         max_concurrent_log: Nombre maximum de threads pouvant écrire simultanément dans le log
+            (None = moitié des cœurs autorisés, au moins 2 ; voir SemaphoreFileLogger.suggest_permits)
+        async_log: Si True (avec use_lock), les messages passent par une file vidée par un thread écrivain
+        sharded_log: Si True (avec use_lock), chaque thread tamponne son log, fusionné dans le fichier à la fin
+        append_log: Si True (avec use_lock), chaque message est écrit par un seul os.write en O_APPEND, sans verrou
+        local_results: Si True (avec use_lock), la liste des résultats est préallouée et chaque
+            thread écrit la case de ses images (results[i]) : plus de verrou par image sur les
+            résultats, ni de fusion après join() ; les résultats suivent l'ordre de image_paths
+            (la version sans lock garde la liste partagée pour la démonstration des race conditions)
     
     Returns:
         Dictionnaire avec les statistiques et métriques de synchronisation
     """
-    from queue import Queue  # Import de Queue (redondant mais gardé pour clarté)
+    if n_threads is None:  # Si le nombre de threads n'est pas spécifié
+        n_threads = default_workers()  # Utilise le nombre de cœurs autorisés pour ce processus
     
     # Créer le logger selon le type de synchronisation
     log_file = os.path.join(output_dir, "processing.log")  # Construit le chemin du fichier de log
@@ -139,37 +171,54 @@ def process_threading(
     if use_semaphore:  # Si on doit utiliser un sémaphore
         logger = SemaphoreFileLogger(log_file, max_concurrent_log)  # Crée un logger avec sémaphore (limite l'accès concurrent)
     elif use_lock:  # Si on doit utiliser un lock
-        logger = ThreadSafeFileLogger(log_file)  # Crée un logger thread-safe avec lock
+        if sharded_log:  # Tampons de log par thread
+            logger = ShardedFileLogger(log_file)  # Crée un logger à tampons par thread
+        elif append_log:  # Ajout atomique du noyau, sans verrou
+            logger = AppendFileLogger(log_file)  # Crée un logger O_APPEND sans verrou
+        elif async_log:  # File + thread écrivain
+            logger = AsyncFileLogger(log_file)  # Crée un logger asynchrone
+        else:  # Verrou classique
+            logger = ThreadSafeFileLogger(log_file)  # Crée un logger thread-safe avec lock
     else:  # Si on ne veut pas de protection
         # Logger sans protection (pour démontrer les race conditions)
         logger = type('Logger', (), {'log_file': log_file})()  # Crée un objet logger minimal sans protection
     
     set_global_logger(logger)  # Définit le logger global pour toutes les conversions
     
-    q = Queue()  # Crée une queue pour distribuer le travail entre les threads
-    for p in image_paths:  # Parcourt toutes les images
-        q.put(p)  # Ajoute chaque image à la queue
+    # Répartition à l'avance en tranches entrelacées (image i -> thread i % n_threads) :
+    # pas de Queue, donc aucune prise de verrou par image pour distribuer le travail
+    shards = [image_paths[i::n_threads] for i in range(n_threads)]  # Tranche d'images de chaque thread
     
-    results = []  # Liste partagée pour stocker les résultats (zone critique)
+    local = local_results and use_lock  # Cases de résultats préallouées (jamais pour la démonstration sans lock)
+    results = [None] * len(image_paths) if local else []  # Liste partagée des résultats (zone critique, sauf en cases préallouées)
     lock = threading.Lock()  # Crée un verrou pour protéger l'accès à la liste results
     threads = []  # Liste pour stocker les objets threads
     main_timer = Timer()  # Crée un chronomètre pour mesurer le temps total
     main_timer.start()  # Démarre le chronomètre
     
     # Choisir le worker selon le type de synchronisation
-    worker_func = worker_with_lock if use_lock else worker_without_lock  # Sélectionne la fonction worker appropriée
+    if local:  # Une case par image, écrite par le thread de cette image
+        worker_func = worker_local  # Worker sans verrou sur les résultats
+    else:  # Ajouts à la liste partagée
+        worker_func = worker_with_lock if use_lock or use_semaphore else worker_without_lock  # Sélectionne la fonction worker appropriée (le Semaphore passe aussi par le logger)
     
     for i in range(n_threads):  # Crée n_threads threads
         thread_id = f"T{i}"  # Génère un identifiant unique pour ce thread
+        args = (shards[i], results, output_dir, lock, thread_id)  # Arguments communs (tranche du thread et liste des résultats)
+        if local:  # Cases préallouées
+            args += (range(i, len(image_paths), n_threads),)  # Indices des images de la tranche (image i -> thread i % n_threads)
         t = threading.Thread(  # Crée un nouveau thread
             target=worker_func,  # Fonction à exécuter dans le thread
-            args=(q, results, output_dir, lock, thread_id),  # Arguments à passer à la fonction
+            args=args,  # Arguments à passer à la fonction
             daemon=True  # Thread daemon (se termine si le programme principal se termine)
         )
         t.start()  # Démarre le thread
         threads.append(t)  # Ajoute le thread à la liste
     
-    q.join()  # Attend que toutes les tâches de la queue soient terminées (bloque jusqu'à ce que toutes les images soient traitées)
+    for t in threads:  # Attend la fin de chaque thread
+        t.join()  # Bloque jusqu'à ce que le thread ait traité toute sa tranche
+    if isinstance(logger, (ThreadSafeFileLogger, SemaphoreFileLogger, AsyncFileLogger, ShardedFileLogger, AppendFileLogger)):  # Loggers à fermer : messages en attente (tampon, file, shards) ou descripteur ouvert
+        logger.close()  # Attend leur écriture (comptée dans le temps total)
     total = main_timer.stop()  # Arrête le chronomètre et récupère le temps total
     
     # Récupérer les métriques de synchronisation du logger
@@ -11,27 +11,170 @@ cycle de vie des threads et le retour des résultats via des futures.
 
 Rôle détaillé :
 - Utilise ThreadPoolExecutor pour créer et gérer un pool de threads
-- Soumet les tâches de conversion via submit() qui retourne des futures
-- Collecte les résultats au fur et à mesure avec as_completed()
+- Soumet les tâches de conversion par paquets d'images via submit() : un futur par
+  paquet (et non par image), moins d'objets et de travail sous GIL dans le thread principal
+- Collecte les résultats dans l'ordre de soumission (sans as_completed : les
+  résultats ne sont utilisés qu'une fois tous les paquets terminés)
+- Contre-pression : au plus 4 * max_workers paquets en vol, la mémoire ne croît
+  pas avec le nombre d'images
 - Démontre la synchronisation avec Lock et Semaphore
+- Lecture anticipée optionnelle (prefetch) : un petit pool d'E/S lit les fichiers,
+  le pool de calcul ne fait que décoder, convertir et écrire
+- Pools partagés au niveau du module (reuse_pool) : threads créés une seule fois
+  pour des appels répétés, arrêtés à la sortie du programme
+- Backend optionnel en processus (backend="process") pour la conversion CPU-bound :
+  délègue à la version ProcessPoolExecutor (pas de GIL)
 - Mesure les performances et métriques de synchronisation
 """
-from concurrent.futures import ThreadPoolExecutor, as_completed  # Import de ThreadPoolExecutor et as_completed pour gérer les futures
-from typing import List, Dict  # Types pour les annotations de type
+from concurrent.futures import ThreadPoolExecutor, Future  # Import de ThreadPoolExecutor pour gérer le pool de threads (et Future pour une soumission en échec)
+import threading  # Module pour l'identifiant mis en cache par thread du pool (threading.local)
+import atexit  # Arrêt des pools partagés à la sortie du programme
+from collections import deque  # Fenêtre des futures en vol (contre-pression de la soumission)
+from contextlib import nullcontext  # Contexte neutre pour un executor fourni par l'appelant (pas de shutdown)
+from typing import List, Dict, Optional  # Types pour les annotations de type
 from ..processor import convert_to_grayscale, set_global_logger  # Import de la fonction de conversion et du setter de logger
-from ..common import Timer  # Import de la classe Timer pour mesurer le temps
+from ..common import gil_enabled, default_workers, pinning_kwargs  # Import de la détection du GIL, du nombre de workers par défaut et des arguments d'épinglage
 import os  # Module pour les opérations sur le système de fichiers
-from ..synchronization_tools import ThreadSafeFileLogger, SemaphoreFileLogger  # Import des outils de synchronisation pour threads
+import time  # Mesure du temps total (perf_counter_ns)
+from ..synchronization_tools import ThreadSafeFileLogger, SemaphoreFileLogger, AsyncFileLogger, ShardedFileLogger, AppendFileLogger  # Import des outils de synchronisation pour threads
+
+_FREE_THREADED = not gil_enabled()  # CPython free-threaded (3.13t+) lancé sans GIL : les threads convertissent en parallèle
+_local = threading.local()  # Identifiant de chaque thread du pool, calculé à sa première tâche
+_POOLS: Dict[int, ThreadPoolExecutor] = {}  # Pools partagés {nombre de threads: pool} (reuse_pool=True)
+_POOLS_LOCK = threading.Lock()  # Protège la création des pools partagés (appels concurrents, CPython free-threaded)
+
+
+def shared_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Retourne le pool de threads partagé de cette taille, créé au premier appel.
+    
+    Créer et arrêter un pool à chaque appel coûte un clone + une pile par
+    thread ; un appelant qui traite des images de manière répétée (lots,
+    tests) réutilise ainsi les mêmes threads. Les pools sont arrêtés à la
+    sortie du programme (atexit).
+    """
+    with _POOLS_LOCK:  # Un seul pool par taille, même si deux threads appellent en même temps
+        ex = _POOLS.get(max_workers)  # Pool déjà créé pour cette taille
+        if ex is None:  # Premier appel pour cette taille
+            ex = _POOLS[max_workers] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="img")  # Threads nommés img_<n>
+        return ex  # Retourne le pool partagé
+
+
+@atexit.register
+def _shutdown_pools():
+    """Arrête les pools partagés (à la sortie du programme)"""
+    with _POOLS_LOCK:  # Copie puis vide le cache
+        pools = list(_POOLS.values())  # Pools créés
+        _POOLS.clear()  # Plus de pool partagé
+    for ex in pools:  # Arrête chaque pool
+        ex.shutdown()  # Attend la fin des tâches en cours
+
+
+def _thread_id() -> str:
+    """
+    Retourne l'identifiant du thread courant du pool ("T0", "T1", ...), mis en cache par thread.
+    
+    ThreadPoolExecutor nomme ses threads "<préfixe>_<n>" : l'identifiant est
+    celui du thread qui exécute réellement la tâche, calculé une fois par
+    thread (threading.local, sans verrou même sous CPython free-threaded).
+    """
+    tid = getattr(_local, "tid", None)  # Identifiant déjà calculé pour ce thread
+    if tid is None:  # Première tâche de ce thread
+        tid = _local.tid = "T" + threading.current_thread().name.rpartition("_")[2]  # Numéro du thread dans le pool
+    return tid  # Retourne l'identifiant
+
+
+def _convert_chunk(paths: List[str], output_dir: str, use_lock: bool, blobs: List[Optional[bytes]] = None) -> List[Dict]:
+    """Convertit un paquet d'images dans un thread du pool (une seule tâche pour tout le paquet ; blobs : contenus déjà lus)"""
+    tid = _thread_id()  # Identifiant du thread qui exécute le paquet
+    if blobs is None:  # Pas de lecture anticipée : chaque image est lue par ce thread
+        return [convert_to_grayscale(p, output_dir, thread_id=tid, use_lock=use_lock) for p in paths]  # Résultats du paquet, dans l'ordre
+    return [convert_to_grayscale(p, output_dir, thread_id=tid, use_lock=use_lock, data=b) for p, b in zip(paths, blobs)]  # Décodage depuis la mémoire
+
+
+def _read_chunk(paths: List[str]) -> List[Optional[bytes]]:
+    """Lit le contenu des images d'un paquet (thread d'E/S) ; None pour un fichier illisible"""
+    blobs = []  # Contenus lus, dans l'ordre du paquet
+    for p in paths:  # Parcourt les images du paquet
+        try:  # Un fichier peut avoir disparu ou être illisible
+            with open(p, 'rb') as f:  # Ouvre l'image en lecture binaire
+                blobs.append(f.read())  # Lit tout le fichier
+        except OSError:  # Lecture impossible
+            blobs.append(None)  # convert_to_grayscale relira le chemin et rapportera l'erreur
+    return blobs  # Retourne les contenus du paquet
+
+
+def _submit_prefetched(ex, chunks: List[List[str]], output_dir: str, use_lock: bool, io_threads: int, window: int) -> list:
+    """
+    Lit les paquets dans un petit pool d'E/S et enchaîne leur conversion dans le pool ex.
+    
+    La conversion d'un paquet est soumise (add_done_callback) dès que sa lecture
+    est terminée : les threads de calcul n'attendent plus le disque. Au plus
+    window paquets lus mais pas encore convertis sont gardés en mémoire
+    (Semaphore). Retourne les futures des conversions, dans l'ordre des paquets.
+    """
+    sem = threading.Semaphore(window)  # Paquets en vol (lus ou en lecture, pas encore convertis)
+    futures = [None] * len(chunks)  # Futures des conversions (remplis par les callbacks)
+    
+    def chain(k: int, paths: List[str]):  # Callback de fin de lecture du paquet k
+        def done(rf):  # Exécuté par le thread d'E/S qui a lu le paquet
+            blobs = None if rf.exception() is not None else rf.result()  # Contenus lus (None : lecture par le thread de calcul)
+            try:  # concurrent.futures ne fait que journaliser une exception levée dans un callback
+                cf = ex.submit(_convert_chunk, paths, output_dir, use_lock, blobs)  # Conversion du paquet dans le pool de calcul
+            except Exception as e:  # Pool de calcul arrêté (ou soumission refusée)
+                cf = Future()  # Future en échec : l'erreur est relevée à la collecte des résultats
+                cf.set_exception(e)  # Erreur de la soumission
+            cf.add_done_callback(lambda _: sem.release())  # Libère une place dans la fenêtre (immédiatement pour un future en échec)
+            futures[k] = cf  # Future de la conversion
+        return done  # Retourne le callback
+    
+    with ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="io") as io_pool:  # Pool d'E/S (arrêté à la sortie : tous les callbacks ont été exécutés)
+        for k, paths in enumerate(chunks):  # Parcourt les paquets
+            sem.acquire()  # Attend une place dans la fenêtre (borne la mémoire)
+            io_pool.submit(_read_chunk, paths).add_done_callback(chain(k, paths))  # Lecture puis conversion
+    return futures  # Futures des conversions, dans l'ordre des paquets
+
+
+def _submit_bounded(ex, image_paths: List[str], chunksize: int, output_dir: str, use_lock: bool, results: List[Dict], window: int) -> deque:
+    """
+    Soumet les paquets au pool ex avec au plus window futures en vol.
+    
+    Les paquets sont découpés au fil de la soumission (pas de liste de tous les
+    paquets ni de tous les futures) : quand la fenêtre est pleine, le plus ancien
+    future est attendu et ses résultats ajoutés à results, ce qui garde l'ordre
+    des images. La mémoire reste en O(window) quel que soit le nombre d'images.
+    Retourne les futures encore en vol, dans l'ordre des paquets.
+    """
+    pending = deque()  # Futures en vol, du plus ancien au plus récent
+    for k in range(0, len(image_paths), chunksize):  # Parcourt les débuts de paquets (paquet créé à la demande)
+        if len(pending) >= window:  # Fenêtre pleine : contre-pression
+            results.extend(pending.popleft().result())  # Attend le plus ancien paquet et garde ses résultats
+        pending.append(ex.submit(  # Soumet une tâche au pool et retourne un future
+            _convert_chunk,  # Fonction à exécuter (boucle sur le paquet dans le thread du pool)
+            image_paths[k:k + chunksize],  # Chemins des images du paquet
+            output_dir,  # Dossier de sortie (l'identifiant de thread est calculé par le worker)
+            use_lock  # Indique si on doit utiliser le lock
+        ))
+    return pending  # Futures restants, dans l'ordre des paquets
 
 
 # Traite les images en parallèle en utilisant ThreadPoolExecutor (threads)
 def process_threadpool(
     image_paths: List[str],  # Liste des chemins vers les images à traiter
     output_dir: str,  # Dossier où sauvegarder les images converties
-    max_workers: int = None,  # Nombre maximum de threads (None = valeur par défaut)
+    max_workers: int = None,  # Nombre maximum de threads (None = IMG_MAX_WORKERS, sinon selon les cœurs et le nombre d'images)
     use_lock: bool = True,  # Si True, utilise un Lock pour protéger les zones critiques
     use_semaphore: bool = False,  # Si True, utilise un Semaphore pour limiter l'accès au log
-    max_concurrent_log: int = 2  # Nombre maximum de threads pouvant écrire simultanément dans le log
+    max_concurrent_log: int = None,  # Nombre maximum de threads pouvant écrire simultanément dans le log (None = max(2, cœurs // 2))
+    async_log: bool = False,  # Si True (avec use_lock), utilise le logger asynchrone au lieu du Lock
+    sharded_log: bool = False,  # Si True (avec use_lock), utilise des tampons de log par thread fusionnés à la fin
+    append_log: bool = False,  # Si True (avec use_lock), écrit le log sans verrou (ajout atomique O_APPEND)
+    executor: ThreadPoolExecutor = None,  # Pool de threads existant à réutiliser (None = crée un pool pour cet appel)
+    reuse_pool: bool = False,  # Si True (sans executor), utilise le pool partagé du module pour cette taille
+    pin: bool = False,  # Si True, chaque thread du nouveau pool est épinglé sur un cœur
+    prefetch: int = 0,  # Nombre de threads d'E/S qui lisent les fichiers à l'avance (0 = lecture par les threads de calcul)
+    backend: str = "thread",  # "thread" (ThreadPoolExecutor) ou "process" (ProcessPoolExecutor, sans GIL)
+    chunksize: int = None  # Nombre d'images par tâche soumise (None = len(image_paths) // (4 * max_workers))
 ) -> Dict:  # Retourne un dictionnaire avec les statistiques et métriques
     """
     Traite les images en parallèle avec ThreadPoolExecutor.
@@ -48,49 +191,100 @@ def process_threadpool(
     Args:
         image_paths: Liste des chemins vers les images
         output_dir: Dossier de sortie
-        max_workers: Nombre maximum de threads
+        max_workers: Nombre maximum de threads (None : variable d'environnement IMG_MAX_WORKERS si
+            définie ; sinon un par cœur autorisé sous CPython free-threaded, où les threads calculent
+            en parallèle, ou cœurs + 4 avec GIL ; borné par 32 et par le nombre d'images)
         use_lock: Si True, utilise un Lock pour protéger les zones critiques
         use_semaphore: Si True, utilise un Semaphore pour limiter l'accès au log
         max_concurrent_log: Nombre maximum de threads pouvant écrire simultanément
+            (None = moitié des cœurs autorisés, au moins 2 ; voir SemaphoreFileLogger.suggest_permits)
+        async_log: Si True (avec use_lock), les messages passent par une file vidée par un thread écrivain
+        sharded_log: Si True (avec use_lock), chaque thread tamponne son log, fusionné dans le fichier à la fin
+        append_log: Si True (avec use_lock), chaque message est écrit par un seul os.write en O_APPEND, sans verrou
+        executor: Pool de threads existant (réutilisé entre expériences, pas arrêté à la fin)
+        reuse_pool: Si True et sans executor, le pool est celui de shared_executor(max_workers) :
+            créé au premier appel, réutilisé par les appels suivants, arrêté à la sortie du programme
+        pin: Si True, le thread N du pool créé pour cet appel est épinglé sur le N-ième cœur
+            autorisé (os.sched_setaffinity, Linux) ; sans effet sur un executor fourni ou partagé
+        prefetch: Si > 0, prefetch threads d'E/S lisent les paquets d'images et la conversion de
+            chaque paquet est soumise au pool dès sa lecture terminée ; au plus 2 * max_workers
+            paquets lus attendent leur conversion (mémoire bornée). Threads uniquement
+        backend: "thread" (défaut) ou "process" : la conversion, limitée par le CPU, est alors
+            confiée à process_processpool (ProcessPoolExecutor, log protégé par un Lock
+            multiprocessing ; executor est alors un ProcessPoolExecutor). Le sémaphore, le
+            logger asynchrone et le log O_APPEND n'existent qu'avec des threads
+        chunksize: Nombre d'images par tâche (None = environ 4 paquets par thread, comme
+            process_processpool) ; ThreadPoolExecutor.map ignore chunksize, les paquets sont
+            donc soumis explicitement, un futur par paquet, avec au plus 4 * max_workers
+            paquets en vol (le plus ancien est attendu avant d'en soumettre un autre)
     
     Returns:
         Dictionnaire avec les statistiques et métriques de synchronisation
     """
+    if backend == "process":  # Conversion dans des processus (pas de GIL)
+        if use_semaphore or async_log or append_log:  # Loggers propres aux threads
+            raise ValueError("backend=\"process\" : seuls le Lock et les logs par processus (sharded_log) sont disponibles")  # Combinaison non prise en charge
+        from . import processpool_executor  # Version ProcessPoolExecutor (importée à la demande)
+        return processpool_executor.process_processpool(  # Même format de résultats
+            image_paths, output_dir, max_workers=max_workers, use_lock=use_lock,  # Mêmes paramètres
+            executor=executor, chunksize=chunksize, sharded_log=sharded_log  # Pool partagé éventuel, paquets et logs par processus
+        )
+    if backend != "thread":  # Backend inconnu
+        raise ValueError(f"Backend inconnu : {backend!r} (\"thread\" ou \"process\")")  # Erreur explicite
+    if max_workers is None:  # Nombre de threads non spécifié
+        # Sans GIL, un thread par cœur suffit (pas de pickle ni de processus) ; avec GIL,
+        # quelques threads de plus recouvrent les E/S (valeur par défaut de la bibliothèque standard).
+        # use_lock reste nécessaire sans GIL : les compteurs Python des loggers ne sont plus
+        # protégés implicitement par le GIL.
+        # Jamais plus de threads que d'images (threads inutiles à démarrer) ni que 32.
+        max_workers = int(os.environ.get("IMG_MAX_WORKERS", 0)) or min(  # Valeur imposée par l'environnement, sinon calculée
+            32, default_workers() if _FREE_THREADED else default_workers() + 4, max(1, len(image_paths))  # Nombre de threads effectif
+        )
+    if chunksize is None:  # Taille des paquets non spécifiée
+        chunksize = max(1, len(image_paths) // (4 * max_workers))  # Environ 4 paquets par thread (équilibre charge / nombre de futurs)
+    if reuse_pool and executor is None:  # Pool partagé du module demandé
+        executor = shared_executor(max_workers)  # Threads déjà démarrés par un appel précédent (ou créés maintenant)
+    
     # Créer le logger selon le type de synchronisation
     log_file = os.path.join(output_dir, "processing.log")  # Construit le chemin du fichier de log
     
     if use_semaphore:  # Si on doit utiliser un sémaphore
         logger = SemaphoreFileLogger(log_file, max_concurrent_log)  # Crée un logger avec sémaphore (limite l'accès concurrent)
     elif use_lock:  # Si on doit utiliser un lock
-        logger = ThreadSafeFileLogger(log_file)  # Crée un logger thread-safe avec lock
+        if sharded_log:  # Tampons de log par thread
+            logger = ShardedFileLogger(log_file)  # Crée un logger à tampons par thread
+        elif append_log:  # Ajout atomique du noyau, sans verrou
+            logger = AppendFileLogger(log_file)  # Crée un logger O_APPEND sans verrou
+        elif async_log:  # File + thread écrivain
+            logger = AsyncFileLogger(log_file)  # Crée un logger asynchrone
+        else:  # Verrou classique
+            logger = ThreadSafeFileLogger(log_file)  # Crée un logger thread-safe avec lock
     else:  # Si on ne veut pas de protection
         logger = type('Logger', (), {'log_file': log_file})()  # Crée un objet logger minimal sans protection
     
     set_global_logger(logger)  # Définit le logger global pour toutes les conversions
+    log_protected = use_lock or use_semaphore  # Les conversions passent par le logger (Lock ou Semaphore) ; sinon écriture directe non protégée
     
-    timer = Timer()  # Crée un chronomètre pour mesurer le temps total
-    timer.start()  # Démarre le chronomètre
+    t0 = time.perf_counter_ns()  # Temps de début en nanosecondes (sans objet chronomètre)
     results = []  # Liste pour stocker les résultats
     
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:  # Crée un pool de threads (gestion automatique)
-        # Soumettre toutes les tâches
-        futures = {  # Crée un dictionnaire {future: chemin_image} pour suivre les tâches
-            ex.submit(  # Soumet une tâche au pool et retourne un future
-                convert_to_grayscale,  # Fonction à exécuter
-                p,  # Chemin de l'image
-                output_dir,  # Dossier de sortie
-                thread_id=f"T{i % (max_workers or 4)}",  # Génère un identifiant de thread
-                use_lock=use_lock  # Indique si on doit utiliser le lock
-            ): p  # Clé du dictionnaire : chemin de l'image
-            for i, p in enumerate(image_paths)  # Parcourt toutes les images avec leur index
-        }
+    pool = nullcontext(executor) if executor is not None else ThreadPoolExecutor(max_workers=max_workers, **pinning_kwargs(pin))  # Pool fourni ou nouveau pool (épinglé si pin)
+    with pool as ex:  # Utilise le pool de threads (un nouveau pool est arrêté à la sortie du bloc)
+        # Soumettre les paquets d'images (un futur par paquet)
+        if prefetch:  # Lecture dans un pool d'E/S, conversion enchaînée dans le pool de calcul
+            chunks = [image_paths[k:k + chunksize] for k in range(0, len(image_paths), chunksize)]  # Paquets d'images
+            futures = _submit_prefetched(ex, chunks, output_dir, log_protected, prefetch, 2 * max_workers)  # Futures des conversions
+        else:  # Chaque thread de calcul lit ses images
+            futures = _submit_bounded(ex, image_paths, chunksize, output_dir, log_protected, results, 4 * max_workers)  # Paquets restants en vol
         
-        # Collecter les résultats au fur et à mesure
-        for fut in as_completed(futures):  # Parcourt les futures au fur et à mesure de leur complétion
-            res = fut.result()  # Récupère le résultat du future (bloque si pas encore prêt)
-            results.append(res)  # Ajoute le résultat à la liste
+        # Collecter les résultats dans l'ordre des images (pas de réveil par future terminée)
+        for fut in futures:  # Parcourt les futures dans l'ordre de soumission
+            results.extend(fut.result())  # Ajoute les résultats du paquet (bloque si pas encore prêt)
+    
+    if isinstance(logger, (ThreadSafeFileLogger, SemaphoreFileLogger, AsyncFileLogger, ShardedFileLogger, AppendFileLogger)):  # Loggers à fermer : messages en attente (tampon, file, shards) ou descripteur ouvert
+        logger.close()  # Attend leur écriture (comptée dans le temps total)
     
-    total = timer.stop()  # Arrête le chronomètre et récupère le temps total
+    total = (time.perf_counter_ns() - t0) * 1e-9  # Temps total en secondes
     
     # Récupérer les métriques de synchronisation
     logger_metrics = {}  # Initialise le dictionnaire de métriques du logger
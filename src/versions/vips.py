@@ -0,0 +1,71 @@
+# src/versions/vips.py
+"""
+Version libvips (optionnelle) - décodage, conversion et encodage en flux avec pyvips.
+
+Ce module implémente la conversion en niveaux de gris avec libvips. Contrairement
+à Pillow, qui décode l'image complète en mémoire avant de la convertir puis de
+l'encoder, libvips construit un pipeline paresseux : l'image est lue, convertie
+et écrite bande par bande, sans jamais matérialiser l'image entière.
+
+Rôle détaillé :
+- Ouvre chaque image en accès séquentiel (access='sequential')
+- Convertit en niveaux de gris avec colourspace('b-w')
+- Écrit le résultat : décodage, calcul et encodage se recouvrent bande par bande
+- libvips répartit lui-même les bandes sur ses threads internes (variable
+  d'environnement VIPS_CONCURRENCY) ; la boucle Python reste séquentielle
+- Aucune synchronisation entre threads Python nécessaire
+
+Nécessite pyvips et la bibliothèque libvips ; AVAILABLE vaut False sinon.
+"""
+from typing import List, Dict  # Types pour les annotations de type
+import os  # Module pour la manipulation de chemins en chaînes (os.path)
+import time  # Module pour les horodatages par image (perf_counter_ns)
+from ..common import Timer  # Import de la classe Timer pour mesurer le temps
+
+try:  # pyvips est optionnel
+    import pyvips  # Binding Python de libvips
+except (ImportError, OSError):  # pyvips absent, ou libvips introuvable au chargement
+    pyvips = None  # Pas de libvips
+
+AVAILABLE = pyvips is not None  # Indique si la version libvips est utilisable
+
+
+# Traite les images avec le pipeline en flux de libvips
+def process_vips(image_paths: List[str], output_dir: str, suffix: str = "_gray") -> Dict:
+    """
+    Traite les images avec libvips (décodage -> niveaux de gris -> encodage en flux).
+
+    Args:
+        image_paths: Liste des chemins vers les images
+        output_dir: Dossier de sortie
+        suffix: Suffixe à ajouter au nom de fichier
+
+    Returns:
+        Dictionnaire avec les statistiques de traitement (même format que les autres versions)
+    """
+    if not AVAILABLE:  # Vérifie que pyvips est installé
+        raise RuntimeError("La version libvips nécessite pyvips (et la bibliothèque libvips)")  # Lève une erreur si pyvips manque
+
+    timer = Timer()  # Crée un chronomètre pour mesurer le temps total
+    runs = []  # Liste des résultats individuels
+    timer.start()  # Démarre le chronomètre
+
+    for p in image_paths:  # Parcourt chaque image dans la liste
+        base, ext = os.path.splitext(os.path.basename(p))  # Nom de base et extension de l'image source
+        out_path = os.path.join(output_dir, base + suffix + ext)  # Construit le chemin complet de sortie
+        t0 = time.perf_counter_ns()  # Horodatage de début (pas d'objet Timer alloué par image)
+        try:  # Le pipeline n'est exécuté qu'à l'écriture
+            img = pyvips.Image.new_from_file(p, access="sequential")  # Ouvre l'image en lecture séquentielle (rien n'est décodé ici)
+            img.colourspace("b-w").write_to_file(out_path)  # Convertit en niveaux de gris et écrit en flux
+            elapsed = (time.perf_counter_ns() - t0) / 1e9  # Temps écoulé en secondes
+            runs.append({"image": p, "elapsed": elapsed, "success": True, "processing_time": elapsed})  # Même format que la version mono
+        except pyvips.Error as e:  # Image illisible ou écriture impossible
+            runs.append({"image": p, "elapsed": (time.perf_counter_ns() - t0) / 1e9, "success": False, "error": str(e)})  # Résultat d'erreur pour cette image
+
+    total = timer.stop()  # Arrête le chronomètre et récupère le temps total
+    return {  # Retourne un dictionnaire avec toutes les statistiques
+        "total_time": total,  # Temps total de traitement
+        "n_images": len(image_paths),  # Nombre d'images traitées
+        "runs": runs,  # Liste de tous les résultats individuels
+        "sync_metrics": {}  # Pas de métriques de synchronisation (un seul thread Python)
+    }
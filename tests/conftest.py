@@ -0,0 +1,22 @@
+# tests/conftest.py
+"""Fixtures partagées des tests"""
+import pytest  # Cadre de test (fixtures)
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Retourne make(n) : crée n petites images RGB (tmp_path/src) et le dossier de sortie (tmp_path/out)"""
+    from PIL import Image  # Import différé : les tests sans images ne dépendent pas de Pillow
+
+    def make(n, size=(4, 4)):
+        src = tmp_path / "src"
+        out = tmp_path / "out"
+        src.mkdir()
+        out.mkdir()
+        paths = []
+        for i in range(n):
+            p = str(src / f"img{i}.png")
+            Image.new("RGB", size, (i, i, i)).save(p)
+            paths.append(p)
+        return paths, str(out)
+    return make
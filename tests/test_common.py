@@ -0,0 +1,67 @@
+# tests/test_common.py
+"""Tests des utilitaires communs (src/common.py)."""
+import os  # Module pour la manipulation des fichiers de test
+
+from src.common import Timer, list_images, list_images_largest_first, default_workers  # Fonctions et classes testées
+
+
+def test_timer_stats_sans_mesure():
+    """stats() retourne des zéros tant qu'aucune mesure n'a été enregistrée"""
+    assert Timer().stats() == (0.0, 0.0, 0.0, 0.0)
+
+
+def test_timer_stats_sur_les_ticks():
+    """stats() calcule moyenne, écart-type, minimum et maximum en secondes depuis les ticks en ns"""
+    t = Timer()
+    t.ticks.extend([1_000_000, 3_000_000])  # 1 ms et 3 ms
+    mean, std, lo, hi = t.stats()
+    assert abs(mean - 0.002) < 1e-12
+    assert abs(std - 0.001) < 1e-12
+    assert (lo, hi) == (0.001, 0.003)
+
+
+def test_timer_stop_enregistre_un_tick():
+    """stop() ajoute la mesure à l'historique et exige un start() préalable"""
+    t = Timer()
+    t.start()
+    elapsed = t.stop()
+    assert len(t.ticks) == 1 and elapsed == t.ticks[0] * 1e-9
+    try:
+        t.stop()
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("stop() sans start() doit lever RuntimeError")
+
+
+def test_list_images_trie_et_filtre(tmp_path):
+    """list_images ne garde que les fichiers images (extension insensible à la casse), triés"""
+    for name in ("b.PNG", "a.jpg", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "dossier.png").mkdir()  # Un dossier nommé comme une image est ignoré
+    assert list_images(str(tmp_path)) == [str(tmp_path / "a.jpg"), str(tmp_path / "b.PNG")]
+
+
+def test_list_images_voit_les_ajouts_immediats(tmp_path):
+    """Un fichier ajouté juste après un premier appel apparaît au suivant (pas de cache par date du dossier)"""
+    (tmp_path / "a.jpg").write_bytes(b"")
+    assert len(list_images(str(tmp_path))) == 1
+    (tmp_path / "b.jpg").write_bytes(b"")
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns))  # Même date de modification du dossier
+    assert len(list_images(str(tmp_path))) == 2
+
+
+def test_default_workers_suit_l_affinite():
+    """default_workers() compte les cœurs autorisés (os.sched_getaffinity) quand il est disponible"""
+    n = default_workers()
+    assert n >= 1
+    if hasattr(os, "sched_getaffinity"):
+        assert n == len(os.sched_getaffinity(0))
+
+
+def test_list_images_largest_first(tmp_path):
+    """Les images sont listées par taille décroissante, à taille égale par chemin"""
+    for name, size in [("a.png", 10), ("b.jpg", 300), ("c.png", 10), ("d.bmp", 50), ("notes.txt", 999)]:
+        (tmp_path / name).write_bytes(b"x" * size)
+    names = [os.path.basename(p) for p in list_images_largest_first(str(tmp_path))]
+    assert names == ["b.jpg", "d.bmp", "a.png", "c.png"]
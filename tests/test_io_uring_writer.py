@@ -0,0 +1,18 @@
+# tests/test_io_uring_writer.py
+"""Tests de l'écrivain par lots (src/io_uring_writer.py)."""
+from src import io_uring_writer  # Module testé
+
+
+def test_erreurs_d_ecriture_par_chemin(tmp_path):
+    """Une écriture en échec ne lève pas d'exception : flush() la retourne pour son chemin seulement"""
+    writer = io_uring_writer.BatchedFileWriter(batch_size=2)
+    good = str(tmp_path / "a.png")
+    bad = str(tmp_path / "absent" / "b.png")  # Dossier inexistant : l'ouverture échoue
+    last = str(tmp_path / "c.png")
+    writer.enqueue(good, b"aa")
+    writer.enqueue(bad, b"bb")  # Lot plein : soumis ici, sans exception
+    writer.enqueue(last, b"cc")
+    errors = writer.flush()
+    assert list(errors) == [bad] and "FileNotFoundError" in errors[bad]
+    assert open(good, "rb").read() == b"aa" and open(last, "rb").read() == b"cc"
+    assert writer.flush() == {}  # Erreurs remises à zéro
@@ -0,0 +1,47 @@
+# tests/test_kernels.py
+"""Tests des noyaux Numba (src/kernels.py), ignorés si Numba n'est pas installé."""
+import os  # Module pour le dossier racine du dépôt
+import subprocess  # Exécution du noyau parallèle dans un interpréteur séparé
+import sys  # Chemin de l'interpréteur courant
+
+import pytest  # Cadre de test (skip conditionnel)
+
+from src import kernels  # Module testé
+
+pytestmark = pytest.mark.skipif(not kernels.AVAILABLE, reason="Numba/NumPy non installés")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Racine du dépôt (contient src/)
+
+# Le premier appel de rgb_to_gray_batch démarre le pool de threads de Numba, qui
+# ne survit pas à un fork : le calcul est fait dans un interpréteur séparé pour
+# ne pas bloquer les tests suivants qui forkent (loggers entre processus).
+_CHECK_BATCH = """
+import numpy as np
+from src import kernels
+rng = np.random.default_rng(0)
+images = [rng.integers(0, 256, size=shape, dtype=np.uint8) for shape in ((5, 7, 3), (1, 1, 3), (16, 3, 3))]
+n_pixels = np.array([im.shape[0] * im.shape[1] for im in images], dtype=np.int64)
+offsets = np.zeros(len(images), dtype=np.int64)
+np.cumsum(n_pixels[:-1], out=offsets[1:])
+out_flat = np.empty(int(n_pixels.sum()), dtype=np.uint8)
+kernels.rgb_to_gray_batch(np.concatenate([im.reshape(-1) for im in images]), offsets, n_pixels, out_flat)
+for im, off, n in zip(images, offsets, n_pixels):
+    expected = np.empty(im.shape[:2], dtype=np.uint8)
+    kernels.rgb_to_gray(im, expected)
+    assert (out_flat[off:off + n].reshape(im.shape[:2]) == expected).all()
+"""
+
+
+def test_rgb_to_gray_batch_identique_au_noyau_par_image():
+    """Le noyau par lots donne, pour des images de tailles différentes, le même résultat que rgb_to_gray"""
+    proc = subprocess.run([sys.executable, "-c", _CHECK_BATCH], cwd=_ROOT, capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_rgb_to_gray_luminance_virgule_fixe():
+    """rgb_to_gray applique Y = (77*R + 150*G + 29*B) >> 8"""
+    np = kernels.np
+    rgb = np.array([[[255, 255, 255], [255, 0, 0], [0, 255, 0], [0, 0, 255]]], dtype=np.uint8)
+    out = np.empty((1, 4), dtype=np.uint8)
+    kernels.rgb_to_gray(rgb, out)
+    assert out.tolist() == [[255, 76, 149, 28]]
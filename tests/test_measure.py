@@ -0,0 +1,65 @@
+# tests/test_measure.py
+"""Tests de la mesure des performances (src/measure.py)."""
+import os  # Module pour tester la présence de /proc
+
+import pytest  # Cadre de test (skip conditionnel)
+
+from src import measure  # Module testé
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/stat"), reason="/proc/self/stat n'existe que sous Linux")
+def test_read_usage_proc_coherent_avec_psutil():
+    """La lecture de /proc/self/stat donne le même temps CPU et la même mémoire que psutil"""
+    psutil = pytest.importorskip("psutil")
+    cpu, rss, vms = measure._read_usage()
+    p = psutil.Process()
+    t = p.cpu_times()
+    m = p.memory_info()
+    assert abs(cpu - (t.user + t.system + t.children_user + t.children_system)) < 0.1
+    assert abs(rss - m.rss) < 16 * 1024 * 1024  # Quelques pages d'écart possibles entre les deux lectures
+    assert vms == m.vms or abs(vms - m.vms) < 64 * 1024 * 1024
+
+
+def test_run_stats_temps_par_image():
+    """Moyenne, percentiles, maximum et échecs des temps par image, avec ou sans NumPy"""
+    runs = [{"processing_time": t, "success": t < 4} for t in (1.0, 2.0, 3.0, 4.0, 5.0)]
+    stats = measure._run_stats(runs)
+    assert stats["run_time_mean"] == 3.0 and stats["run_time_max"] == 5.0
+    assert stats["run_time_p50"] == 3.0 and stats["n_failed"] == 2
+    assert measure._run_stats([]) == {}
+
+
+def test_run_stats_workers_threading(images):
+    """Les résultats des workers threading (temps sous "elapsed") donnent des temps non nuls"""
+    from src.versions import threading_version
+    paths, out = images(4, size=(16, 16))
+    runs = threading_version.process_threading(paths, out, n_threads=2, use_lock=True)["runs"]
+    stats = measure._run_stats(runs)
+    assert stats["run_time_mean"] > 0 and stats["run_time_max"] > 0
+    assert stats["n_failed"] == 0
+
+
+def _burn_then_sleep(event):
+    """Calcule 0,3 s, signale la fin du calcul puis reste vivant (worker de pool jamais attendu)"""
+    import time
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < 0.3:
+        pass
+    event.set()
+    time.sleep(5)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/stat"), reason="/proc/self/stat n'existe que sous Linux")
+def test_read_usage_compte_les_enfants_vivants():
+    """Le temps CPU d'un enfant encore vivant (pas encore attendu) est compté"""
+    from src.common import MP_CONTEXT
+    before = measure._read_usage()[0]
+    event = MP_CONTEXT.Event()
+    child = MP_CONTEXT.Process(target=_burn_then_sleep, args=(event,))
+    child.start()
+    try:
+        assert event.wait(10)
+        assert measure._read_usage()[0] - before > 0.15
+    finally:
+        child.terminate()
+        child.join()
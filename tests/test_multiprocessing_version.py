@@ -0,0 +1,17 @@
+# tests/test_multiprocessing_version.py
+"""Tests de la version multiprocessing (src/versions/multiprocessing_version.py)."""
+import array  # Colonnes de temps au format renvoyé par les workers
+
+from src.versions.multiprocessing_version import _rows_from_batch  # Fonction testée
+
+
+def test_rows_from_batch_reconstruit_les_resultats():
+    """Les colonnes d'une tranche redonnent les dictionnaires de convert_to_grayscale (succès et erreur)"""
+    paths = ["a.jpg", "b.jpg", "c.jpg", "d.jpg"]
+    batch = (1, bytes([1, 0]), array.array("d", [0.5, 0.25]), bytes([1, 0]), ["out/b_gray.jpg", None], {1: "OSError: illisible"})
+    rows = _rows_from_batch(batch, paths, n_workers=2)
+    assert rows == [
+        {"success": True, "input": "b.jpg", "output": "out/b_gray.jpg", "processing_time": 0.5, "thread_id": "P1", "cached": True},
+        {"success": False, "input": "c.jpg", "output": None, "error": "OSError: illisible", "processing_time": 0.25, "thread_id": "P0"},
+    ]
+    assert list(rows[1]) == ["success", "input", "output", "error", "processing_time", "thread_id"]  # Même ordre des clés
@@ -0,0 +1,30 @@
+# tests/test_processor.py
+"""Tests de la conversion par lots (src/processor.py)"""
+import pytest  # Cadre de test (skip conditionnel)
+
+from src import processor  # Module testé
+
+pytest.importorskip("numpy")  # process_batch repose sur NumPy
+
+
+def test_process_batch_erreur_de_sauvegarde_isolee(tmp_path, images):
+    """Une sauvegarde impossible donne une erreur pour cette image seulement, les autres sont converties"""
+    paths, out_dir = images(3)
+    out = tmp_path / "out"
+    (out / "img1_gray.png").mkdir()  # Un dossier à la place de la sortie : la sauvegarde échoue
+    res = processor.process_batch(paths, out_dir, use_lock=False)
+    assert [r["input"] for r in res] == paths
+    assert [r["success"] for r in res] == [True, False, True]
+    assert res[1]["output"] is None and res[1]["error"]
+    assert res[0]["cached"] is False and (out / "img2_gray.png").is_file()
+
+
+def test_cle_du_cache_selon_le_draft_jpeg(monkeypatch):
+    """Le décodage JPEG draft (sortie différente) a sa propre clé de cache avec le backend Pillow"""
+    monkeypatch.setattr(processor, "_grayscale_backend", "pillow")
+    monkeypatch.setattr(processor, "_jpeg_draft", False)
+    plain = processor._cache_key("_gray")
+    monkeypatch.setattr(processor, "_jpeg_draft", True)
+    assert processor._cache_key("_gray") != plain
+    monkeypatch.setattr(processor, "_grayscale_backend", "numpy")
+    assert processor._cache_key("_gray") == "_gray_numpy"
@@ -0,0 +1,45 @@
+# tests/test_runner.py
+"""Tests de l'orchestration des expériences (src/runner.py)."""
+from src import runner  # Module testé
+from src.processor import set_global_logger  # Logger global partagé par les versions
+
+
+def test_should_bypass_pool():
+    """Le pool est contourné avec 1 worker ou moins de 4 images"""
+    assert runner._should_bypass_pool(1, 100)
+    assert runner._should_bypass_pool(4, 3)
+    assert not runner._should_bypass_pool(2, 4)
+
+
+def test_pool_or_sequential(tmp_path, images):
+    """La version séquentielle de remplacement écrit dans le log de sa propre expérience"""
+    def pool_version(image_paths, output_dir, **kwargs):
+        raise AssertionError("le pool ne doit pas être démarré")
+    assert runner._pool_or_sequential(pool_version, 1, 10, enabled=False) is pool_version
+    assert runner._pool_or_sequential(pool_version, 2, 10, enabled=True) is pool_version
+
+    paths, _ = images(3)
+    out_dir, other = tmp_path / "out", tmp_path / "other"
+    other.mkdir()
+    set_global_logger(type("Logger", (), {"log_file": str(other / "processing.log")})())  # Logger de l'expérience précédente
+    try:
+        res = runner._pool_or_sequential(pool_version, 2, len(paths), enabled=True)(paths, str(out_dir), n_workers=2)
+    finally:
+        set_global_logger(None)
+    assert res["pool_bypassed"] and all(r["success"] for r in res["runs"])
+    assert len((out_dir / "processing.log").read_text(encoding="utf-8").splitlines()) == 3
+    assert not (other / "processing.log").exists()
+
+
+def test_flushed_marque_les_ecritures_en_echec(tmp_path, monkeypatch):
+    """Les erreurs retournées par flush() marquent l'image concernée en échec, sans interrompre l'expérience"""
+    out = str(tmp_path)
+    class Writer:
+        def flush(self):
+            return {str(tmp_path / "b_gray.png"): "OSError: disque plein"}
+    monkeypatch.setattr(runner, "_writer", Writer())
+    def version(image_paths, output_dir, **kwargs):
+        return {"runs": [{"image": p, "success": True} for p in image_paths]}
+    res = runner._flushed(version)(["in/a.png", "in/b.png"], out)
+    assert [r["success"] for r in res["runs"]] == [True, False]
+    assert res["runs"][1]["error"] == "OSError: disque plein"
@@ -0,0 +1,362 @@
+# tests/test_synchronization_tools.py
+"""Tests des outils de synchronisation (src/synchronization_tools.py)."""
+import errno  # Codes d'erreur renvoyés par le faux anneau io_uring
+import mmap  # Tampons alignés du descripteur O_DIRECT simulé
+import os  # Module pour fork et la lecture des fichiers de log
+import threading  # Module pour les tests multi-threads
+from types import SimpleNamespace  # Anneau et entrées de complétion du faux binding
+
+import pytest  # Vérification des erreurs
+
+from src import synchronization_tools as st  # Module testé
+
+
+def _lines(path):
+    """Retourne les lignes du fichier de log"""
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def _run_threads(target, n=4):
+    """Exécute target(i) dans n threads et attend leur fin"""
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def _fork_and_wait(child):
+    """Exécute child() dans un processus fils (fork) et attend sa fin"""
+    pid = os.fork()
+    if pid == 0:  # Processus fils
+        try:
+            child()
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+
+def test_async_logger_ecrit_tous_les_messages(tmp_path):
+    """AsyncFileLogger écrit tous les messages déposés, dans l'ordre par thread, avant la fin de close()"""
+    log_file = str(tmp_path / "processing.log")
+    logger = st.AsyncFileLogger(log_file, batch=7)
+    _run_threads(lambda i: [logger.log(f"T{i} {k}") for k in range(100)])
+    logger.close()
+    lines = _lines(log_file)
+    assert len(lines) == 400
+    for i in range(4):
+        assert [l for l in lines if l.startswith(f"T{i} ")] == [f"T{i} {k}" for k in range(100)]
+    assert logger.get_metrics()["total_lock_wait_time"] == 0
+
+
+def test_sharded_logger_fusionne_threads_et_processus(tmp_path):
+    """ShardedFileLogger fusionne les tampons des threads et le shard d'un processus fils à la fermeture"""
+    log_file = str(tmp_path / "processing.log")
+    logger = st.ShardedFileLogger(log_file, flush_every=10)
+    _run_threads(lambda i: [logger.log(f"T{i} {k}") for k in range(25)])
+    _fork_and_wait(lambda: [logger.log(f"P {k}") for k in range(5)])
+    logger.close()
+    lines = _lines(log_file)
+    assert len(lines) == 105
+    assert [l for l in lines if l.startswith("P ")] == [f"P {k}" for k in range(5)]
+    assert not [p for p in os.listdir(tmp_path) if p != "processing.log"]  # Shards supprimés après fusion
+
+
+def test_async_logger_formatage_differe(tmp_path):
+    """log_deferred met en file le format et les valeurs ; le thread écrivain formate la ligne"""
+    log_file = str(tmp_path / "processing.log")
+    with st.AsyncFileLogger(log_file) as logger:
+        logger.log_deferred("{} -> {} ({:.2f}s)", "a.jpg", "a_gray.jpg", 0.5)
+        logger.log("message simple")
+    assert _lines(log_file) == ["a.jpg -> a_gray.jpg (0.50s)", "message simple"]
+
+
+def test_append_logger_lignes_entieres(tmp_path):
+    """AppendFileLogger : chaque ligne écrite par plusieurs threads et un processus fils arrive entière"""
+    log_file = str(tmp_path / "processing.log")
+    logger = st.AppendFileLogger(log_file, record_metrics=True)
+    line = "x" * 200
+    _run_threads(lambda i: [logger.log(f"T{i} {line}") for _ in range(200)])
+    _fork_and_wait(lambda: [logger.log(f"P {line}") for _ in range(50)])
+    logger.close()
+    lines = _lines(log_file)
+    assert len(lines) == 850
+    assert all(l.split(" ", 1)[1] == line for l in lines)
+    assert logger.get_metrics()["append_writes"] == 800  # Écritures du processus courant seulement
+
+
+def test_atomic_counter_sans_perte():
+    """AtomicCounter ne perd aucune incrémentation entre threads, même avec des lectures concurrentes"""
+    c = st.AtomicCounter(10)
+    def work(i):
+        if i == 0:  # Un thread lecteur
+            for _ in range(500):
+                c.get()
+        else:
+            for _ in range(10_000):
+                c.increment()
+    _run_threads(work, n=5)
+    assert c.get() == 40_010
+    assert c.get() == 40_010  # Une lecture ne modifie pas la valeur
+    assert c.increment() == 40_011
+
+
+def test_atomic_counter_increments_uniques():
+    """increment() retourne des valeurs toutes différentes, même avec des lectures concurrentes"""
+    c = st.AtomicCounter()
+    seen = [[] for _ in range(4)]
+    def work(i):
+        if i == 0:  # Un thread lecteur
+            for _ in range(500):
+                c.get()
+        else:
+            seen[i] = [c.increment() for _ in range(5_000)]
+    _run_threads(work, n=4)
+    values = [v for part in seen for v in part]
+    assert sorted(values) == list(range(1, 15_001))
+
+
+def test_atomic_counter_metriques_nulles():
+    """AtomicCounter ne prend aucun verrou à l'incrémentation : métriques nulles"""
+    c = st.AtomicCounter()
+    c.increment()
+    assert c.get_metrics()["lock_acquire_count"] == 0
+
+
+def test_unsafe_counter_sans_delai_par_defaut():
+    """UnsafeCounter sans demo_delay compte correctement dans un seul thread (aucune pause)"""
+    c = st.UnsafeCounter()
+    for _ in range(1000):
+        c.increment()
+    assert c.get() == 1000
+
+
+def test_wait_percentiles_echantillons_bornes():
+    """wait_percentiles calcule les percentiles sur les capacity premiers échantillons seulement"""
+    m = st.SynchronizationMetrics(capacity=101)
+    for k in range(101):
+        m.record_lock_wait(k / 100)
+    m.record_lock_wait(1000.0)  # Au-delà de la capacité : compté dans les agrégats seulement
+    assert len(m.lock_wait_samples()) == 101
+    p = m.wait_percentiles((50, 90))
+    assert abs(p["p50"] - 0.5) < 1e-9 and abs(p["p90"] - 0.9) < 1e-9
+    assert m.get_stats()["max_lock_wait_time"] == 1000.0
+
+
+def test_wait_percentiles_repli_sans_numpy(monkeypatch):
+    """Sans NumPy, le repli par tri donne les mêmes percentiles (rang le plus proche)"""
+    monkeypatch.setattr(st, "np", None)
+    m = st.SynchronizationMetrics(capacity=11)
+    for k in range(11):
+        m.record_semaphore_wait(float(k))
+    assert m.wait_percentiles((0, 50, 100), kind="semaphore") == {"p0": 0.0, "p50": 5.0, "p100": 10.0}
+    assert st.SynchronizationMetrics().wait_percentiles() == {}
+
+
+def test_process_safe_logger_metriques_partagees(tmp_path):
+    """Les attentes des processus fils sont cumulées dans les compteurs partagés du logger"""
+    log_file = str(tmp_path / "processing.log")
+    logger = st.ProcessSafeFileLogger(log_file)
+    logger.log("parent")
+    for _ in range(2):
+        _fork_and_wait(lambda: [logger.log("fils") for _ in range(10)])
+    logger.close()
+    assert len(_lines(log_file)) == 21
+    assert logger.get_metrics()["lock_acquire_count"] == 21
+    fresh = st.ProcessSafeFileLogger(log_file, counters=logger._counters)  # truncate=True : nouvelles métriques
+    assert fresh.get_metrics()["lock_acquire_count"] == 0
+
+
+def test_sharded_process_counter_additionne_les_processus():
+    """Chaque processus incrémente sa propre case ; get() additionne parent et fils"""
+    counter = st.ShardedProcessCounter(initial_value=5, max_processes=4)
+    for _ in range(10):
+        counter.increment()
+    for _ in range(2):
+        _fork_and_wait(lambda: [counter.increment() for _ in range(100)])
+    assert counter.get() == 5 + 10 + 200
+    assert counter.increment() == 11  # Compte du processus courant, pas le total
+    assert counter.get_metrics()["lock_acquire_count"] == 0
+
+
+def test_sharded_process_counter_trop_de_processus(tmp_path):
+    """Au-delà de max_processes, la réservation d'une case échoue explicitement"""
+    counter = st.ShardedProcessCounter(max_processes=1)
+    counter.increment()
+    marker = tmp_path / "erreur"
+
+    def child():
+        try:
+            counter.increment()
+        except RuntimeError:
+            marker.write_text("ok")
+
+    _fork_and_wait(child)
+    assert marker.exists()
+    assert counter.get() == 1
+
+
+class _FakeLiburing:
+    """
+    Faux binding liburing : chaque écriture soumise est exécutée à l'attente de sa
+    complétion ; policy(fd, data) donne cqe.res (octets à écrire réellement, ou -errno)
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.completions = []  # (fd, taille soumise, cqe.res) dans l'ordre des complétions
+
+    def io_uring(self):
+        return SimpleNamespace(pending=None)
+
+    def io_uring_queue_init(self, entries, ring, flags):
+        pass
+
+    def io_uring_queue_exit(self, ring):
+        pass
+
+    def io_uring_get_sqe(self, ring):
+        return ring
+
+    def io_uring_prep_write(self, sqe, fd, data, n, offset):
+        sqe.pending = (fd, bytes(data[:n]))
+
+    def io_uring_submit(self, ring):
+        pass
+
+    def io_uring_cqe(self):
+        return SimpleNamespace(res=None)
+
+    def io_uring_wait_cqe(self, ring, cqe):
+        fd, data = ring.pending
+        ring.pending = None
+        res = self.policy(fd, data)
+        if res > 0:
+            try:
+                os.write(fd, data[:res])
+            except OSError as e:  # Descripteur fermé : le noyau renverrait -errno
+                res = -e.errno
+        cqe.res = res
+        self.completions.append((fd, len(data), res))
+
+    def io_uring_cqe_seen(self, ring, cqe):
+        pass
+
+
+def test_async_logger_ecrit_par_blocs(tmp_path):
+    """Les messages sont accumulés et écrits par blocs d'au moins block octets"""
+    log_file = str(tmp_path / "processing.log")
+    logger = st.AsyncFileLogger(log_file, block=1024)
+    for k in range(200):
+        logger.log(f"message {k:04d} " + "x" * 16)  # 30 octets par ligne
+    logger.close()
+    assert _lines(log_file) == [f"message {k:04d} " + "x" * 16 for k in range(200)]
+    assert logger.get_metrics()["async_write_calls"] <= 200 * 30 // 1024 + 1
+
+
+def test_async_logger_uring_sans_binding(tmp_path, monkeypatch):
+    """Sans le binding liburing, use_uring=True (ou set_async_uring) retombe sur os.write"""
+    monkeypatch.setattr(st, "liburing", None)
+    monkeypatch.setattr(st, "_ASYNC_URING", False)
+    st.set_async_uring(True)
+    log_file = str(tmp_path / "processing.log")
+    logger = st.AsyncFileLogger(log_file)
+    for k in range(10):
+        logger.log(f"m{k}")
+    logger.close()
+    assert _lines(log_file) == [f"m{k}" for k in range(10)]
+    assert logger.get_metrics()["async_uring"] is False
+
+
+def test_async_logger_o_direct(tmp_path):
+    """direct=True : les parties alignées passent par O_DIRECT, la fin non alignée à la fermeture"""
+    log_file = str(tmp_path / "processing.log")
+    logger = st.AsyncFileLogger(log_file, block=8192, direct=True)
+    expected = [f"message {k:05d} " + "y" * 50 for k in range(1000)]  # 65 octets par ligne
+    for line in expected:
+        logger.log(line)
+    logger.close()
+    assert _lines(log_file) == expected
+    direct = logger.get_metrics()["async_direct_bytes"]
+    if direct:  # Système de fichiers acceptant O_DIRECT
+        assert direct % 4096 == 0 and direct > 1000 * 65 - 8192 - 4096
+
+
+def test_semaphore_logger_taux_de_blocage(tmp_path, monkeypatch):
+    """Le taux de blocage est mesuré et suggest_permits ajuste le nombre de permis"""
+    monkeypatch.setattr(st, "default_workers", lambda: 8)
+    logger = st.SemaphoreFileLogger(str(tmp_path / "processing.log"))
+    assert logger.max_concurrent == 4
+    for k in range(10):
+        logger.log(f"m{k}")
+    assert logger.get_metrics()["semaphore_block_ratio"] == 0.0
+    assert logger.suggest_permits() == 2
+    logger._metrics.contention_count = 5  # Moitié des acquisitions bloquées
+    assert logger.suggest_permits() == 8
+    logger.close()
+
+
+def test_thread_safe_logger_lignes_encodees(tmp_path):
+    """ThreadSafeFileLogger : lignes encodées hors du verrou, toutes écrites (y compris après close)"""
+    log_file = str(tmp_path / "processing.log")
+    logger = st.ThreadSafeFileLogger(log_file)
+    _run_threads(lambda i: [logger.log(f"T{i} é") for _ in range(100)])
+    logger.close()
+    logger.log("après")
+    lines = _lines(log_file)
+    assert len(lines) == 401 and lines[-1] == "après"
+    assert all(l.endswith(" é") for l in lines[:-1])
+    assert logger.get_metrics()["lock_acquire_count"] == 401
+
+
+def test_async_logger_uring_ecritures_partielles(tmp_path, monkeypatch):
+    """io_uring : une complétion partielle est terminée par os.write, les lignes restent dans l'ordre"""
+    fake = _FakeLiburing(lambda fd, data: max(1, len(data) // 2))  # Le noyau n'écrit que la moitié du bloc
+    monkeypatch.setattr(st, "liburing", fake)
+    log_file = str(tmp_path / "processing.log")
+    logger = st.AsyncFileLogger(log_file, block=256, use_uring=True, direct=False)
+    expected = [f"message {k:04d}" for k in range(300)]
+    for line in expected:
+        logger.log(line)
+    logger.close()
+    assert _lines(log_file) == expected
+    assert logger.get_metrics()["async_uring"] is True
+    assert any(0 < res < n for _, n, res in fake.completions)
+
+
+def test_async_logger_uring_erreur_du_noyau(tmp_path):
+    """io_uring : un cqe.res négatif lève OSError avec ce code (EINVAL hors O_DIRECT compris)"""
+    log_file = str(tmp_path / "processing.log")
+    logger = st.AsyncFileLogger(log_file, use_uring=False, direct=False)
+    for code in (errno.EIO, errno.EINVAL):
+        fake = _FakeLiburing(lambda fd, data: -code)
+        ring = fake.io_uring()
+        st.liburing, saved = fake, st.liburing
+        try:
+            logger._uring_write(ring, logger._fd, b"abc")
+            with pytest.raises(OSError) as exc:
+                logger._uring_reap(ring)
+        finally:
+            st.liburing = saved
+        assert exc.value.errno == code and logger._inflight is None
+    logger.close()
+
+
+def test_async_logger_uring_o_direct_refuse(tmp_path, monkeypatch):
+    """io_uring + O_DIRECT : -EINVAL sur un morceau fait réécrire tout le reste par le descripteur normal"""
+    log_file = str(tmp_path / "processing.log")
+    direct = {}
+    fake = _FakeLiburing(lambda fd, data: -errno.EINVAL if fd == direct.get("fd") else len(data))
+    monkeypatch.setattr(st, "liburing", fake)
+    logger = st.AsyncFileLogger(log_file, block=16384, use_uring=True, direct=False)
+    # Descripteur « O_DIRECT » simulé (le thread écrivain attend encore son premier message)
+    direct["fd"] = logger._dfd = os.open(log_file, os.O_WRONLY | os.O_APPEND)
+    logger._stages = (mmap.mmap(-1, 4096), mmap.mmap(-1, 4096))  # Plusieurs morceaux par bloc
+    logger._stage = 0
+    expected = [f"message {k:05d} " + "z" * 50 for k in range(1000)]
+    for line in expected:
+        logger.log(line)
+    logger.close()
+    assert _lines(log_file) == expected
+    assert logger._dfd is None and logger.get_metrics()["async_direct_bytes"] == 0
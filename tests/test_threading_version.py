@@ -0,0 +1,20 @@
+# tests/test_threading_version.py
+"""Tests des workers threading (cases de résultats préallouées)"""
+from src.versions import threading_version  # Module testé
+
+
+def test_local_results_dans_l_ordre_des_images(images):
+    """Avec local_results, chaque résultat est écrit dans la case de son image, sans fusion"""
+    paths, out = images(7)
+    res = threading_version.process_threading(paths, out, n_threads=3, use_lock=True, local_results=True)
+    assert [r["image"] for r in res["runs"]] == paths
+    assert [r["thread_id"] for r in res["runs"]] == [f"T{i % 3}" for i in range(7)]
+    assert all(r["success"] for r in res["runs"])
+
+
+def test_semaphore_utilise_par_les_conversions(images):
+    """use_semaphore (sans Lock) : chaque conversion écrit son log à travers le Semaphore"""
+    paths, out = images(5)
+    res = threading_version.process_threading(paths, out, n_threads=2, use_lock=False, use_semaphore=True)
+    assert res["logger_metrics"]["semaphore_acquire_count"] == 5
+    assert len(res["runs"]) == 5
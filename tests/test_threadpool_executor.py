@@ -0,0 +1,121 @@
+# tests/test_threadpool_executor.py
+"""Tests de la version ThreadPoolExecutor (choix du backend)"""
+import pytest  # Vérification des erreurs
+
+from src.versions import threadpool_executor  # Module testé
+
+
+def test_backend_process_delegue_au_pool_de_processus(images):
+    """backend="process" convertit les images dans un ProcessPoolExecutor"""
+    paths, out = images(4)
+    res = threadpool_executor.process_threadpool(paths, out, max_workers=2, backend="process")
+    assert [r["input"] for r in res["runs"]] == paths
+    assert all(r["success"] for r in res["runs"])
+    assert {r["thread_id"] for r in res["runs"]} <= {"P0", "P1"}
+
+
+def test_backend_invalide(images):
+    """Un backend inconnu ou un logger propre aux threads avec des processus est refusé"""
+    paths, out = images(1)
+    with pytest.raises(ValueError):
+        threadpool_executor.process_threadpool(paths, out, backend="gpu")
+    with pytest.raises(ValueError):
+        threadpool_executor.process_threadpool(paths, out, backend="process", async_log=True)
+
+
+def test_max_workers_par_defaut(images, monkeypatch):
+    """Sans max_workers : un thread par cœur sans GIL, cœurs + 4 avec GIL, borné par le nombre d'images"""
+    paths, out = images(8)
+    monkeypatch.delenv("IMG_MAX_WORKERS", raising=False)
+    monkeypatch.setattr(threadpool_executor, "default_workers", lambda: 3)
+    monkeypatch.setattr(threadpool_executor, "_FREE_THREADED", True)
+    assert threadpool_executor.process_threadpool(paths, out)["max_workers"] == 3
+    monkeypatch.setattr(threadpool_executor, "_FREE_THREADED", False)
+    assert threadpool_executor.process_threadpool(paths, out)["max_workers"] == 7
+    assert threadpool_executor.process_threadpool(paths[:2], out)["max_workers"] == 2
+
+
+def test_max_workers_variable_d_environnement(images, monkeypatch):
+    """IMG_MAX_WORKERS remplace la valeur calculée, max_workers explicite reste prioritaire"""
+    paths, out = images(2)
+    monkeypatch.setenv("IMG_MAX_WORKERS", "5")
+    assert threadpool_executor.process_threadpool(paths, out)["max_workers"] == 5
+    assert threadpool_executor.process_threadpool(paths, out, max_workers=1)["max_workers"] == 1
+
+
+def test_paquets_d_images(images):
+    """Les images sont soumises par paquets ; chaque image a un résultat, un paquet garde l'identifiant de son thread"""
+    paths, out = images(7)
+    res = threadpool_executor.process_threadpool(paths, out, max_workers=2, chunksize=3)
+    runs = res["runs"]
+    assert [r["input"] for r in runs] == paths  # Résultats dans l'ordre des images
+    assert all(r["success"] for r in runs)
+    for k in range(0, 7, 3):
+        assert len({r["thread_id"] for r in runs[k:k + 3]}) == 1
+    assert {r["thread_id"] for r in runs} <= {"T0", "T1"}
+
+def test_pool_partage_du_module(images):
+    """reuse_pool=True réutilise le même pool de threads d'un appel à l'autre"""
+    paths, out = images(4)
+    first = threadpool_executor.process_threadpool(paths, out, max_workers=2, reuse_pool=True)
+    pool = threadpool_executor.shared_executor(2)
+    second = threadpool_executor.process_threadpool(paths, out, max_workers=2, reuse_pool=True)
+    assert threadpool_executor.shared_executor(2) is pool
+    assert all(r["success"] for r in first["runs"] + second["runs"])
+    assert {r["thread_id"] for r in second["runs"]} <= {"T0", "T1"}
+
+
+def test_lecture_anticipee(images):
+    """prefetch lit les paquets dans un pool d'E/S ; résultats dans l'ordre, conversion par les threads de calcul"""
+    paths, out = images(7)
+    res = threadpool_executor.process_threadpool(paths, out, max_workers=2, chunksize=2, prefetch=2)
+    runs = res["runs"]
+    assert [r["input"] for r in runs] == paths
+    assert all(r["success"] for r in runs)
+    assert {r["thread_id"] for r in runs} <= {"T0", "T1"}
+
+
+def test_contre_pression_de_la_soumission(images):
+    """Plus de paquets que la fenêtre (4 * max_workers) : tous traités, dans l'ordre des images"""
+    paths, out = images(9)
+    res = threadpool_executor.process_threadpool(paths, out, max_workers=1, chunksize=1)
+    assert [r["input"] for r in res["runs"]] == paths
+    assert all(r["success"] for r in res["runs"])
+
+
+def test_epinglage_des_threads(images, monkeypatch):
+    """pin=True épingle chaque thread du pool sur un seul cœur, pas le thread principal"""
+    import os
+    if not hasattr(os, "sched_getaffinity"):
+        pytest.skip("Affinité non supportée sur ce système")
+    paths, out = images(4)
+    before = os.sched_getaffinity(0)
+    masks = []  # Affinité vue par chaque conversion (dans le thread du pool)
+    convert = threadpool_executor.convert_to_grayscale
+    def recording(*args, **kwargs):
+        masks.append(os.sched_getaffinity(0))
+        return convert(*args, **kwargs)
+    monkeypatch.setattr(threadpool_executor, "convert_to_grayscale", recording)
+    res = threadpool_executor.process_threadpool(paths, out, max_workers=2, pin=True)
+    assert all(r["success"] for r in res["runs"])
+    assert len(masks) == 4
+    if len(before) > 1:
+        assert all(len(m) == 1 and m <= before for m in masks)
+    assert os.sched_getaffinity(0) == before
+
+
+def test_lecture_anticipee_soumission_refusee(images):
+    """prefetch : une soumission refusée par le pool de calcul est relevée à la collecte, sans blocage"""
+    from concurrent.futures import ThreadPoolExecutor
+    paths, out = images(4)
+    ex = ThreadPoolExecutor(max_workers=1)
+    ex.shutdown()  # Pool arrêté : submit lève RuntimeError
+    with pytest.raises(RuntimeError):
+        threadpool_executor.process_threadpool(paths, out, max_workers=1, chunksize=1, prefetch=2, executor=ex)
+
+
+def test_semaphore_utilise_par_les_conversions(images):
+    """use_semaphore (sans Lock) : chaque conversion écrit son log à travers le Semaphore"""
+    paths, out = images(5)
+    res = threadpool_executor.process_threadpool(paths, out, max_workers=2, use_lock=False, use_semaphore=True)
+    assert res["logger_metrics"]["semaphore_acquire_count"] == 5